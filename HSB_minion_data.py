@@ -7,11 +7,14 @@ Created on Thu Jan  4 15:39:29 2024
 File containing data of hypixel skyblock minions.
 Data includes:
     List of minion related items with skyblock ID, prices and possible gained skill xp
+    List of pets for pet leveling with their max xp and prices
     Skyblock IDs of minion upgrades
     Lists of compactor, super compactor and auto smelter transformations, inferno minion chances
+    Compaction steps, chains and order compiled from the compactor and super compactor lists
     List of minions with their drop amounts, speed and notes
     Functions for calculating minion crafting cost
-    List of minion costs
+    List of minion costs, each minion is built the first time it is used
+    Cumulative minion costs from tier 1 up to every tier, for costs with one lookup
 
 The prices for minion related items are tagged with "npc" or "custom".
 Bazaar prices are updated in it automatically by the calculator, these are not saved.
@@ -27,9 +30,7 @@ There are a lot of unknown things here, any unknowns are written next to it in #
 If information has been confirmed, there is "# correct" behind it
 """
 
-from copy import deepcopy
-import numpy as np
-import time
+from collections.abc import Mapping
 
 #%% Smelter List:
 
@@ -785,7 +786,7 @@ itemList = {"NONE": {'display': "None",  # not in bazaar (doesn't exist)
                                   "prices": {"custom": 80000000},
                                   "upgrade": {'speed': 40, 'drop': 1, 'duration': 0}},
             'INFERNO_FUEL': {'display': 'Inferno Minion Fuel',
-                             "prices": {"custom": 1},  # this custom price will be automatically updated by the calculator based on grade and distilate
+                             "prices": {"custom": 1},  # not used, the price is calculated for each setup by engine.fuelPrice() based on grade and distilate
                              "upgrade": {'speed': 0, 'drop': 1, 'duration': 86400}},
             'BUDGET_HOPPER': {'display': 'Budget Hopper',
                               "prices": {"custom": 10000}},
@@ -1133,6 +1134,67 @@ enchanterList = {'CUSTOM': {'ENCHANTED_CUSTOM': 160, 'amount': 1},
                  'LOG_2': {'ENCHANTED_ACACIA_LOG': 160},
                  'LOG:3': {'ENCHANTED_JUNGLE_LOG': 160}}
 
+#%% Compaction steps and chains, compiled once from the compactor and enchanter lists
+
+
+def compactSteps(compact_list):
+    """
+    Compiles a compactor or enchanter list into single compaction steps.
+
+    Parameters
+    ----------
+    compact_list : dict
+        compactorList or enchanterList.
+
+    Returns
+    -------
+    steps : dict
+        item: (compacted item, items per compaction, compacted items per compaction).
+
+    """
+    steps = {}
+    for item, compact_data in compact_list.items():
+        compact_name, percompact = list(compact_data.items())[0]
+        steps[item] = (compact_name, percompact, compact_data.get("amount", 1))
+    return steps
+
+
+def compactChains(steps):
+    """
+    Follows the compaction steps of every item up to its last compacted form.
+
+    Parameters
+    ----------
+    steps : dict
+        Output of compactSteps().
+
+    Returns
+    -------
+    chains : dict
+        item: list of steps from the item to its last compacted form.
+    order : list
+        Items of steps, every item comes before the items it compacts into,
+        so one pass in this order compacts full chains.
+
+    """
+    chains = {}
+    for item in steps.keys():
+        chain = []
+        chain_item = item
+        while chain_item in steps and len(chain) < len(steps):  # length check in case of a loop in the data
+            chain.append(steps[chain_item])
+            chain_item = steps[chain_item][0]
+        chains[item] = chain
+    # an item always has a longer chain than the item it compacts into
+    order = sorted(steps.keys(), key=lambda item: len(chains[item]), reverse=True)
+    return chains, order
+
+
+compactorSteps = compactSteps(compactorList)
+compactorChains, compactorOrder = compactChains(compactorSteps)
+enchanterSteps = compactSteps(enchanterList)
+enchanterChains, enchanterOrder = compactChains(enchanterSteps)
+
 #%% pet xp boost items
 
 pet_xp_boosts = {"None": ["all", 0],
@@ -1165,6 +1227,16 @@ floating_crystals = {"None": {0: []},
                      "Winter Crystal": {5: ["Snow"]},
                      "Winter + Mithril Crystal": {15: ["Snow"]}}  # correct
 
+#%% Pets for pet leveling
+# pet_data last updated on: 2024-9-8
+
+pet_data = {"None": {"type": "combat", "xp": 1, "cost": {"min": 1, "max": 1}},
+            "Golden Dragon": {"type": "combat", "xp": 210255385, "cost": {"min": 650000000, "max": 1090000000}},
+            "Golden Dragon (lvl 1-100)": {"type": "combat", "xp": 25353230, "cost": {"min": 650000000, "max": 720000000}},
+            "Golden Dragon (lvl 100-200)": {"type": "combat", "xp": 184902155, "cost": {"min": 720000000, "max": 1090000000}},
+            "Black Cat": {"type": "combat", "xp": 25353230, "cost": {"min": 60000000, "max": 98000000}},
+            "Elephant": {"type": "farming", "xp": 25353230, "cost": {"min": 18500000, "max": 25000000}}}
+
 #%% Minion Storage
 
 minion_chests = {"None": 0, "Small": 3, "Medium": 9, "Large": 15, "X-Large": 21, "XX-Large": 27}
@@ -1173,6 +1245,7 @@ standard_storage = {1: 1, 2: 3, 3: 3, 4: 6, 5: 6, 6: 9, 7: 9, 8: 12, 9: 12, 10:
 
 #%% Minion List:
 # average drop amount from hypixel skyblock fandom wiki or self tested
+# "afkdrops" replaces "drops" when AFK, "specialdrops" replaces "drops" when AFK with the special setup
 
 minionList = {
     "Custom": {
@@ -1261,6 +1334,7 @@ minionList = {
     "Nether Wart": {"drops": {"NETHER_STALK": 3},
                     "speed": {11: 32, 12: 27}},
     "Flower": {"drops": {"YELLOW_FLOWER": 1 / 14, "RED_ROSE": 1 / 14, "SMALL_FLOWER": 8 / 14, "LARGE_FLOWER": 4 / 14},
+               "specialdrops": {"YELLOW_FLOWER": 1 / 10, "RED_ROSE": 1 / 10, "SMALL_FLOWER": 8 / 10},  # tall flowers blocked by string
                "speed": {1: 30, 2: 29, 3: 28, 4: 27, 5: 26, 6: 25, 7: 24, 8: 23, 9: 22, 10: 20, 11: 18, 12: 15},
                "storage": {1: 15, 2: 15, 3: 15, 4: 15, 5: 15, 6: 15, 7: 15, 8: 15, 9: 15, 10: 15, 11: 15, 12: 15},
                "notes": {"Special setup": "only spawn, no large flowers (water flushing, low roof)"}},
@@ -1322,16 +1396,22 @@ minionList = {
     "Rabbit": {"drops": {"RABBIT": 1, "RABBIT_FOOT": 0.35, "RABBIT_HIDE": 0.35},
                "speed": {1: 26, 2: 26, 3: 24, 4: 24, 5: 22, 6: 22, 7: 20, 8: 20, 9: 17, 10: 17, 11: 13, 12: 10}},
     "Oak": {"drops": {"LOG": 3}, "speed": {11: 27},
+            "afkdrops": {"LOG": 4},  # chopped trees have 4 blocks of wood, unknown why offline gives 3
             "notes": {"Special setup": "only spawn (manual breaking)", "AFK": "+1 wood drop"}},
     "Spruce": {"drops": {"LOG:1": 3}, "speed": {11: 27},
+               "afkdrops": {"LOG:1": 4},  # chopped trees have 4 blocks of wood, unknown why offline gives 3
                "notes": {"Special setup": "only spawn (manual breaking)", "AFK": "+1 wood drop"}},
     "Birch": {"drops": {"LOG:2": 3}, "speed": {11: 27},
+              "afkdrops": {"LOG:2": 4},  # chopped trees have 4 blocks of wood, unknown why offline gives 3
               "notes": {"Special setup": "only spawn (manual breaking)", "AFK": "+1 wood drop"}},
     "Dark Oak": {"drops": {"LOG_2:1": 3}, "speed": {11: 27},
+                 "afkdrops": {"LOG_2:1": 4},  # chopped trees have 4 blocks of wood, unknown why offline gives 3
                  "notes": {"Special setup": "only spawn (manual breaking)", "AFK": "+1 wood drop"}},
     "Acacia": {"drops": {"LOG_2": 3}, "speed": {11: 27},
+               "afkdrops": {"LOG_2": 4},  # chopped trees have 4 blocks of wood, unknown why offline gives 3
                "notes": {"Special setup": "only spawn (manual breaking)", "AFK": "+1 wood drop"}},
     "Jungle": {"drops": {"LOG:3": 3},
+               "afkdrops": {"LOG:3": 4},  # chopped trees have 4 blocks of wood, unknown why offline gives 3
                "notes": {"Special setup": "only spawn (manual breaking)", "AFK": "+1 wood drop"},
                "speed": {1: 48, 2: 48, 3: 45, 4: 45, 5: 42, 6: 42, 7: 38, 8: 38, 9: 33, 10: 33, 11: 27}}
 }
@@ -1371,111 +1451,159 @@ def minionCostTypes(materials, upgradetype, twelve=False, edits=None):
         for tier, edit in edits.items():
             cost_dict[tier] = edit
     try:
-        return deepcopy(cost_dict)
+        return cost_dict
     except UnboundLocalError:
         print(f"Minion cost calculation failed with {materials}")
         return {}
 
 
-def minionCostSum(minion_type, final_tier):
+def minionCostSum(minion_type, final_tier, cost=None):
+    if cost is None:
+        return dict(cumulativeMinionCosts[minion_type][final_tier]["items"])
     final_cost = {}
-    tier_loop = np.arange(final_tier) + 1
-    for tier in tier_loop:
-        for item, amount in minionCosts[minion_type][tier].items():
+    for tier in range(1, final_tier + 1):
+        for item, amount in cost[tier].items():
             if item not in final_cost:
                 final_cost[item] = 0
             final_cost[item] += amount
-    return deepcopy(final_cost)
+    return final_cost
+
+
+class LazyCosts(Mapping):
+    def __init__(self, builders):
+        """
+        Minion costs that get built the first time they are used, so importing this file stays fast.
+        Works like a read-only dict of minion type: {tier: {item: amount}}.
+
+        Parameters
+        ----------
+        builders : dict
+            Minion types with a function without arguments that returns the costs of that minion.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.builders = builders
+        self.built = {}
+        return
+
+    def __getitem__(self, minion_type):
+        if minion_type not in self.built:
+            self.built[minion_type] = self.builders[minion_type]()
+        return self.built[minion_type]
+
+    def __contains__(self, minion_type):
+        return minion_type in self.builders
+
+    def __iter__(self):
+        return iter(self.builders)
+
+    def __len__(self):
+        return len(self.builders)
 
 #%% Minion Costs
 
 
-minionCosts = {"Custom": minionCostTypes(["CUSTOM", "ENCHANTED_CUSTOM"], "single enchanted", True),
-               "Cobblestone": minionCostTypes(["COBBLESTONE", "ENCHANTED_COBBLESTONE"], "single enchanted", True),
-               "Obsidian": minionCostTypes(["OBSIDIAN", "ENCHANTED_OBSIDIAN"], "single enchanted", True),
-               "Glowstone": minionCostTypes(["GLOWSTONE_DUST", "ENCHANTED_GLOWSTONE_DUST", "ENCHANTED_GLOWSTONE"], "expensive enchanted", True),
-               "Gravel": minionCostTypes(["GRAVEL", "ENCHANTED_FLINT"], "single enchanted", False),
-               "Sand": minionCostTypes(["SAND", "ENCHANTED_SAND"], "single enchanted", False),
-               "Red Sand": minionCostTypes(["SAND:1", "ENCHANTED_RED_SAND", "ENCHANTED_RED_SAND_CUBE"], "expensive enchanted", True, {1: {'SAND:1': 80}, 4: {'ENCHANTED_RED_SAND': 16}, 5: {'ENCHANTED_RED_SAND': 32}}),
-               "Mycelium": minionCostTypes(["MYCEL", "ENCHANTED_MYCELIUM", "ENCHANTED_MYCELIUM_CUBE"], "expensive enchanted", True, {1: {'MYCEL': 80}, 4: {'ENCHANTED_MYCELIUM': 16}, 5: {'ENCHANTED_MYCELIUM': 32}}),
-               "Clay": minionCostTypes(["CLAY_BALL", "ENCHANTED_CLAY_BALL"], "single enchanted", False),
-               "Ice": {1: {"ICE": 80}, 2: {"ICE": 160}, 3: {"ICE": 320}, 4: {"ICE": 512}, 5: {"PACKED_ICE": 128}, 6: {"PACKED_ICE": 256}, 7: {"PACKED_ICE": 512}, 8: {"ENCHANTED_ICE": 64}, 9: {"ENCHANTED_ICE": 128}, 10: {"ENCHANTED_ICE": 256}, 11: {"ENCHANTED_ICE": 512}, 12: {"ENCHANTED_ICE": 1024}},
-               "Snow": {1: {}, 2: {"SNOW_BLOCK": 32}, 3: {"SNOW_BLOCK": 64}, 4: {"SNOW_BLOCK": 128}, 5: {"SNOW_BLOCK": 256}, 6: {"SNOW_BLOCK": 512}, 7: {"ENCHANTED_SNOW_BLOCK": 8}, 8: {"ENCHANTED_SNOW_BLOCK": 16}, 9: {"ENCHANTED_SNOW_BLOCK": 32}, 10: {"ENCHANTED_SNOW_BLOCK": 64}, 11: {"ENCHANTED_SNOW_BLOCK": 128}, 12: {"ENCHANTED_SNOW_BLOCK": 1024}},
-               "Coal": minionCostTypes(["COAL", "ENCHANTED_COAL", "ENCHANTED_COAL_BLOCK"], "double enchanted", True),
-               "Iron": minionCostTypes(["IRON_INGOT", "ENCHANTED_IRON", "ENCHANTED_IRON_BLOCK"], "double enchanted", True),
-               "Gold": minionCostTypes(["GOLD_INGOT", "ENCHANTED_GOLD", "ENCHANTED_GOLD_BLOCK"], "double enchanted", True),
-               "Diamond": minionCostTypes(["DIAMOND", "ENCHANTED_DIAMOND", "ENCHANTED_DIAMOND_BLOCK"], "double enchanted", True),
-               "Lapis": minionCostTypes(["INK_SACK:4", "ENCHANTED_LAPIS_LAZULI", "ENCHANTED_LAPIS_LAZULI_BLOCK"], "very expensive enchanted", True),
-               "Redstone": minionCostTypes(["REDSTONE", "ENCHANTED_REDSTONE", "ENCHANTED_REDSTONE_BLOCK"], "expensive enchanted", True),
-               "Emerald": minionCostTypes(["EMERALD", "ENCHANTED_EMERALD", "ENCHANTED_EMERALD_BLOCK"], "double enchanted", True),
-               "Quartz": minionCostTypes(["QUARTZ", "ENCHANTED_QUARTZ", "ENCHANTED_QUARTZ_BLOCK"], "double enchanted", True),
-               "End Stone": minionCostTypes(["ENDER_STONE", "ENCHANTED_ENDSTONE"], "single enchanted", False),
-               "Mithril": minionCostTypes(["MITHRIL_ORE", "ENCHANTED_MITHRIL", "REFINED_MITHRIL"], "double enchanted", True),
-               "Hard Stone": minionCostTypes(["HARD_STONE", "ENCHANTED_HARD_STONE", "CONCENTRATED_STONE"], "expensive enchanted", True, {1: {'HARD_STONE': 256}, 2: {'HARD_STONE': 512}, 3: {'ENCHANTED_HARD_STONE': 8}, 4: {'ENCHANTED_HARD_STONE': 16}, 5: {'ENCHANTED_HARD_STONE': 32}}),
-               "Wheat": {1: {"WHEAT": 80}, 2: {"WHEAT": 160}, 3: {"WHEAT": 256}, 4: {"WHEAT": 512}, 5: {"HAY_BLOCK": 96}, 6: {"HAY_BLOCK": 192}, 7: {"HAY_BLOCK": 384}, 8: {"HAY_BLOCK": 512}, 9: {"ENCHANTED_HAY_BLOCK": 8}, 10: {"ENCHANTED_HAY_BLOCK": 16}, 11: {"ENCHANTED_HAY_BLOCK": 32}, 12: {"ENCHANTED_HAY_BLOCK": 64}},
-               "Melon": {1: {"MELON": 256}, 2: {"MELON": 512}, 3: {"MELON_BLOCK": 128}, 4: {"MELON_BLOCK": 256}, 5: {"MELON_BLOCK": 512}, 6: {"ENCHANTED_MELON": 64}, 7: {"ENCHANTED_MELON": 128}, 8: {"ENCHANTED_MELON": 256}, 9: {"ENCHANTED_MELON": 512}, 10: {"ENCHANTED_MELON_BLOCK": 8}, 11: {"ENCHANTED_MELON_BLOCK": 16}, 12: {"ENCHANTED_MELON_BLOCK": 32}},
-               "Pumpkin": minionCostTypes(["PUMPKIN", "ENCHANTED_PUMPKIN"], "single enchanted", True),
-               "Carrot": minionCostTypes(["CARROT_ITEM", "ENCHANTED_CARROT", "ENCHANTED_GOLDEN_CARROT"], "expensive enchanted", True),
-               "Potato": minionCostTypes(["POTATO_ITEM", "ENCHANTED_POTATO", "ENCHANTED_BAKED_POTATO"], "expensive enchanted", True),
-               "Mushroom": minionCostTypes(["RED_MUSHROOM", "ENCHANTED_RED_MUSHROOM"], "single enchanted", True, {12: {"ENCHANTED_RED_MUSHROOM": 512, "ENCHANTED_BROWN_MUSHROOM": 512}}),
-               "Cactus": minionCostTypes(["CACTUS", "ENCHANTED_CACTUS_GREEN", "ENCHANTED_CACTUS"], "expensive enchanted", True),
-               "Cocoa Beans": minionCostTypes(["INK_SACK:3", "ENCHANTED_COCOA", "ENCHANTED_COOKIE"], "double enchanted", True),
-               "Sugar Cane": minionCostTypes(["SUGAR_CANE", "ENCHANTED_SUGAR", "ENCHANTED_SUGAR_CANE"], "expensive enchanted", True),
-               "Nether Wart": minionCostTypes(["NETHER_STALK", "ENCHANTED_NETHER_STALK"], "single enchanted", True),
-               "Flower": minionCostTypes(["YELLOW_FLOWER", "ENCHANTED_DANDELION", "ENCHANTED_POPPY"], "double enchanted", True, {1: {}}),
-               "Fishing": {1: {'RAW_FISH': 64}, 2: {'RAW_FISH': 128}, 3: {'RAW_FISH': 256}, 4: {'RAW_FISH': 512}, 5: {'ENCHANTED_RAW_FISH': 8}, 6: {'ENCHANTED_RAW_FISH': 24}, 7: {'ENCHANTED_RAW_FISH': 64}, 8: {'ENCHANTED_RAW_FISH': 128}, 9: {'ENCHANTED_RAW_FISH': 256}, 10: {'ENCHANTED_RAW_FISH': 512}, 11: {'ENCHANTED_COOKED_FISH': 8}},
-               "Zombie": minionCostTypes(["ROTTEN_FLESH", "ENCHANTED_ROTTEN_FLESH"], "single enchanted", False),
-               "Revenant": {},
-               "Voidling": {},
-               "Inferno": {},
-               "Vampire": minionCostTypes(["HEMOVIBE", "HEMOGLASS"], "single enchanted", False),
-               "Skeleton": minionCostTypes(["BONE", "ENCHANTED_BONE"], "single enchanted", False),
-               "Creeper": minionCostTypes(["SULPHUR", "ENCHANTED_GUNPOWDER", "ENCHANTED_FIREWORK_ROCKET"], "double enchanted", False, {11: {"ENCHANTED_FIREWORK_ROCKET": 16}}),
-               "Spider": minionCostTypes(["STRING", "ENCHANTED_STRING"], "single enchanted", False),
-               "Tarantula": {},
-               "Cave Spider": minionCostTypes(["SPIDER_EYE", "ENCHANTED_SPIDER_EYE", "ENCHANTED_FERMENTED_SPIDER_EYE"], "double enchanted", False, {11: {"ENCHANTED_FERMENTED_SPIDER_EYE": 16}}),
-               "Blaze": minionCostTypes(["BLAZE_ROD", "ENCHANTED_BLAZE_POWDER", "ENCHANTED_BLAZE_ROD"], "double enchanted", True),
-               "Magma Cube": minionCostTypes(["MAGMA_CREAM", "ENCHANTED_MAGMA_CREAM"], "single enchanted", True),
-               "Enderman": {1: {"ENDER_PEARL": 64}, 2: {"ENDER_PEARL": 128}, 3: {"ENCHANTED_ENDER_PEARL": 8}, 4: {"ENCHANTED_ENDER_PEARL": 24}, 5: {"ENCHANTED_ENDER_PEARL": 48}, 6: {"ENCHANTED_ENDER_PEARL": 96}, 7: {"ENCHANTED_EYE_OF_ENDER": 8}, 8: {"ENCHANTED_EYE_OF_ENDER": 24}, 9: {"ENCHANTED_EYE_OF_ENDER": 48}, 10: {"ENCHANTED_EYE_OF_ENDER": 96}, 11: {"ENCHANTED_EYE_OF_ENDER": 192}},
-               "Ghast": {1: {"GHAST_TEAR": 64}, 2: {"GHAST_TEAR": 128}, 3: {"GHAST_TEAR": 256}, 4: {"GHAST_TEAR": 512}, 5: {"ENCHANTED_GHAST_TEAR": 256}, 6: {"ENCHANTED_GHAST_TEAR": 512}, 7: {"ENCHANTED_GHAST_TEAR": 25 * 32}, 8: {"ENCHANTED_GHAST_TEAR": 25 * 64}, 9: {"ENCHANTED_GHAST_TEAR": 25 * 128}, 10: {"ENCHANTED_GHAST_TEAR": 25 * 256}, 11: {"ENCHANTED_GHAST_TEAR": 25 * 512}, 12: {"ENCHANTED_GHAST_TEAR": 25 * 1024}},
-               "Slime": minionCostTypes(["SLIME_BALL", "ENCHANTED_SLIME_BALL", "ENCHANTED_SLIME_BLOCK"], "double enchanted", False),
-               "Cow": {1: {"RAW_BEEF": 64}, 2: {"RAW_BEEF": 128}, 3: {"RAW_BEEF": 256}, 4: {"RAW_BEEF": 512}, 5: {"ENCHANTED_RAW_BEEF": 8}, 6: {"ENCHANTED_RAW_BEEF": 24}, 7: {"ENCHANTED_RAW_BEEF": 64}, 8: {"ENCHANTED_RAW_BEEF": 128}, 9: {"ENCHANTED_RAW_BEEF": 256}, 10: {"ENCHANTED_RAW_BEEF": 512}, 11: {"ENCHANTED_LEATHER": 256}, 12: {"ENCHANTED_LEATHER": 512}},
-               "Pig": minionCostTypes(["PORK", "ENCHANTED_PORK", "ENCHANTED_GRILLED_PORK"], "double enchanted", True, {1: {"PORK": 64}, 2: {"PORK": 128}, 3: {"PORK": 256}}),
-               "Chicken": minionCostTypes(["RAW_CHICKEN", "ENCHANTED_RAW_CHICKEN"], "single enchanted", True, {1: {"RAW_CHICKEN": 64}, 2: {"RAW_CHICKEN": 128}, 3: {"RAW_CHICKEN": 256}}),
-               "Sheep": minionCostTypes(["MUTTON", "ENCHANTED_MUTTON", "ENCHANTED_COOKED_MUTTON"], "double enchanted", True, {1: {"MUTTON": 64}, 2: {"MUTTON": 128}, 3: {"MUTTON": 256}}),
-               "Rabbit": {1: {"RABBIT": 64}, 2: {"RABBIT": 128}, 3: {"RABBIT": 256}, 4: {"RABBIT": 512}, 5: {"ENCHANTED_RABBIT_FOOT": 32}, 6: {"ENCHANTED_RABBIT_FOOT": 64}, 7: {"ENCHANTED_RABBIT_FOOT": 128}, 8: {"ENCHANTED_RABBIT_FOOT": 256}, 9: {"ENCHANTED_RABBIT_FOOT": 512}, 10: {"ENCHANTED_RABBIT_HIDE": 256}, 11: {"ENCHANTED_RABBIT_HIDE": 512}, 12: {"ENCHANTED_RABBIT_HIDE": 1024}},
-               "Oak": minionCostTypes(["LOG", "ENCHANTED_OAK_LOG"], "single enchanted", False),
-               "Spruce": minionCostTypes(["LOG:1", "ENCHANTED_SPRUCE_LOG"], "single enchanted", False),
-               "Birch": minionCostTypes(["LOG:2", "ENCHANTED_BIRCH_LOG"], "single enchanted", False),
-               "Dark Oak": minionCostTypes(["LOG_2:1", "ENCHANTED_DARK_OAK_LOG"], "single enchanted", False),
-               "Acacia": minionCostTypes(["LOG_2", "ENCHANTED_ACACIA_LOG"], "single enchanted", False),
-               "Jungle": minionCostTypes(["LOG:3", "ENCHANTED_JUNGLE_LOG"], "single enchanted", False)
-               }
-
-minionCosts["Revenant"] = {1: {"REVENANT_FLESH": 80, "ENCHANTED_ROTTEN_FLESH": 256, "ENCHANTED_DIAMOND": 256},
-                           2: {"REVENANT_FLESH": 140, **minionCostSum("Zombie", 1)},
-                           3: {"REVENANT_FLESH": 280, **minionCostSum("Zombie", 2)},
-                           4: {"REVENANT_FLESH": 448, **minionCostSum("Zombie", 3)},
-                           **{i: {"REVENANT_VISCERA": 7 * 2**(i - 5), **minionCostSum("Zombie", i - 1)} for i in np.arange(5, 12)},
-                           12: {"REVENANT_VISCERA": 64}}
-minionCosts["Voidling"] = {1: {"NULL_SPHERE": 80, **minionCostSum("Enderman", 1)},
-                           2: {"NULL_SPHERE": 140, **minionCostSum("Obsidian", 1)},
-                           3: {"NULL_SPHERE": 280, **minionCostSum("Enderman", 2)},
-                           4: {"NULL_SPHERE": 448, **minionCostSum("Obsidian", 3)},
-                           **{i: {"NULL_OVOID": 7 * 2**(i - 5), **minionCostSum(f"{'Obsidian' if i % 2 == 0 else 'Enderman'}", i - 1)} for i in np.arange(5, 12)}
-                           }
-minionCosts["Inferno"] = {1: {"DERELICT_ASHE": 80, **minionCostSum("Blaze", 1)}, 2: {"DERELICT_ASHE": 320},
-                          **{i: {"MOLTEN_POWDER": 8 * 2**(i - 3)} for i in np.arange(3, 9)},
-                          9: {'MOLTEN_POWDER': 256, "INFERNO_VERTEX": 16},
-                          10: {'MOLTEN_POWDER': 256, "INFERNO_VERTEX": 48}}
-minionCosts["Inferno"][11] = {"INFERNO_VERTEX": 48, "INFERNO_APEX": 1, **minionCostSum("Inferno", 8)}
-minionCosts["Inferno"][11]["MOLTEN_POWDER"] += 256
-minionCosts["Tarantula"] = {1: {"TARANTULA_WEB": 80, "ENCHANTED_FERMENTED_SPIDER_EYE": 1},
-                            2: {"TARANTULA_WEB": 140, **minionCostSum("Spider", 1)},
-                            3: {"TARANTULA_WEB": 280, **minionCostSum("Spider", 2)},
-                            4: {"TARANTULA_WEB": 448, **minionCostSum("Spider", 3)},
-                            **{i: {"TARANTULA_SILK": 7 * 2**(i - 5), **minionCostSum("Spider", i - 1)} for i in np.arange(5, 12)}
-                            }
+def revenantCost():
+    return {1: {"REVENANT_FLESH": 80, "ENCHANTED_ROTTEN_FLESH": 256, "ENCHANTED_DIAMOND": 256},
+            2: {"REVENANT_FLESH": 140, **minionCostSum("Zombie", 1)},
+            3: {"REVENANT_FLESH": 280, **minionCostSum("Zombie", 2)},
+            4: {"REVENANT_FLESH": 448, **minionCostSum("Zombie", 3)},
+            **{i: {"REVENANT_VISCERA": 7 * 2**(i - 5), **minionCostSum("Zombie", i - 1)} for i in range(5, 12)},
+            12: {"REVENANT_VISCERA": 64}}
+
+
+def voidlingCost():
+    return {1: {"NULL_SPHERE": 80, **minionCostSum("Enderman", 1)},
+            2: {"NULL_SPHERE": 140, **minionCostSum("Obsidian", 1)},
+            3: {"NULL_SPHERE": 280, **minionCostSum("Enderman", 2)},
+            4: {"NULL_SPHERE": 448, **minionCostSum("Obsidian", 3)},
+            **{i: {"NULL_OVOID": 7 * 2**(i - 5), **minionCostSum(f"{'Obsidian' if i % 2 == 0 else 'Enderman'}", i - 1)} for i in range(5, 12)}
+            }
+
+
+def infernoCost():
+    cost = {1: {"DERELICT_ASHE": 80, **minionCostSum("Blaze", 1)}, 2: {"DERELICT_ASHE": 320},
+            **{i: {"MOLTEN_POWDER": 8 * 2**(i - 3)} for i in range(3, 9)},
+            9: {'MOLTEN_POWDER': 256, "INFERNO_VERTEX": 16},
+            10: {'MOLTEN_POWDER': 256, "INFERNO_VERTEX": 48}}
+    cost[11] = {"INFERNO_VERTEX": 48, "INFERNO_APEX": 1, **minionCostSum("Inferno", 8, cost)}
+    cost[11]["MOLTEN_POWDER"] += 256
+    return cost
+
+
+def tarantulaCost():
+    return {1: {"TARANTULA_WEB": 80, "ENCHANTED_FERMENTED_SPIDER_EYE": 1},
+            2: {"TARANTULA_WEB": 140, **minionCostSum("Spider", 1)},
+            3: {"TARANTULA_WEB": 280, **minionCostSum("Spider", 2)},
+            4: {"TARANTULA_WEB": 448, **minionCostSum("Spider", 3)},
+            **{i: {"TARANTULA_SILK": 7 * 2**(i - 5), **minionCostSum("Spider", i - 1)} for i in range(5, 12)}
+            }
+
+
+minionCosts = LazyCosts({"Custom": lambda: minionCostTypes(["CUSTOM", "ENCHANTED_CUSTOM"], "single enchanted", True),
+               "Cobblestone": lambda: minionCostTypes(["COBBLESTONE", "ENCHANTED_COBBLESTONE"], "single enchanted", True),
+               "Obsidian": lambda: minionCostTypes(["OBSIDIAN", "ENCHANTED_OBSIDIAN"], "single enchanted", True),
+               "Glowstone": lambda: minionCostTypes(["GLOWSTONE_DUST", "ENCHANTED_GLOWSTONE_DUST", "ENCHANTED_GLOWSTONE"], "expensive enchanted", True),
+               "Gravel": lambda: minionCostTypes(["GRAVEL", "ENCHANTED_FLINT"], "single enchanted", False),
+               "Sand": lambda: minionCostTypes(["SAND", "ENCHANTED_SAND"], "single enchanted", False),
+               "Red Sand": lambda: minionCostTypes(["SAND:1", "ENCHANTED_RED_SAND", "ENCHANTED_RED_SAND_CUBE"], "expensive enchanted", True, {1: {'SAND:1': 80}, 4: {'ENCHANTED_RED_SAND': 16}, 5: {'ENCHANTED_RED_SAND': 32}}),
+               "Mycelium": lambda: minionCostTypes(["MYCEL", "ENCHANTED_MYCELIUM", "ENCHANTED_MYCELIUM_CUBE"], "expensive enchanted", True, {1: {'MYCEL': 80}, 4: {'ENCHANTED_MYCELIUM': 16}, 5: {'ENCHANTED_MYCELIUM': 32}}),
+               "Clay": lambda: minionCostTypes(["CLAY_BALL", "ENCHANTED_CLAY_BALL"], "single enchanted", False),
+               "Ice": lambda: {1: {"ICE": 80}, 2: {"ICE": 160}, 3: {"ICE": 320}, 4: {"ICE": 512}, 5: {"PACKED_ICE": 128}, 6: {"PACKED_ICE": 256}, 7: {"PACKED_ICE": 512}, 8: {"ENCHANTED_ICE": 64}, 9: {"ENCHANTED_ICE": 128}, 10: {"ENCHANTED_ICE": 256}, 11: {"ENCHANTED_ICE": 512}, 12: {"ENCHANTED_ICE": 1024}},
+               "Snow": lambda: {1: {}, 2: {"SNOW_BLOCK": 32}, 3: {"SNOW_BLOCK": 64}, 4: {"SNOW_BLOCK": 128}, 5: {"SNOW_BLOCK": 256}, 6: {"SNOW_BLOCK": 512}, 7: {"ENCHANTED_SNOW_BLOCK": 8}, 8: {"ENCHANTED_SNOW_BLOCK": 16}, 9: {"ENCHANTED_SNOW_BLOCK": 32}, 10: {"ENCHANTED_SNOW_BLOCK": 64}, 11: {"ENCHANTED_SNOW_BLOCK": 128}, 12: {"ENCHANTED_SNOW_BLOCK": 1024}},
+               "Coal": lambda: minionCostTypes(["COAL", "ENCHANTED_COAL", "ENCHANTED_COAL_BLOCK"], "double enchanted", True),
+               "Iron": lambda: minionCostTypes(["IRON_INGOT", "ENCHANTED_IRON", "ENCHANTED_IRON_BLOCK"], "double enchanted", True),
+               "Gold": lambda: minionCostTypes(["GOLD_INGOT", "ENCHANTED_GOLD", "ENCHANTED_GOLD_BLOCK"], "double enchanted", True),
+               "Diamond": lambda: minionCostTypes(["DIAMOND", "ENCHANTED_DIAMOND", "ENCHANTED_DIAMOND_BLOCK"], "double enchanted", True),
+               "Lapis": lambda: minionCostTypes(["INK_SACK:4", "ENCHANTED_LAPIS_LAZULI", "ENCHANTED_LAPIS_LAZULI_BLOCK"], "very expensive enchanted", True),
+               "Redstone": lambda: minionCostTypes(["REDSTONE", "ENCHANTED_REDSTONE", "ENCHANTED_REDSTONE_BLOCK"], "expensive enchanted", True),
+               "Emerald": lambda: minionCostTypes(["EMERALD", "ENCHANTED_EMERALD", "ENCHANTED_EMERALD_BLOCK"], "double enchanted", True),
+               "Quartz": lambda: minionCostTypes(["QUARTZ", "ENCHANTED_QUARTZ", "ENCHANTED_QUARTZ_BLOCK"], "double enchanted", True),
+               "End Stone": lambda: minionCostTypes(["ENDER_STONE", "ENCHANTED_ENDSTONE"], "single enchanted", False),
+               "Mithril": lambda: minionCostTypes(["MITHRIL_ORE", "ENCHANTED_MITHRIL", "REFINED_MITHRIL"], "double enchanted", True),
+               "Hard Stone": lambda: minionCostTypes(["HARD_STONE", "ENCHANTED_HARD_STONE", "CONCENTRATED_STONE"], "expensive enchanted", True, {1: {'HARD_STONE': 256}, 2: {'HARD_STONE': 512}, 3: {'ENCHANTED_HARD_STONE': 8}, 4: {'ENCHANTED_HARD_STONE': 16}, 5: {'ENCHANTED_HARD_STONE': 32}}),
+               "Wheat": lambda: {1: {"WHEAT": 80}, 2: {"WHEAT": 160}, 3: {"WHEAT": 256}, 4: {"WHEAT": 512}, 5: {"HAY_BLOCK": 96}, 6: {"HAY_BLOCK": 192}, 7: {"HAY_BLOCK": 384}, 8: {"HAY_BLOCK": 512}, 9: {"ENCHANTED_HAY_BLOCK": 8}, 10: {"ENCHANTED_HAY_BLOCK": 16}, 11: {"ENCHANTED_HAY_BLOCK": 32}, 12: {"ENCHANTED_HAY_BLOCK": 64}},
+               "Melon": lambda: {1: {"MELON": 256}, 2: {"MELON": 512}, 3: {"MELON_BLOCK": 128}, 4: {"MELON_BLOCK": 256}, 5: {"MELON_BLOCK": 512}, 6: {"ENCHANTED_MELON": 64}, 7: {"ENCHANTED_MELON": 128}, 8: {"ENCHANTED_MELON": 256}, 9: {"ENCHANTED_MELON": 512}, 10: {"ENCHANTED_MELON_BLOCK": 8}, 11: {"ENCHANTED_MELON_BLOCK": 16}, 12: {"ENCHANTED_MELON_BLOCK": 32}},
+               "Pumpkin": lambda: minionCostTypes(["PUMPKIN", "ENCHANTED_PUMPKIN"], "single enchanted", True),
+               "Carrot": lambda: minionCostTypes(["CARROT_ITEM", "ENCHANTED_CARROT", "ENCHANTED_GOLDEN_CARROT"], "expensive enchanted", True),
+               "Potato": lambda: minionCostTypes(["POTATO_ITEM", "ENCHANTED_POTATO", "ENCHANTED_BAKED_POTATO"], "expensive enchanted", True),
+               "Mushroom": lambda: minionCostTypes(["RED_MUSHROOM", "ENCHANTED_RED_MUSHROOM"], "single enchanted", True, {12: {"ENCHANTED_RED_MUSHROOM": 512, "ENCHANTED_BROWN_MUSHROOM": 512}}),
+               "Cactus": lambda: minionCostTypes(["CACTUS", "ENCHANTED_CACTUS_GREEN", "ENCHANTED_CACTUS"], "expensive enchanted", True),
+               "Cocoa Beans": lambda: minionCostTypes(["INK_SACK:3", "ENCHANTED_COCOA", "ENCHANTED_COOKIE"], "double enchanted", True),
+               "Sugar Cane": lambda: minionCostTypes(["SUGAR_CANE", "ENCHANTED_SUGAR", "ENCHANTED_SUGAR_CANE"], "expensive enchanted", True),
+               "Nether Wart": lambda: minionCostTypes(["NETHER_STALK", "ENCHANTED_NETHER_STALK"], "single enchanted", True),
+               "Flower": lambda: minionCostTypes(["YELLOW_FLOWER", "ENCHANTED_DANDELION", "ENCHANTED_POPPY"], "double enchanted", True, {1: {}}),
+               "Fishing": lambda: {1: {'RAW_FISH': 64}, 2: {'RAW_FISH': 128}, 3: {'RAW_FISH': 256}, 4: {'RAW_FISH': 512}, 5: {'ENCHANTED_RAW_FISH': 8}, 6: {'ENCHANTED_RAW_FISH': 24}, 7: {'ENCHANTED_RAW_FISH': 64}, 8: {'ENCHANTED_RAW_FISH': 128}, 9: {'ENCHANTED_RAW_FISH': 256}, 10: {'ENCHANTED_RAW_FISH': 512}, 11: {'ENCHANTED_COOKED_FISH': 8}},
+               "Zombie": lambda: minionCostTypes(["ROTTEN_FLESH", "ENCHANTED_ROTTEN_FLESH"], "single enchanted", False),
+               "Revenant": revenantCost,
+               "Voidling": voidlingCost,
+               "Inferno": infernoCost,
+               "Vampire": lambda: minionCostTypes(["HEMOVIBE", "HEMOGLASS"], "single enchanted", False),
+               "Skeleton": lambda: minionCostTypes(["BONE", "ENCHANTED_BONE"], "single enchanted", False),
+               "Creeper": lambda: minionCostTypes(["SULPHUR", "ENCHANTED_GUNPOWDER", "ENCHANTED_FIREWORK_ROCKET"], "double enchanted", False, {11: {"ENCHANTED_FIREWORK_ROCKET": 16}}),
+               "Spider": lambda: minionCostTypes(["STRING", "ENCHANTED_STRING"], "single enchanted", False),
+               "Tarantula": tarantulaCost,
+               "Cave Spider": lambda: minionCostTypes(["SPIDER_EYE", "ENCHANTED_SPIDER_EYE", "ENCHANTED_FERMENTED_SPIDER_EYE"], "double enchanted", False, {11: {"ENCHANTED_FERMENTED_SPIDER_EYE": 16}}),
+               "Blaze": lambda: minionCostTypes(["BLAZE_ROD", "ENCHANTED_BLAZE_POWDER", "ENCHANTED_BLAZE_ROD"], "double enchanted", True),
+               "Magma Cube": lambda: minionCostTypes(["MAGMA_CREAM", "ENCHANTED_MAGMA_CREAM"], "single enchanted", True),
+               "Enderman": lambda: {1: {"ENDER_PEARL": 64}, 2: {"ENDER_PEARL": 128}, 3: {"ENCHANTED_ENDER_PEARL": 8}, 4: {"ENCHANTED_ENDER_PEARL": 24}, 5: {"ENCHANTED_ENDER_PEARL": 48}, 6: {"ENCHANTED_ENDER_PEARL": 96}, 7: {"ENCHANTED_EYE_OF_ENDER": 8}, 8: {"ENCHANTED_EYE_OF_ENDER": 24}, 9: {"ENCHANTED_EYE_OF_ENDER": 48}, 10: {"ENCHANTED_EYE_OF_ENDER": 96}, 11: {"ENCHANTED_EYE_OF_ENDER": 192}},
+               "Ghast": lambda: {1: {"GHAST_TEAR": 64}, 2: {"GHAST_TEAR": 128}, 3: {"GHAST_TEAR": 256}, 4: {"GHAST_TEAR": 512}, 5: {"ENCHANTED_GHAST_TEAR": 256}, 6: {"ENCHANTED_GHAST_TEAR": 512}, 7: {"ENCHANTED_GHAST_TEAR": 25 * 32}, 8: {"ENCHANTED_GHAST_TEAR": 25 * 64}, 9: {"ENCHANTED_GHAST_TEAR": 25 * 128}, 10: {"ENCHANTED_GHAST_TEAR": 25 * 256}, 11: {"ENCHANTED_GHAST_TEAR": 25 * 512}, 12: {"ENCHANTED_GHAST_TEAR": 25 * 1024}},
+               "Slime": lambda: minionCostTypes(["SLIME_BALL", "ENCHANTED_SLIME_BALL", "ENCHANTED_SLIME_BLOCK"], "double enchanted", False),
+               "Cow": lambda: {1: {"RAW_BEEF": 64}, 2: {"RAW_BEEF": 128}, 3: {"RAW_BEEF": 256}, 4: {"RAW_BEEF": 512}, 5: {"ENCHANTED_RAW_BEEF": 8}, 6: {"ENCHANTED_RAW_BEEF": 24}, 7: {"ENCHANTED_RAW_BEEF": 64}, 8: {"ENCHANTED_RAW_BEEF": 128}, 9: {"ENCHANTED_RAW_BEEF": 256}, 10: {"ENCHANTED_RAW_BEEF": 512}, 11: {"ENCHANTED_LEATHER": 256}, 12: {"ENCHANTED_LEATHER": 512}},
+               "Pig": lambda: minionCostTypes(["PORK", "ENCHANTED_PORK", "ENCHANTED_GRILLED_PORK"], "double enchanted", True, {1: {"PORK": 64}, 2: {"PORK": 128}, 3: {"PORK": 256}}),
+               "Chicken": lambda: minionCostTypes(["RAW_CHICKEN", "ENCHANTED_RAW_CHICKEN"], "single enchanted", True, {1: {"RAW_CHICKEN": 64}, 2: {"RAW_CHICKEN": 128}, 3: {"RAW_CHICKEN": 256}}),
+               "Sheep": lambda: minionCostTypes(["MUTTON", "ENCHANTED_MUTTON", "ENCHANTED_COOKED_MUTTON"], "double enchanted", True, {1: {"MUTTON": 64}, 2: {"MUTTON": 128}, 3: {"MUTTON": 256}}),
+               "Rabbit": lambda: {1: {"RABBIT": 64}, 2: {"RABBIT": 128}, 3: {"RABBIT": 256}, 4: {"RABBIT": 512}, 5: {"ENCHANTED_RABBIT_FOOT": 32}, 6: {"ENCHANTED_RABBIT_FOOT": 64}, 7: {"ENCHANTED_RABBIT_FOOT": 128}, 8: {"ENCHANTED_RABBIT_FOOT": 256}, 9: {"ENCHANTED_RABBIT_FOOT": 512}, 10: {"ENCHANTED_RABBIT_HIDE": 256}, 11: {"ENCHANTED_RABBIT_HIDE": 512}, 12: {"ENCHANTED_RABBIT_HIDE": 1024}},
+               "Oak": lambda: minionCostTypes(["LOG", "ENCHANTED_OAK_LOG"], "single enchanted", False),
+               "Spruce": lambda: minionCostTypes(["LOG:1", "ENCHANTED_SPRUCE_LOG"], "single enchanted", False),
+               "Birch": lambda: minionCostTypes(["LOG:2", "ENCHANTED_BIRCH_LOG"], "single enchanted", False),
+               "Dark Oak": lambda: minionCostTypes(["LOG_2:1", "ENCHANTED_DARK_OAK_LOG"], "single enchanted", False),
+               "Acacia": lambda: minionCostTypes(["LOG_2", "ENCHANTED_ACACIA_LOG"], "single enchanted", False),
+               "Jungle": lambda: minionCostTypes(["LOG:3", "ENCHANTED_JUNGLE_LOG"], "single enchanted", False)
+               })
 
 extraMinionCosts = {"Cobblestone": {12: {"COINS": 2000000}},
                     "Obsidian": {12: {"COINS": 2000000}},
@@ -1517,6 +1645,42 @@ extraMinionCosts = {"Cobblestone": {12: {"COINS": 2000000}},
                     "Rabbit": {12: {"PELTS": 75}},
                     }
 
+
+def cumulativeCost(minion_type):
+    """
+    Prefix sums of the crafting cost of a minion.
+    The cost to upgrade from tier a to tier b is the cost at tier b minus the cost at tier a.
+
+    Parameters
+    ----------
+    minion_type : str
+        Key of minionCosts.
+
+    Returns
+    -------
+    cumulative : dict
+        tier: {"items": {item: amount}, "coins": float, "extra": {item: amount}} from tier 1 up to that tier,
+        "coins" and "extra" are the extraMinionCosts, tier 0 is empty.
+
+    """
+    cumulative = {0: {"items": {}, "coins": 0.0, "extra": {}}}
+    items = {}
+    coins = 0.0
+    extra = {}
+    for tier in range(1, max(minionCosts[minion_type].keys(), default=0) + 1):
+        for item, amount in minionCosts[minion_type].get(tier, {}).items():
+            items[item] = items.get(item, 0) + amount
+        for cost_type, amount in extraMinionCosts.get(minion_type, {}).get(tier, {}).items():
+            if cost_type == "COINS":
+                coins += amount
+            else:
+                extra[cost_type] = extra.get(cost_type, 0) + amount
+        cumulative[tier] = {"items": dict(items), "coins": coins, "extra": dict(extra)}
+    return cumulative
+
+
+cumulativeMinionCosts = LazyCosts({minion_type: (lambda minion_type=minion_type: cumulativeCost(minion_type)) for minion_type in minionCosts})
+
 #%% other crafting costs
 
 upgrades_material_cost = {"beacon": {1: {"ENCHANTED_MITHRIL": 192, "STARFALL": 64},
@@ -1536,6 +1700,8 @@ upgrades_material_cost = {"beacon": {1: {"ENCHANTED_MITHRIL": 192, "STARFALL": 6
 #%% Main stuff
 
 if __name__ == "__main__":
+    import time
+
     minionNameList = ["Cobblestone", "Obsidian", "Glowstone", "Gravel", "Sand",
                       "Red Sand", "Mycelium", "Clay", "Ice", "Snow",
                       "Coal", "Iron", "Gold", "Diamond", "Lapis", "Redstone", "Emerald",
@@ -8,7 +8,6 @@ A module containing functions to assit in the creation and handling of Tkinter w
 """
 
 import tkinter as tk
-import numpy as np
 
 color_palettes = {"dark": {"background": "black",
                            "frame_background": "#313338",
@@ -95,7 +94,7 @@ class Hk():
         self.main.stopB = tk.Button(self.main.frames["controls"], text='Stop', command=self.main.quit)
         self.main.stopB.place(relx=0.99, rely=0.5, anchor="e")
 
-        self.main.frame_amount = np.size(frame_keys)
+        self.main.frame_amount = sum(len(frame_row) for frame_row in frame_keys)
         rel_w = 1 / max([len(frame_keys[i]) for i in range(len(frame_keys))])
         rel_h = (1 - relControlsHeight) / len(frame_keys)
         for row_loc, row_keys in enumerate(frame_keys):
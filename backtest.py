@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 23:18:06 2026
+
+@author: Herodirk
+
+Backtest of a setup over the bazaar price history of history.PriceHistory.
+The item amounts, skill xp and pet leveling of a setup do not depend on prices,
+so they are calculated once with engine.evaluate().
+The price dependent outputs are linear in the item prices (except the NPC or bazaar choice of the Best hopper),
+so they are written as terms of (coefficient, item, action, location) and calculated over all snapshots at once.
+
+Example:
+    import backtest
+    store = history.PriceHistory("bazaar_history")
+    series = backtest.Backtest(engine.Setup(minion="Snow", miniontier=12, fuel="Plasma Bucket")).run(store, start=time.time() - 30 * 24 * 3600)
+    series["times"], series["totalProfit"]
+"""
+
+import numpy as np
+import HSB_minion_data as md
+import engine
+from engine import hopper_data
+
+backtest_outputs = ["itemProfit", "fuelcost", "totalProfit", "setupcost"]
+
+
+def sell_terms(setup, state):
+    """
+    Terms of the item profit, like engine.sell_stage().
+
+    Parameters
+    ----------
+    setup : engine.Setup
+        The setup.
+    state : dict
+        Outputs of the production stage.
+
+    Returns
+    -------
+    list
+        (coefficient, item ID, action, location) tuples, location "best" is the highest of NPC and bazaar.
+
+    """
+    if setup.hopper == "None":
+        return []
+    sellto = "npc"
+    if setup.hopper == "Bazaar":
+        sellto = "bazaar"
+    elif setup.hopper == "Best (NPC/Bazaar)":
+        sellto = "best"
+    return [(amount * hopper_data[setup.hopper], itemtype, "sell", sellto) for itemtype, amount in state["items"].items()]
+
+
+def fuel_terms(setup, state):
+    """
+    Terms of the fuel cost, like engine.fuel_stage().
+
+    Parameters
+    ----------
+    setup : engine.Setup
+        The setup.
+    state : dict
+        Outputs of the production stage.
+
+    Returns
+    -------
+    list
+        (coefficient, item ID, action, location) tuples.
+
+    """
+    minion_fuel = md.fuel_options[setup.fuel]
+    timeNumber = state["timeNumber"]
+    terms = []
+    if setup.beacon != 0:
+        if setup.scorched:
+            beacon_fuel_ID = "SCORCHED_POWER_CRYSTAL"
+        else:
+            beacon_fuel_ID = "POWER_CRYSTAL"
+        terms.append((timeNumber / md.itemList[beacon_fuel_ID]["duration"] * int(not (setup.B_constant)), beacon_fuel_ID, "buy", "bazaar"))
+    if md.itemList[minion_fuel]["upgrade"]["duration"] != 0:
+        for component_ID, amount in engine.fuel_components(setup, minion_fuel).items():
+            terms.append((amount * setup.amount * timeNumber / md.itemList[minion_fuel]["upgrade"]["duration"], component_ID, "buy", "bazaar"))
+    return terms
+
+
+def setup_cost_terms(setup):
+    """
+    Terms of the setup cost, like engine.setup_cost_stage().
+
+    Parameters
+    ----------
+    setup : engine.Setup
+        The setup.
+
+    Returns
+    -------
+    coins : float
+        Part of the setup cost that does not depend on prices.
+    terms : list
+        (coefficient, item ID, action, location) tuples.
+
+    """
+    minion_fuel = md.fuel_options[setup.fuel]
+    upgrades = [md.upgrade_options[setup.upgrade1], md.upgrade_options[setup.upgrade2]]
+    coins, minion_item_cost, notes = engine.minion_cost(setup)
+    coins *= setup.amount
+    # items bought for every minion
+    single_items = list(minion_item_cost.items())
+    if minion_fuel != "NONE" and md.itemList[minion_fuel]["upgrade"]["duration"] == 0:
+        single_items += list(engine.fuel_components(setup, minion_fuel).items())
+    if setup.hopper in ["Budget Hopper", "Enchanted Hopper"]:
+        single_items.append((md.getID[setup.hopper], 1))
+    single_items += [(upgrade, 1) for upgrade in upgrades if upgrade != "NONE"]
+    if setup.infusion is True:
+        single_items.append(("MITHRIL_INFUSION", 1))
+    terms = [(amount * setup.amount, item_ID, "buy", "bazaar") for item_ID, amount in single_items]
+    # items bought once
+    if setup.beacon != 0 and not setup.B_acquired:
+        for i in range(1, setup.beacon + 1):
+            terms += [(amount, item_ID, "buy", "bazaar") for item_ID, amount in md.upgrades_material_cost["beacon"][i].items()]
+    if setup.crystal != "None":
+        terms += [(amount, item_ID, "buy", "bazaar") for item_ID, amount in md.upgrades_material_cost["crystal"][setup.crystal].items()]
+    return coins, terms
+
+
+class Backtest():
+    def __init__(self, setup):
+        """
+        Calculates the price independent part of the setup and collects the price terms of the outputs.
+
+        Parameters
+        ----------
+        setup : engine.Setup
+            The setup to backtest.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.setup = setup
+        # the stages that do not use prices, including pet leveling
+        state = {}
+        for stage in engine.stages.values():
+            if not stage["prices"]:
+                state.update(stage["function"](setup, state))
+        self.petProfit = state["petProfit"]
+        self.coins, setup_terms = setup_cost_terms(setup)
+        self.terms = {"itemProfit": sell_terms(setup, state), "fuelcost": fuel_terms(setup, state), "setupcost": setup_terms}
+        return
+
+    def item_IDs(self):
+        """
+        Items of which the prices are needed.
+
+        Returns
+        -------
+        list
+            Skyblock item IDs.
+
+        """
+        IDs = []
+        for terms in self.terms.values():
+            for coefficient, ID, action, location in terms:
+                if ID not in IDs:
+                    IDs.append(ID)
+        return IDs
+
+    def price_series(self, ID, action, location, columns, buy, sell):
+        """
+        Price of one item at every row of the history, like engine.getPrice().
+        Rows without a bazaar price of the item use the current price.
+
+        Parameters
+        ----------
+        ID : str
+            Skyblock item ID.
+        action : str
+            "buy" or "sell".
+        location : str
+            "npc", "bazaar", "custom" or "best".
+        columns : dict
+            Item IDs with their column in buy and sell.
+        buy : numpy.ndarray
+            buyPrice history with shape (rows, items).
+        sell : numpy.ndarray
+            sellPrice history with shape (rows, items).
+
+        Returns
+        -------
+        numpy.ndarray
+            Prices with shape (rows, ).
+
+        """
+        if location == "best":
+            return np.maximum(self.price_series(ID, action, "npc", columns, buy, sell),
+                              self.price_series(ID, action, "bazaar", columns, buy, sell))
+        current = engine.getPrice(self.setup, ID, action, location)
+        price_key, multiplier = engine.price_location(self.setup, action, location)
+        if price_key not in ["buyPrice", "sellPrice"] or ID not in columns:
+            return np.full(len(buy), current, dtype=float)
+        history_prices = (buy if price_key == "buyPrice" else sell)[:, columns[ID]]
+        return np.where(np.isnan(history_prices), current, multiplier * history_prices)
+
+    def run(self, price_history, start=None, stop=None):
+        """
+        Calculates the outputs of the setup with the prices of every row of the history between start and stop.
+
+        Parameters
+        ----------
+        price_history : history.PriceHistory
+            Price history.
+        start : float, optional
+            First time in seconds. The default is the first row.
+        stop : float, optional
+            Last time in seconds. The default is the last row.
+
+        Returns
+        -------
+        series : dict
+            "times" and the outputs in backtest_outputs as arrays over the rows,
+            "petProfit" as a float, it does not depend on prices.
+
+        """
+        IDs = self.item_IDs()
+        times, buy, sell = price_history.matrix(start, stop, IDs)
+        columns = {ID: i for i, ID in enumerate(IDs)}
+        series = {"times": times, "petProfit": self.petProfit}
+        for output, terms in self.terms.items():
+            values = np.zeros(len(times))
+            for coefficient, ID, action, location in terms:
+                values += coefficient * self.price_series(ID, action, location, columns, buy, sell)
+            series[output] = values
+        series["setupcost"] = series["setupcost"] + self.coins
+        series["totalProfit"] = series["itemProfit"] + series["petProfit"] - series["fuelcost"]
+        return series
@@ -0,0 +1,513 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 15:20:42 2026
+
+@author: Herodirk
+
+Vectorized batch mode of the minion calculator.
+The minion, fuel and upgrade data gets compiled into numpy arrays once,
+after that every minion, tier, fuel and upgrade combination is calculated in a few numpy passes.
+Meant for ranking setups after each bazaar update, use engine.evaluate() for the full outputs of one setup.
+
+Differences with engine.evaluate():
+    (Super) Compactors are seen as linear, left over items that do not fill a compacted item are counted as a part of a compacted item
+    No pet leveling, xp and storage calculations, so "totalProfit" is item profit minus fuel cost
+
+Example:
+    import batch
+    batch_eval = batch.BatchEvaluator(engine.Setup(hopper="Best (NPC/Bazaar)"))
+    results = batch_eval.evaluate()
+    for setup, profit in batch_eval.rank(results, top=5):
+        print(setup.minion, setup.fuel, setup.upgrade1, setup.upgrade2, profit)
+"""
+
+from dataclasses import replace
+import numpy as np
+import HSB_minion_data as md
+import engine
+import registry
+
+
+class BatchEvaluator():
+    def __init__(self, setup=None, minions=None, tiers="max", fuels=None, upgrades1=None, upgrades2=None):
+        """
+        Compiles all price independent data of the minion × tier × fuel × upgrade1 × upgrade2 grid.
+        All other inputs (beacon, crystal, afk, mayor, hopper, bazaar settings, time span, etc.) are taken from setup.
+
+        Parameters
+        ----------
+        setup : engine.Setup, optional
+            Setup with the inputs that are the same for the whole grid. The default is engine.Setup().
+        minions : list, optional
+            Minion names. The default is all minions in md.minionList.
+        tiers : str or list, optional
+            "max" for the highest tier of each minion, "all" for tier 1 to 12 or a list of tiers.
+            Tiers that a minion does not have get NaN as result. The default is "max".
+        fuels : list, optional
+            Fuel names. The default is all fuels in md.fuel_options.
+        upgrades1 : list, optional
+            Upgrade names for the first upgrade slot. The default is all upgrades in md.upgrade_options.
+        upgrades2 : list, optional
+            Upgrade names for the second upgrade slot. The default is all upgrades in md.upgrade_options.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.setup = setup if setup is not None else engine.Setup()
+        self.minions = list(md.minionList.keys()) if minions is None else list(minions)
+        self.fuels = list(md.fuel_options.keys()) if fuels is None else list(fuels)
+        self.upgrades1 = list(md.upgrade_options.keys()) if upgrades1 is None else list(upgrades1)
+        self.upgrades2 = list(md.upgrade_options.keys()) if upgrades2 is None else list(upgrades2)
+        self.registry = registry.default_registry()
+        self.itemIDs = self.registry.IDs
+        self.item_index = self.registry.index
+
+        if tiers == "max":
+            self.tiers = np.array([[list(md.minionList[minion]["speed"].keys())[-1]] for minion in self.minions])
+        elif tiers == "all":
+            self.tiers = np.tile(np.arange(1, 13), (len(self.minions), 1))
+        else:
+            self.tiers = np.tile(np.array(tiers), (len(self.minions), 1))
+        self.compile_minions()
+        self.compile_fuels()
+        self.compile_upgrades()
+        self.compile_compactors()
+        return
+
+#%% compilers
+
+    def compile_minions(self):
+        """
+        Compiles base speeds, speed bonusses, actions per harvest, drop tables and minion costs of all minions.
+        Uses the engine functions with fuel and upgrades set to "None" for the minion specific parts.
+
+        Returns
+        -------
+        None.
+
+        """
+        M, K, I = len(self.minions), self.tiers.shape[1], len(self.itemIDs)
+        # minion costs can have items that are not in md.itemList, so they get their own item list
+        self.cost_IDs = list(dict.fromkeys(item for minion_type in self.minions for tier_cost in md.minionCosts[minion_type].values() for item in tier_cost))
+        cost_index = {ID: i for i, ID in enumerate(self.cost_IDs)}
+        self.base_speed = np.full((M, K), np.nan)
+        self.speed_minion = np.zeros(M)
+        self.actionsPerHarvest = np.zeros(M)
+        self.afkcorrupt = np.ones(M)
+        self.is_voidling = np.zeros(M, dtype=bool)
+        self.drop_table = np.zeros((M, I))
+        self.cost_table = np.zeros((M, K, len(self.cost_IDs)))
+        self.cost_coins = np.zeros((M, K))
+        for i, minion_type in enumerate(self.minions):
+            minion_setup = replace(self.setup, minion=minion_type, fuel="None", upgrade1="None", upgrade2="None")
+            self.speed_minion[i] = engine.speed_bonus(minion_setup)
+            self.actionsPerHarvest[i] = engine.actions_per_harvest(minion_setup)
+            for item, amount in engine.minion_drops(minion_setup).items():
+                self.drop_table[i, self.item_index[item]] = amount
+            self.afkcorrupt[i] = md.minionList[minion_type].get("afkcorrupt", 1)
+            self.is_voidling[i] = minion_type == "Voidling"
+            for k, minion_tier in enumerate(self.tiers[i]):
+                if minion_tier not in md.minionList[minion_type]["speed"]:
+                    continue
+                self.base_speed[i, k] = md.minionList[minion_type]["speed"][minion_tier]
+                cumulative = md.cumulativeMinionCosts[minion_type][minion_tier]
+                for item, amount in cumulative["items"].items():
+                    self.cost_table[i, k, cost_index[item]] = amount
+                self.cost_coins[i, k] = cumulative["coins"]
+        self.drop_count = self.drop_table.sum(axis=1)
+        self.dropMultiplier_base, self.dropMultiplier_offline = engine.drop_multipliers(replace(self.setup, minion="Custom", fuel="None", upgrade1="None", upgrade2="None"))
+        return
+
+    def compile_fuels(self):
+        """
+        Compiles speed, drop multiplier and duration of all fuels.
+
+        Returns
+        -------
+        None.
+
+        """
+        fuel_IDs = [md.fuel_options[fuel] for fuel in self.fuels]
+        self.fuel_IDs = fuel_IDs
+        self.speed_fuel = np.array([md.itemList[ID]["upgrade"]["speed"] for ID in fuel_IDs], dtype=float)
+        self.drop_fuel = np.array([md.itemList[ID]["upgrade"]["drop"] for ID in fuel_IDs], dtype=float)
+        self.duration_fuel = np.array([md.itemList[ID]["upgrade"]["duration"] for ID in fuel_IDs], dtype=float)
+        self.is_inferno = np.array([ID == "INFERNO_FUEL" for ID in fuel_IDs])
+        self.is_infinite = np.array([ID != "NONE" and md.itemList[ID]["upgrade"]["duration"] == 0 for ID in fuel_IDs])
+        return
+
+    def compile_upgrades(self):
+        """
+        Compiles speed and drop multipliers of all upgrades
+        and the extra drops and item replacements of every upgrade pair.
+        Extra drops are split in three streams: per base drop (generate), per harvest (add) and per second (timer).
+        Like in engine.evaluate(), the second upgrade overwrites the extra drops of the first upgrade if they drop the same item.
+
+        Returns
+        -------
+        None.
+
+        """
+        I = len(self.itemIDs)
+        idx = self.item_index
+        IDs1 = [md.upgrade_options[upgrade] for upgrade in self.upgrades1]
+        IDs2 = [md.upgrade_options[upgrade] for upgrade in self.upgrades2]
+        self.upgrade_IDs1, self.upgrade_IDs2 = IDs1, IDs2
+        self.speed_upgrade1 = np.array([md.itemList[ID]["upgrade"]["speed"] for ID in IDs1], dtype=float)
+        self.speed_upgrade2 = np.array([md.itemList[ID]["upgrade"]["speed"] for ID in IDs2], dtype=float)
+        self.drop_upgrade1 = np.array([md.itemList[ID]["upgrade"]["drop"] for ID in IDs1], dtype=float)
+        self.drop_upgrade2 = np.array([md.itemList[ID]["upgrade"]["drop"] for ID in IDs2], dtype=float)
+
+        pairs = [(ID1, ID2) for ID1 in IDs1 for ID2 in IDs2]
+        P = len(pairs)
+        self.pair_replace = np.zeros(P, dtype=int)
+        self.pair_compaction = np.zeros(P, dtype=int)
+        self.pair_soulflow = np.zeros(P, dtype=bool)
+        self.pair_diamond = np.zeros(P, dtype=bool)
+        self.generate_vec = np.zeros((P, I))
+        self.add_vec = np.zeros((P, I))
+        self.corrupt_vec = np.zeros((P, I))
+        self.timer_vec = np.zeros((P, I))
+        replace_maps = {}
+        self.replaced_tables = []
+        not_diamond = np.ones(I, dtype=bool)
+        not_diamond[idx["DIAMOND"]] = False
+        for p, upgrades in enumerate(pairs):
+            upgrades_types = [temp_type for upgrade in upgrades for temp_type in md.itemList[upgrade]["upgrade"]["special"]["type"].split(", ")]
+            self.pair_compaction[p] = 1 * ("compact" in upgrades_types) + 2 * ("enchant" in upgrades_types)
+            self.pair_soulflow[p] = "SOULFLOW_ENGINE" in upgrades
+            self.pair_diamond[p] = "DIAMOND_SPREADING" in upgrades and self.setup.afk is False
+
+            # replacing upgrades are like Auto Smelters
+            replace_map = np.arange(I)
+            for upgrade in upgrades:
+                special = md.itemList[upgrade]["upgrade"]["special"]
+                if "replace" in special["type"]:
+                    for item, new_item in special["list"].items():
+                        replace_map[replace_map == idx[item]] = idx[new_item]
+            key = replace_map.tobytes()
+            if key not in replace_maps:
+                replace_maps[key] = len(self.replaced_tables)
+                replaced = np.zeros_like(self.drop_table)
+                np.add.at(replaced, (slice(None), replace_map), self.drop_table)
+                self.replaced_tables.append(replaced)
+            self.pair_replace[p] = replace_maps[key]
+
+            # extra drops, the last upgrade overwrites items of the first
+            for upgrade in upgrades:
+                special = md.itemList[upgrade]["upgrade"]["special"]
+                if special["type"] not in ["generate", "add", "timer"]:
+                    continue
+                for item, amount in special["item"].items():
+                    i = idx[item]
+                    self.generate_vec[p, i] = self.add_vec[p, i] = self.timer_vec[p, i] = 0
+                    if special["type"] == "generate":
+                        self.generate_vec[p, i] = special["chance"] * amount
+                    elif special["type"] == "add":
+                        self.add_vec[p, i] = amount
+                    elif special["type"] == "timer":
+                        self.timer_vec[p, i] = amount / special["cooldown"]
+
+            # upgrades behavior when afking
+            streams = [self.generate_vec, self.add_vec, self.timer_vec]
+            if self.setup.afk is True:
+                if "CORRUPT_SOIL" in upgrades:
+                    for item in ["SULPHUR_ORE", "CORRUPTED_FRAGMENT"]:
+                        self.corrupt_vec[p, idx[item]] = self.add_vec[p, idx[item]]
+                if "ENCHANTED_EGG" in upgrades:
+                    for stream in streams:
+                        stream[p, idx["EGG"]] *= 2
+            elif "ENCHANTED_SHEARS" in upgrades:
+                for stream in streams:
+                    stream[p, idx["WOOL"]] = 0
+        self.replaced_tables = np.array(self.replaced_tables)
+        self.replaced_count = self.replaced_tables.sum(axis=2)
+        # amounts of upgrade drops that are not diamonds, for offline Diamond Spreading
+        self.generate_count = self.generate_vec[:, not_diamond].sum(axis=1)
+        self.add_count = self.add_vec[:, not_diamond].sum(axis=1)
+        self.timer_count = self.timer_vec[:, not_diamond].sum(axis=1)
+        return
+
+    def compile_compactors(self):
+        """
+        Compiles the compaction steps and chains of HSB_minion_data into linear item transformation matrices.
+        Row i of a matrix is the amount of each item that one of item i turns into.
+        Mode 0 is no compaction, 1 Compactor, 2 Super Compactor, 3 both.
+
+        Returns
+        -------
+        None.
+
+        """
+        I = len(self.itemIDs)
+        idx = self.item_index
+        compact = np.eye(I)
+        for item, (compact_name, percompact, compact_per) in md.compactorSteps.items():
+            compact[idx[item], idx[item]] = 0
+            compact[idx[item], idx[compact_name]] = compact_per / percompact
+        # a full chain of super compactor steps is one linear step to the last enchanted form
+        enchant = np.eye(I)
+        for item, chain in md.enchanterChains.items():
+            ratio = 1
+            for enchanted_name, perenchanted, enchanted_per in chain:
+                ratio *= enchanted_per / perenchanted
+            enchant[idx[item], idx[item]] = 0
+            enchant[idx[item], idx[chain[-1][0]]] = ratio
+        self.compaction = np.array([np.eye(I), compact, enchant, compact @ enchant])
+        return
+
+#%% price vectors
+
+    def price_vector(self, IDs, action, location):
+        """
+        Prices of a list of items from self.registry as an array over all items in md.itemList.
+        Items that are not in IDs get price 0.
+
+        Parameters
+        ----------
+        IDs : iterable
+            Skyblock item IDs to price.
+        action : str
+            Type of transaction. "buy" or "sell".
+        location : str
+            Location of the transaction, "npc" or "bazaar".
+
+        Returns
+        -------
+        prices : numpy.ndarray
+            Prices indexed like self.itemIDs.
+
+        """
+        prices = np.zeros(len(self.itemIDs))
+        indices = self.registry.indices(IDs)
+        prices[indices] = self.registry.price_vector(self.setup, action, location)[indices]
+        return prices
+
+    def sell_vector(self):
+        """
+        Sell price of every item that a minion in the grid can make, according to the hopper of the setup.
+
+        Returns
+        -------
+        numpy.ndarray
+            Sell prices indexed like self.itemIDs.
+
+        """
+        hopper = self.setup.hopper
+        if hopper == "None":
+            return np.zeros(len(self.itemIDs))
+        made = self.drop_table.any(axis=0) | self.generate_vec.any(axis=0) | self.add_vec.any(axis=0) | self.timer_vec.any(axis=0)
+        made |= self.replaced_tables.any(axis=(0, 1))
+        for distilate_item, amount_per in md.infernofuel_data["distilates"].values():
+            made[self.item_index[distilate_item]] = True
+        for item in [*md.infernofuel_data["drops"].keys(), "HYPERGOLIC_IONIZED_CERAMICS", "DIAMOND"]:
+            made[self.item_index[item]] = True
+        # every item that a compaction mode can turn a made item into, like SNOW_BLOCK of the Compactor alone
+        made = made | ((made @ self.compaction[1:].sum(axis=0)) != 0)
+        route = {"Bazaar": "bazaar", "Best (NPC/Bazaar)": "best"}.get(hopper, "npc")
+        prices = np.where(made, self.registry.sell_vector(self.setup, route), 0)
+        return prices * engine.hopper_data[hopper]
+
+#%% batch calculation
+
+    def evaluate(self):
+        """
+        Calculates the whole grid with the prices that are currently in md.itemList.
+        All arrays have the axes (minion, tier, fuel, upgrade1, upgrade2).
+
+        Returns
+        -------
+        results : dict
+            "actiontime": seconds per action
+            "harvests": harvests of all minions
+            "base_drops": multiplier for the rows of self.drop_table, the harvested base drops of all minions before upgrades
+            "itemProfit", "fuelcost", "totalProfit" and "setupcost": like in engine.Result
+
+        """
+        s = self.setup
+        self.registry.load_prices()
+        M, K, F = len(self.minions), self.tiers.shape[1], len(self.fuels)
+        U1, U2 = len(self.upgrades1), len(self.upgrades2)
+        idx = self.item_index
+        m_ = (M, 1, 1, 1, 1)
+        f_ = (1, 1, F, 1, 1)
+        pair_ = (1, 1, 1, U1, U2)
+        mpair_ = (M, 1, 1, U1, U2)
+        inferno = self.is_inferno.reshape(f_)
+
+        # speed and time
+        speedBonus = (self.speed_minion.reshape(m_) + self.speed_fuel.reshape(f_)
+                      + self.speed_upgrade1.reshape(1, 1, 1, U1, 1) + self.speed_upgrade2.reshape(1, 1, 1, 1, U2))
+        secondsPaction = self.base_speed.reshape(M, K, 1, 1, 1) / (1 + speedBonus / 100)
+        grade_bonus = md.infernofuel_data["grades"][md.getID[s.infernoGrade]]
+        secondsPaction = secondsPaction / np.where(inferno, 1 + grade_bonus, 1)
+        actionsPerHarvest = self.actionsPerHarvest.reshape(m_)
+        if s.timelength == "Harvests":
+            timeNumber = secondsPaction * actionsPerHarvest * s.timeamount
+            harvestsPerTime = np.full(secondsPaction.shape, float(s.timeamount))
+            harvestsPerTime[np.isnan(secondsPaction)] = np.nan
+        else:
+            timeNumber = engine.time_number(s, 0, 0)
+            harvestsPerTime = timeNumber / (actionsPerHarvest * secondsPaction)
+
+        # drop multipliers
+        dropMultiplier_base = (self.dropMultiplier_base * self.drop_fuel.reshape(f_)
+                               * self.drop_upgrade1.reshape(1, 1, 1, U1, 1) * self.drop_upgrade2.reshape(1, 1, 1, 1, U2))
+        soulflow = self.is_voidling.reshape(m_) & self.pair_soulflow.reshape(pair_)
+        dropMultiplier_base = dropMultiplier_base * np.where(soulflow, 2 * (0.5 + 0.03 * self.tiers.reshape(M, K, 1, 1, 1)), 1)
+        dropMultiplier_offline = self.drop_fuel.reshape(f_) if s.afk is False else 1
+        base_drops = harvestsPerTime * dropMultiplier_base
+
+        # values of every item stream for each upgrade pair, with compaction
+        sell_prices = self.sell_vector()
+        compacted_prices = self.compaction @ sell_prices  # (mode, item)
+        pair_prices = compacted_prices[self.pair_compaction]  # (pair, item)
+        replaced_values = self.replaced_tables @ compacted_prices.T  # (replace, minion, mode)
+        base_value = replaced_values[self.pair_replace, :, self.pair_compaction].T.reshape(mpair_)
+        base_count = self.replaced_count[self.pair_replace].T.reshape(mpair_)
+        generate_value = np.einsum("pi,pi->p", self.generate_vec, pair_prices).reshape(pair_)
+        add_value = np.einsum("pi,pi->p", self.add_vec, pair_prices).reshape(pair_)
+        corrupt_value = np.einsum("pi,pi->p", self.corrupt_vec, pair_prices).reshape(pair_)
+        timer_value = np.einsum("pi,pi->p", self.timer_vec, pair_prices).reshape(pair_)
+        afkcorrupt = self.afkcorrupt.reshape(m_) - 1
+
+        # base drops, upgrade drops
+        base_amount = base_drops * base_count
+        add_harvests = harvestsPerTime * dropMultiplier_offline
+        value = base_drops * base_value * np.where(inferno, 1 / 5, 1)
+        value = value + base_amount * generate_value
+        value = value + add_harvests * (add_value + afkcorrupt * corrupt_value)
+        value = value + timeNumber * timer_value
+        upgrade_count = (base_amount * self.generate_count.reshape(pair_) + add_harvests * self.add_count.reshape(pair_)
+                         + timeNumber * self.timer_count.reshape(pair_))
+
+        # Inferno minion fuel drops
+        if self.is_inferno.any():
+            distilate = md.getID[s.infernoDistilate]
+            distilate_item, amount_per = md.infernofuel_data["distilates"][distilate]
+            distilate_amount = base_amount * 4 / 5 * amount_per
+            inferno_value = distilate_amount * pair_prices[:, idx[distilate_item]].reshape(pair_)
+            inferno_count = distilate_amount
+            if s.infernoGrade == "Hypergolic Gabagool":
+                multiplier = 1.3 if s.infernoEyedrops is True else 1
+                chances = np.zeros(len(self.itemIDs))
+                for item, chance in md.infernofuel_data["drops"].items():
+                    chances[idx[item]] = multiplier * chance
+                apex_chances = np.zeros(len(self.itemIDs))
+                apex_chances[idx["INFERNO_APEX"]] = chances[idx["INFERNO_APEX"]]
+                apex = (self.tiers >= 10).reshape(M, K, 1, 1, 1)
+                ceramics = timeNumber / md.itemList["INFERNO_FUEL"]["upgrade"]["duration"]
+                inferno_value = inferno_value + harvestsPerTime * ((pair_prices @ chances).reshape(pair_) + apex * (pair_prices @ apex_chances).reshape(pair_))
+                inferno_value = inferno_value + ceramics * pair_prices[:, idx["HYPERGOLIC_IONIZED_CERAMICS"]].reshape(pair_)
+                inferno_count = inferno_count + harvestsPerTime * (chances.sum() + apex * apex_chances.sum()) + ceramics
+            value = value + np.where(inferno, inferno_value, 0)
+            upgrade_count = upgrade_count + np.where(inferno, inferno_count, 0)
+
+        # add extra diamonds from offline diamond spreading
+        diamond_value = 0.1 * upgrade_count * pair_prices[:, idx["DIAMOND"]].reshape(pair_)
+        value = value + np.where(self.pair_diamond.reshape(pair_), diamond_value, 0)
+
+        # Offline mode Derpy
+        if s.mayor == "Derpy" and s.afk is False:
+            value = value * 2
+
+        # fuel cost
+        fuel_prices = np.array([engine.fuelPrice(s, ID) if ID != "NONE" else 0 for ID in self.fuel_IDs], dtype=float)
+        fuel_rate = np.divide(fuel_prices, self.duration_fuel, out=np.zeros(F), where=self.duration_fuel != 0)
+        fuelcost = s.amount * timeNumber * fuel_rate.reshape(f_)
+        if s.beacon != 0 and not s.B_constant:
+            beacon_fuel_ID = "SCORCHED_POWER_CRYSTAL" if s.scorched else "POWER_CRYSTAL"
+            fuelcost = fuelcost + timeNumber * engine.getPrice(s, beacon_fuel_ID, "buy", "bazaar") / md.itemList[beacon_fuel_ID]["duration"]
+
+        # setup cost
+        cost_prices = self.registry.price_vector(s, "buy", "bazaar", self.cost_IDs)
+        minion_cost = self.cost_table @ cost_prices + self.cost_coins
+        buy_prices = self.price_vector({ID for ID in self.upgrade_IDs1 + self.upgrade_IDs2 if ID != "NONE"}, "buy", "bazaar")
+        fuel_cost = np.where(self.is_infinite, fuel_prices, 0)
+        upgrade_cost1 = buy_prices[[idx[ID] for ID in self.upgrade_IDs1]]
+        upgrade_cost2 = buy_prices[[idx[ID] for ID in self.upgrade_IDs2]]
+        single_cost = 0.0
+        if s.hopper in ["Budget Hopper", "Enchanted Hopper"]:
+            single_cost += engine.getPrice(s, md.getID[s.hopper], "buy", "bazaar")
+        if s.infusion is True:
+            single_cost += engine.getPrice(s, "MITHRIL_INFUSION", "buy", "bazaar")
+        setupcost = (minion_cost.reshape(M, K, 1, 1, 1) + fuel_cost.reshape(f_) + upgrade_cost1.reshape(1, 1, 1, U1, 1)
+                     + upgrade_cost2.reshape(1, 1, 1, 1, U2) + single_cost) * s.amount
+        if s.beacon != 0 and not s.B_acquired:
+            for i in range(1, s.beacon + 1):
+                for item_ID, amount in md.upgrades_material_cost["beacon"][i].items():
+                    setupcost = setupcost + amount * engine.getPrice(s, item_ID, "buy", "bazaar")
+        if s.crystal != "None":
+            for item_ID, amount in md.upgrades_material_cost["crystal"][s.crystal].items():
+                setupcost = setupcost + amount * engine.getPrice(s, item_ID, "buy", "bazaar")
+
+        shape = (M, K, F, U1, U2)
+        itemProfit = np.broadcast_to(value * s.amount, shape)
+        fuelcost = np.broadcast_to(fuelcost, shape)
+        results = {"actiontime": np.broadcast_to(secondsPaction, shape),
+                   "harvests": np.broadcast_to(harvestsPerTime * s.amount, shape),
+                   "base_drops": np.broadcast_to(base_drops * s.amount, shape),
+                   "itemProfit": itemProfit,
+                   "fuelcost": fuelcost,
+                   "totalProfit": itemProfit - fuelcost,
+                   "setupcost": np.where(np.isnan(secondsPaction), np.nan, setupcost)}
+        return results
+
+#%% ranking
+
+    def get_setup(self, index):
+        """
+        Makes the engine.Setup of one cell of the grid.
+
+        Parameters
+        ----------
+        index : tuple
+            Index (minion, tier, fuel, upgrade1, upgrade2) in the result arrays.
+
+        Returns
+        -------
+        engine.Setup
+            Setup of that cell.
+
+        """
+        m, k, f, u1, u2 = index
+        return replace(self.setup, minion=self.minions[m], miniontier=int(self.tiers[m, k]), fuel=self.fuels[f],
+                       upgrade1=self.upgrades1[u1], upgrade2=self.upgrades2[u2])
+
+    def rank(self, results, key="totalProfit", top=10, exact=False):
+        """
+        Finds the best setups of the grid.
+        If the same upgrades are in both slots, only one order of each upgrade pair is ranked.
+
+        Parameters
+        ----------
+        results : dict
+            Output of self.evaluate().
+        key : str, optional
+            Result to rank on, highest first. The default is "totalProfit".
+        top : int, optional
+            Amount of setups to return. The default is 10.
+        exact : bool, optional
+            Toggle to recalculate the top setups with engine.evaluate() and sort them again on the exact values.
+            The values in the output are then engine.Result objects. The default is False.
+
+        Returns
+        -------
+        ranking : list
+            List of (engine.Setup, value) tuples, best first.
+
+        """
+        values = np.array(results[key], dtype=float)
+        if self.upgrades1 == self.upgrades2:
+            values[..., np.tril_indices(len(self.upgrades1), -1)[0], np.tril_indices(len(self.upgrades1), -1)[1]] = np.nan
+        flat = np.where(np.isnan(values), -np.inf, values).ravel()
+        top = min(top, int(np.isfinite(flat).sum()))
+        best = np.argpartition(-flat, top - 1)[:top] if top > 0 else np.array([], dtype=int)
+        best = best[np.argsort(-flat[best], kind="stable")]
+        ranking = [(self.get_setup(np.unravel_index(i, values.shape)), flat[i]) for i in best]
+        if exact:
+            ranking = [(setup, engine.evaluate(setup)) for setup, value in ranking]
+            ranking.sort(key=lambda x: getattr(x[1], key), reverse=True)
+        return ranking
@@ -0,0 +1,473 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 21:12:40 2026
+
+@author: Herodirk
+
+Bazaar data handling of the minion calculator.
+Contains:
+    BazaarStream class and parse_bazaar(), parse the API response while it downloads and keep only the tracked products
+    Functions to call the Hypixel API bazaar endpoint and to load bazaar snapshots
+    PriceBook class, the immutable buy and sell prices of one bazaar response
+    BazaarRefresher class, calls the API on a background thread and publishes new price books
+
+The refresher thread never changes md.itemList,
+the thread that calculates puts a new price book into md.itemList with PriceBook.apply() between calculations.
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+import codecs
+import gzip
+import json
+import os
+import re
+import threading
+import HSB_minion_data as md
+
+bazaar_url = r"https://api.hypixel.net/v2/skyblock/bazaar"
+api_timeout = 10  # seconds
+whitespace = re.compile(r"[ \t\n\r]*")
+
+#%% price books
+
+
+@dataclass(frozen=True)
+class PriceBook:
+    """
+    Immutable buy and sell prices of one bazaar response.
+    lastUpdated is the time of the bazaar data in seconds,
+    prices has item IDs with read-only {"buyPrice": float, "sellPrice": float} dictionaries.
+    """
+    lastUpdated: float
+    prices: MappingProxyType
+
+    def apply(self):
+        """
+        Puts the prices into md.itemList.
+        Only call this from the thread that calculates, not while a calculation is running.
+
+        Returns
+        -------
+        None.
+
+        """
+        for ID, item_prices in self.prices.items():
+            md.itemList[ID]["prices"].update(item_prices)
+        return
+
+
+def make_price_book(raw_data, top_percent=0.1):
+    """
+    Handles bazaar data to calculate accurate buy and sell prices of the items in md.itemList.
+    To get accurate prices, it takes a top percentage (top 10% default) of the orders and takes the average of them.
+    The orders of every product and action are put into one array,
+    so the top percentage of all products is calculated at once with cumulative sums.
+
+    Parameters
+    ----------
+    raw_data : dict
+        Response of the Hypixel API bazaar endpoint.
+    top_percent : float, optional
+        Fraction of the order volume to average over. The default is 0.1.
+
+    Returns
+    -------
+    PriceBook
+        Prices of the response.
+
+    """
+    # imported here, so importing this file does not import numpy
+    import numpy as np
+    products = [itemtype for itemtype in md.itemList.keys() if itemtype in raw_data["products"]]
+    summaries = [raw_data["products"][itemtype][f"{action}_summary"] for itemtype in products for action in ["buy", "sell"]]
+    lengths = np.array([len(summary) for summary in summaries], dtype=int)
+    amounts = np.array([order["amount"] for summary in summaries for order in summary], dtype=float)
+    unit_prices = np.array([order["pricePerUnit"] for summary in summaries for order in summary], dtype=float)
+    segments = np.repeat(np.arange(len(summaries)), lengths)
+
+    # amount of each summary before each order, the orders are sorted from best to worst price
+    totals = np.bincount(segments, weights=amounts, minlength=len(summaries))
+    before = np.cumsum(amounts) - amounts - (np.cumsum(totals) - totals)[segments]
+    top_amounts = top_percent * totals
+    # each order counts up to the amount that is left of the top percentage of its summary
+    counted = np.clip(np.repeat(top_amounts, lengths) - before, 0, amounts)
+    top_sums = np.bincount(segments, weights=counted * unit_prices, minlength=len(summaries))
+    averages = np.divide(top_sums, top_amounts, out=np.zeros(len(summaries)), where=top_amounts != 0)
+
+    prices = {itemtype: MappingProxyType({"buyPrice": float(averages[2 * i]), "sellPrice": float(averages[2 * i + 1])})
+              for i, itemtype in enumerate(products)}
+    return PriceBook(raw_data["lastUpdated"] / 1000, MappingProxyType(prices))
+
+#%% streaming parser
+
+
+class BazaarStream():
+    def __init__(self, f, tee=None, chunksize=65536):
+        """
+        Reads a bazaar API response in chunks and decodes one JSON value at a time,
+        so the whole response never has to be in memory as text or as a JSON tree.
+
+        Parameters
+        ----------
+        f : file-like object
+            Binary stream of the response, like the result of urllib.request.urlopen() or gzip.open().
+        tee : file-like object, optional
+            Binary stream that gets a copy of every chunk, to save the response while parsing. The default is None.
+        chunksize : int, optional
+            Amount of bytes per read. The default is 65536.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.f = f
+        self.tee = tee
+        self.chunksize = chunksize
+        self.utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.decoder = json.JSONDecoder()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+        return
+
+    def read_more(self):
+        """
+        Reads the next chunk into self.text and drops the parsed part of self.text.
+
+        Returns
+        -------
+        bool
+            False if the stream has ended.
+
+        """
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunksize)
+        if self.tee is not None and chunk:
+            self.tee.write(chunk)
+        self.eof = not chunk
+        self.text = self.text[self.pos:] + self.utf8.decode(chunk, final=self.eof)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """
+        Skips whitespace and returns the next character, "" at the end of the stream.
+
+        Returns
+        -------
+        str
+            Next character.
+
+        """
+        while True:
+            self.pos = whitespace.match(self.text, self.pos).end()
+            if self.pos < len(self.text) or not self.read_more():
+                return self.text[self.pos:self.pos + 1]
+
+    def expect(self, character):
+        """
+        Skips the next character, which has to be character.
+
+        Parameters
+        ----------
+        character : str
+            Expected character.
+
+        Returns
+        -------
+        None.
+
+        """
+        if self.peek() != character:
+            raise ValueError(f"Expected {character!r} at character {self.pos} of the bazaar data")
+        self.pos += 1
+        return
+
+    def value(self):
+        """
+        Decodes the next JSON value.
+        A value that ends at the end of the read text could be cut off (like a number), so then more is read first.
+
+        Returns
+        -------
+        object
+            Decoded value.
+
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.text, self.pos)
+                if end < len(self.text) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.read_more()
+
+    def members(self):
+        """
+        Iterates over the keys of the next JSON object.
+        The value of each key has to be read with self.value() before the next key.
+
+        Yields
+        ------
+        key : str
+            Key of the member.
+
+        """
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+def parse_bazaar(f, tracked=None, tee=None):
+    """
+    Parses a bazaar API response from a binary stream and keeps only the products that are tracked.
+    Every product is decoded and dropped on its own, the products that are not tracked are not kept.
+
+    Parameters
+    ----------
+    f : file-like object
+        Binary stream of the response.
+    tracked : set, optional
+        Product IDs to keep. The default is every item in md.itemList.
+    tee : file-like object, optional
+        Binary stream that gets a copy of the response. The default is None.
+
+    Returns
+    -------
+    raw_data : dict
+        The response with only the tracked products in raw_data["products"].
+
+    """
+    tracked = md.itemList if tracked is None else tracked
+    stream = BazaarStream(f, tee)
+    raw_data = {}
+    for key in stream.members():
+        if key != "products":
+            raw_data[key] = stream.value()
+            continue
+        raw_data["products"] = {}
+        for product_ID in stream.members():
+            product = stream.value()
+            if product_ID in tracked:
+                raw_data["products"][product_ID] = product
+    # read to the end, so the copy in tee is complete
+    while stream.read_more():
+        pass
+    return raw_data
+
+#%% API calls and snapshots
+
+
+def fetch_bazaar(url=bazaar_url, snapshot_file=None):
+    """
+    Calls the Hypixel API for the most recent bazaar data and parses it while it downloads.
+    The response gets saved compressed to snapshot_file if the call was successful.
+    Writes to a temporary file first, so a crash while saving does not break the last snapshot.
+
+    Parameters
+    ----------
+    url : str, optional
+        URL of the bazaar endpoint. The default is bazaar_url.
+    snapshot_file : str, optional
+        Path to save the response to, None to not save it. The default is None.
+
+    Returns
+    -------
+    raw_data : dict or None
+        Response with the products of md.itemList, None if the call failed.
+
+    """
+    # imported here, urllib.request takes longer to import than the rest of the calculator
+    import urllib.request
+    tee = None
+    try:
+        with urllib.request.urlopen(url, timeout=api_timeout) as f:
+            if snapshot_file is not None:
+                try:
+                    tee = gzip.open(snapshot_file + ".tmp", "wb")
+                except OSError as error:
+                    print(f"WARNING: Could not save bazaar snapshot\n{error}")
+            raw_data = parse_bazaar(f, tee=tee)
+    except Exception as error:
+        print(f"ERROR: Could not finish API call\n{error}")
+        raw_data = None
+    finally:
+        if tee is not None:
+            tee.close()
+    if raw_data is not None and ("success" not in raw_data or raw_data["success"] is False):
+        print("ERROR: API call was unsuccessful")
+        raw_data = None
+    if raw_data is None:
+        # a failed call leaves a partial snapshot behind
+        if tee is not None:
+            try:
+                os.remove(snapshot_file + ".tmp")
+            except OSError:
+                pass
+        return None
+    if tee is not None:
+        try:
+            os.replace(snapshot_file + ".tmp", snapshot_file)
+        except OSError as error:
+            print(f"WARNING: Could not save bazaar snapshot\n{error}")
+    return raw_data
+
+
+def load_snapshot(snapshot_file):
+    """
+    Loads a bazaar snapshot saved by fetch_bazaar().
+
+    Parameters
+    ----------
+    snapshot_file : str
+        Path of the snapshot.
+
+    Returns
+    -------
+    raw_data : dict or None
+        Bazaar response with the products of md.itemList, None if there is no readable snapshot.
+
+    """
+    if not os.path.isfile(snapshot_file):
+        return None
+    try:
+        with gzip.open(snapshot_file, "rb") as f:
+            raw_data = parse_bazaar(f)
+    except (OSError, ValueError) as error:
+        print(f"WARNING: Could not load bazaar snapshot\n{error}")
+        return None
+    return raw_data
+
+#%% background refresher
+
+
+class BazaarRefresher():
+    def __init__(self, snapshot_file=None, interval=60, auto=True, url=bazaar_url, top_percent=0.1, history=None):
+        """
+        Calls the bazaar API on a background thread and publishes the result as a new PriceBook in self.price_book.
+        The price book gets replaced in one assignment, so readers always get a complete price book.
+
+        Parameters
+        ----------
+        snapshot_file : str, optional
+            Path to save every response to, None to not save snapshots. The default is None.
+        interval : float, optional
+            Seconds between API calls when auto is True. The default is 60.
+        auto : bool, optional
+            Toggle to call the API every interval, otherwise it only calls when request_refresh() is used. The default is True.
+        url : str, optional
+            URL of the bazaar endpoint. The default is bazaar_url.
+        top_percent : float, optional
+            Fraction of the order volume to average over, see make_price_book(). The default is 0.1.
+        history : history.PriceHistory, optional
+            History to append every new price book to, None to not keep a history. The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.snapshot_file = snapshot_file
+        self.interval = interval
+        self.auto = auto
+        self.url = url
+        self.top_percent = top_percent
+        self.history = history
+        self.price_book = None
+        self.wake_event = threading.Event()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="BazaarRefresher", daemon=True)
+        return
+
+    def start(self):
+        """
+        Starts the background thread.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.thread.start()
+        return
+
+    def request_refresh(self):
+        """
+        Asks the background thread to call the API now, does not wait for the call.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.wake_event.set()
+        return
+
+    def stop(self):
+        """
+        Stops the background thread after its current API call.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.stop_event.set()
+        self.wake_event.set()
+        return
+
+    def refresh(self):
+        """
+        Calls the API, saves the snapshot, appends the prices to the history and publishes the new price book.
+
+        Returns
+        -------
+        bool
+            True if a new price book was published.
+
+        """
+        raw_data = fetch_bazaar(self.url, self.snapshot_file)
+        if raw_data is None:
+            return False
+        price_book = make_price_book(raw_data, self.top_percent)
+        if self.history is not None:
+            try:
+                self.history.append(price_book)
+            except OSError as error:
+                print(f"WARNING: Could not save bazaar history\n{error}")
+        self.price_book = price_book
+        return True
+
+    def run(self):
+        """
+        Loop of the background thread.
+
+        Returns
+        -------
+        None.
+
+        """
+        while not self.stop_event.is_set():
+            self.wake_event.wait(self.interval if self.auto else None)
+            self.wake_event.clear()
+            if self.stop_event.is_set():
+                break
+            self.refresh()
+        return
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 00:06:44 2026
+
+@author: Herodirk
+
+Local stand-in for the Hypixel API bazaar endpoint, to test and benchmark the bazaar refresh without the real API.
+Serves recorded responses (like bazaar snapshots) in turn, or a synthetic bazaar with any amount of products and orders.
+Every response can be delayed and a part of the responses can fail.
+Failure kinds:
+    "error": HTTP 503 response
+    "unsuccessful": {"success": false} response, like a bad API call
+    "truncated": the connection closes halfway through the response
+
+Example:
+    import bazaar_server
+    server = bazaar_server.BazaarServer(products=10000, depth=100, latency=0.5, failure_rate=0.1)
+    server.start()
+    raw_data = bazaar.fetch_bazaar(server.url)
+    server.stop()
+Or from the command line:
+    python bazaar_server.py --products 10000 --depth 100 --latency 0.5 --failure-rate 0.1
+Then set bazaar_url in main.py to the printed URL.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+import HSB_minion_data as md
+
+failure_kinds = ["error", "unsuccessful", "truncated"]
+
+#%% payloads
+
+
+def synthetic_products(products=2000, depth=30, seed=0):
+    """
+    Generates the "products" of a bazaar response as JSON.
+    The items of md.itemList come first, the rest of the products get made up IDs.
+
+    Parameters
+    ----------
+    products : int, optional
+        Amount of products. The default is 2000.
+    depth : int, optional
+        Highest amount of orders in each buy and sell summary, the real API gives up to 30. The default is 30.
+    seed : int, optional
+        Seed of the random prices and amounts. The default is 0.
+
+    Returns
+    -------
+    bytes
+        JSON object with the products.
+
+    """
+    rng = random.Random(seed)
+    IDs = list(md.itemList.keys())[:products]
+    IDs += [f"SYNTHETIC_ITEM_{i}" for i in range(products - len(IDs))]
+    parts = []
+    for ID in IDs:
+        price = rng.uniform(1, 100000)
+        summaries = {}
+        for action, direction in [("sell_summary", -1), ("buy_summary", 1)]:
+            orders = []
+            order_price = price
+            for i in range(rng.randint(0, depth)):
+                orders.append({"amount": rng.randint(1, 100000), "pricePerUnit": round(order_price, 1), "orders": rng.randint(1, 50)})
+                order_price = max(order_price * (1 + direction * rng.uniform(0, 0.01)), 0.1)
+            summaries[action] = orders
+        quick_status = {"productId": ID, "sellPrice": price, "sellVolume": sum(order["amount"] for order in summaries["sell_summary"]),
+                        "sellMovingWeek": rng.randint(0, 10 ** 8), "sellOrders": len(summaries["sell_summary"]),
+                        "buyPrice": price, "buyVolume": sum(order["amount"] for order in summaries["buy_summary"]),
+                        "buyMovingWeek": rng.randint(0, 10 ** 8), "buyOrders": len(summaries["buy_summary"])}
+        product = {"product_id": ID, **summaries, "quick_status": quick_status}
+        parts.append(json.dumps(ID) + ":" + json.dumps(product, separators=(",", ":")))
+    return ("{" + ",".join(parts) + "}").encode("utf-8")
+
+
+def recorded_products(path):
+    """
+    Loads the "products" of a recorded bazaar response, like a bazaar snapshot.
+
+    Parameters
+    ----------
+    path : str
+        Path of a .json or .json.gz response.
+
+    Returns
+    -------
+    bytes
+        JSON object with the products.
+
+    """
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rb") as f:
+        raw_data = json.loads(f.read().decode("utf-8"))
+    return json.dumps(raw_data["products"], separators=(",", ":")).encode("utf-8")
+
+#%% server
+
+
+class BazaarServer():
+    def __init__(self, host="127.0.0.1", port=0, recordings=None, products=2000, depth=30, seed=0,
+                 latency=0, jitter=0, failure_rate=0, failures=None):
+        """
+        Prepares the responses of the server.
+
+        Parameters
+        ----------
+        host : str, optional
+            Address to listen on. The default is "127.0.0.1".
+        port : int, optional
+            Port to listen on, 0 for a free port. The default is 0.
+        recordings : list, optional
+            Paths of recorded responses to serve in turn, None for a synthetic bazaar. The default is None.
+        products : int, optional
+            Amount of products of the synthetic bazaar. The default is 2000.
+        depth : int, optional
+            Highest amount of orders per summary of the synthetic bazaar. The default is 30.
+        seed : int, optional
+            Seed of the synthetic bazaar and the failures. The default is 0.
+        latency : float, optional
+            Seconds to wait before each response. The default is 0.
+        jitter : float, optional
+            Random extra seconds to wait, up to this amount. The default is 0.
+        failure_rate : float, optional
+            Fraction of the responses that fail. The default is 0.
+        failures : list, optional
+            Failure kinds to pick from, see failure_kinds. The default is all failure kinds.
+
+        Returns
+        -------
+        None.
+
+        """
+        if recordings:
+            self.payloads = [recorded_products(path) for path in recordings]
+        else:
+            self.payloads = [synthetic_products(products, depth, seed)]
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failures = list(failure_kinds) if failures is None else list(failures)
+        self.rng = random.Random(seed)
+        self.lock = threading.Lock()
+        self.requests = 0
+        self.failed = 0
+        self.httpd = ThreadingHTTPServer((host, port), self.make_handler())
+        self.httpd.daemon_threads = True
+        self.thread = None
+        return
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/v2/skyblock/bazaar"
+
+    def next_response(self):
+        """
+        Picks the payload, delay and failure of the next response.
+
+        Returns
+        -------
+        payload : bytes
+            Products of the response.
+        delay : float
+            Seconds to wait.
+        failure : str or None
+            Failure kind, None for a normal response.
+
+        """
+        with self.lock:
+            payload = self.payloads[self.requests % len(self.payloads)]
+            self.requests += 1
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            failure = None
+            if self.failures and self.rng.random() < self.failure_rate:
+                failure = self.rng.choice(self.failures)
+                self.failed += 1
+        return payload, delay, failure
+
+    def make_handler(self):
+        """
+        Makes the request handler class of the server.
+
+        Returns
+        -------
+        class
+            Subclass of http.server.BaseHTTPRequestHandler.
+
+        """
+        server = self
+
+        class BazaarHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                payload, delay, failure = server.next_response()
+                time.sleep(delay)
+                if failure == "error":
+                    self.send_error(503, "Service Unavailable")
+                    return
+                if failure == "unsuccessful":
+                    body = b'{"success":false,"cause":"Stand-in failure"}'
+                else:
+                    body = b'{"success":true,"lastUpdated":%d,"products":%s}' % (int(time.time() * 1000), payload)
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if failure == "truncated":
+                    body = body[:len(body) // 2]
+                    self.close_connection = True
+                self.wfile.write(body)
+                return
+
+            def log_message(self, format, *args):
+                return
+
+        return BazaarHandler
+
+    def start(self):
+        """
+        Starts serving on a background thread.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.thread = threading.Thread(target=self.httpd.serve_forever, name="BazaarServer", daemon=True)
+        self.thread.start()
+        return
+
+    def stop(self):
+        """
+        Stops serving and closes the socket.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        return
+
+#%% Main stuff
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local stand-in for the Hypixel API bazaar endpoint")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--replay", nargs="*", default=None, help="recorded responses (.json or .json.gz) to serve in turn")
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--depth", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", type=float, default=0)
+    parser.add_argument("--jitter", type=float, default=0)
+    parser.add_argument("--failure-rate", type=float, default=0)
+    parser.add_argument("--failures", nargs="*", default=None, choices=failure_kinds)
+    args = parser.parse_args()
+    stand_in = BazaarServer(args.host, args.port, args.replay, args.products, args.depth, args.seed,
+                            args.latency, args.jitter, args.failure_rate, args.failures)
+    print(f"Serving bazaar stand-in at {stand_in.url}")
+    try:
+        stand_in.httpd.serve_forever()
+    except KeyboardInterrupt:
+        stand_in.httpd.server_close()
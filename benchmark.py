@@ -0,0 +1,439 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 01:02:17 2026
+
+@author: Herodirk
+
+Benchmark suite of the minion calculator.
+Times the hot paths, saves the times as a baseline and flags every benchmark that got slower than the baseline by more than a threshold.
+The imports also have a fixed budget in import_budgets, so a process that only calculates setups keeps starting fast.
+Benchmarks:
+    import: imports of HSB_minion_data, engine, bazaar, report and main in a new interpreter
+    bazaar: bazaar.parse_bazaar() and bazaar.make_price_book() on recorded responses, or a synthetic bazaar
+    batch: compile and evaluate of a batch.BatchEvaluator of every minion, fuel and upgrade pair
+    engine: engine.evaluate() of every minion in md.minionList at its highest tier
+    setup_id: setup_id.encode()/decode() round trips, and encode_many()/decode_many() of many setups
+    gui: Calculator boot, calculate() of every minion in md.minionList, constructID()/decodeID() round trips,
+         output_data() and fancyOutput(), needs a display, extras on top of the engine and setup_id benchmarks
+The gui benchmarks use a local bazaar_server.BazaarServer and temporary snapshot and history files, so they never call the real API.
+Every benchmark is the best time of a few repeats, which is the least affected by other programs.
+Short benchmarks are called many times per repeat, so every repeat takes at least min_time,
+and the whole suite runs a few rounds, so a slow minute of the machine does not slow down all repeats of a benchmark.
+Times are only comparable on the same machine, the baseline records its Python version and platform and compare() warns when they differ.
+On another machine or in CI, save a baseline on the commit before the changes and compare the changes to it in the same job:
+    git checkout <base commit> && python benchmark.py --save --baseline base.json
+    git checkout <changes> && python benchmark.py --baseline base.json
+
+Example:
+    python benchmark.py --save                       (saves the baseline)
+    python benchmark.py                              (compares to the baseline, exit code 1 if something regressed)
+    python benchmark.py --only bazaar batch --threshold 0.1
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import timeit
+import numpy as np
+import HSB_minion_data as md
+import engine
+import batch
+import bazaar
+import bazaar_server
+import setup_id
+
+baseline_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_baseline.json")
+regression_threshold = 0.2  # fraction slower than the baseline that counts as a regression
+min_time = 0.1  # seconds of every repeat of a benchmark, shorter repeats are too noisy for the threshold
+import_modules = ["HSB_minion_data", "engine", "bazaar", "report", "main"]
+# seconds with cached bytecode, about 1.5 times the measured time (4, 27, 37 and 37 ms with Python 3.11 on Linux)
+# engine and HSB_minion_data must not import numpy, tkinter or network modules, report and main only import numpy in the bulk paths
+import_budgets = {"import HSB_minion_data": 0.006, "import engine": 0.04, "import report": 0.055, "import main": 0.055}
+
+
+def measure(function, repeat=5, number=None):
+    """
+    Best time of one call of a function.
+
+    Parameters
+    ----------
+    function : callable
+        Function without arguments.
+    repeat : int, optional
+        Amount of measurements. The default is 5.
+    number : int, optional
+        Amount of calls per measurement. The default is enough calls for min_time seconds.
+
+    Returns
+    -------
+    float
+        Seconds per call.
+
+    """
+    timer = timeit.Timer(function)
+    if number is None:
+        # the first call also warms up caches and is not counted
+        number = max(int(min_time / max(timer.timeit(1), 1e-9)), 1)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def measure_many(functions, repeat=5):
+    """
+    Best time of one call of every function, the repeats of the functions take turns.
+    Spreads the repeats of short benchmarks over the whole group, so a slow moment of the machine does not slow down all of them.
+
+    Parameters
+    ----------
+    functions : dict
+        Benchmark names with functions without arguments.
+    repeat : int, optional
+        Amount of measurements per function. The default is 5.
+
+    Returns
+    -------
+    dict
+        Benchmark names with seconds per call.
+
+    """
+    timers = {name: timeit.Timer(function) for name, function in functions.items()}
+    numbers = {name: max(int(min_time / max(timer.timeit(1), 1e-9)), 1) for name, timer in timers.items()}
+    times = {name: float("inf") for name in timers.keys()}
+    for i in range(repeat):
+        for name, timer in timers.items():
+            times[name] = min(times[name], timer.timeit(numbers[name]) / numbers[name])
+    return times
+
+
+def bazaar_payloads(recordings=None):
+    """
+    Bazaar responses to benchmark with.
+
+    Parameters
+    ----------
+    recordings : list, optional
+        Paths of recorded responses (.json or .json.gz). The default is a synthetic bazaar of 2000 products.
+
+    Returns
+    -------
+    payloads : dict
+        Names with the responses as bytes.
+
+    """
+    payloads = {}
+    for path in recordings or []:
+        with open(path, "rb") as f:
+            data = f.read()
+        payloads[os.path.basename(path)] = gzip.decompress(data) if path.endswith(".gz") else data
+    if not payloads:
+        payloads["synthetic"] = b'{"success":true,"lastUpdated":0,"products":%s}' % bazaar_server.synthetic_products(2000, 30, seed=0)
+    return payloads
+
+#%% benchmarks
+
+
+def bench_import(repeat=5, recordings=None):
+    """
+    Imports of the modules in import_modules, in a new interpreter every time.
+
+    Returns
+    -------
+    dict
+        Benchmark names with seconds.
+
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+    times = {}
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # cached bytecode in a separate directory, also when PYTHONDONTWRITEBYTECODE is set
+        env = {key: value for key, value in os.environ.items() if key != "PYTHONDONTWRITEBYTECODE"}
+        env["PYTHONPYCACHEPREFIX"] = cache_dir
+        for module in import_modules:
+            code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+            try:
+                # the first import compiles the bytecode and is not counted
+                runs = [float(subprocess.run([sys.executable, "-c", code], cwd=directory, env=env, capture_output=True,
+                                             text=True, check=True).stdout) for i in range(repeat + 1)]
+                times[f"import {module}"] = min(runs[1:])
+            except subprocess.CalledProcessError as error:
+                print(f"WARNING: Could not import {module}\n{error.stderr}")
+    return times
+
+
+def bench_bazaar(repeat=5, recordings=None):
+    """
+    Parsing of bazaar responses and calculating the price books.
+
+    Parameters
+    ----------
+    recordings : list, optional
+        Paths of recorded responses (.json or .json.gz). The default is a synthetic bazaar of 2000 products.
+
+    Returns
+    -------
+    dict
+        Benchmark names with seconds.
+
+    """
+    functions = {}
+    for name, data in bazaar_payloads(recordings).items():
+        raw_data = bazaar.parse_bazaar(io.BytesIO(data))
+        functions[f"bazaar parse ({name})"] = lambda data=data: bazaar.parse_bazaar(io.BytesIO(data))
+        functions[f"bazaar price book ({name})"] = lambda raw_data=raw_data: bazaar.make_price_book(raw_data)
+    return measure_many(functions, repeat)
+
+
+def bench_batch(repeat=5, recordings=None):
+    """
+    Batch evaluation of every minion at its highest tier with every fuel and upgrade pair.
+
+    Returns
+    -------
+    dict
+        Benchmark names with seconds.
+
+    """
+    setup = engine.Setup(hopper="Best (NPC/Bazaar)")
+    batch_eval = batch.BatchEvaluator(setup)
+    setups = np.size(batch_eval.evaluate()["totalProfit"])
+    times = measure_many({"batch compile": lambda: batch.BatchEvaluator(setup), "batch evaluate": batch_eval.evaluate}, repeat)
+    print(f"BENCHMARK: batch evaluate of {setups} setups, {setups / times['batch evaluate']:.0f} setups/s")
+    return times
+
+
+def bench_engine(repeat=5, recordings=None):
+    """
+    engine.evaluate() of every minion at its highest tier, without the result cache of the calculator.
+
+    Returns
+    -------
+    dict
+        Benchmark names with seconds.
+
+    """
+    functions = {}
+    for minion in md.minionList.keys():
+        setup = engine.Setup(minion=minion, miniontier=list(md.minionList[minion]["speed"].keys())[-1], hopper="Best (NPC/Bazaar)")
+        functions[f"evaluate ({minion})"] = lambda setup=setup: engine.evaluate(setup)
+    return measure_many(functions, repeat)
+
+
+def bench_setup_id(repeat=5, recordings=None):
+    """
+    Setup ID round trips of single setups and of many setups at once.
+
+    Returns
+    -------
+    dict
+        Benchmark names with seconds.
+
+    """
+    setups = [engine.Setup(minion=minion, miniontier=list(md.minionList[minion]["speed"].keys())[-1], fuel=fuel, afkpet=2.5)
+              for minion in md.minionList.keys() for fuel in md.fuel_options.keys()]
+    times = measure_many({"setup_id encode/decode": lambda: [setup_id.decode(setup_id.encode(setup)) for setup in setups],
+                          f"setup_id encode_many/decode_many ({len(setups)})": lambda: setup_id.decode_many(setup_id.encode_many(setups))}, repeat)
+    times["setup_id encode/decode"] /= len(setups)
+    return times
+
+
+def bench_gui(repeat=5, recordings=None):
+    """
+    Calculator boot, calculate() of every minion, setup ID round trips and output rendering.
+    Skipped if there is no display.
+
+    Returns
+    -------
+    dict
+        Benchmark names with seconds.
+
+    """
+    import tkinter as tk
+    import main
+    stand_in = bazaar_server.BazaarServer(recordings=recordings)
+    stand_in.start()
+    temp_dir = tempfile.TemporaryDirectory()
+    main.bazaar_url = stand_in.url
+    main.bazaar_auto_update = False
+    main.bazaar_snapshot_file = os.path.join(temp_dir.name, "bazaar_snapshot.json.gz")
+    main.bazaar_history_dir = os.path.join(temp_dir.name, "bazaar_history")
+
+    def boot():
+        calc = main.Calculator()
+        calc.refresher.stop()
+        calc.destroy()
+        return
+
+    times = {}
+    try:
+        try:
+            times["Calculator boot"] = measure(boot, max(repeat // 2, 1))
+        except tk.TclError as error:
+            print(f"WARNING: Skipping gui benchmarks, no display\n{error}")
+            return times
+        calc = main.Calculator()
+
+        def calculate():
+            calc.evaluator.clear()
+            calc.result_cache.clear()
+            calc.calculate(inGUI=False)
+            return
+
+        for minion in md.minionList.keys():
+            calc.variables["minion"]["var"].set(minion)
+            calc.load_minion(minion)
+            times[f"calculate ({minion})"] = measure(calculate, repeat)
+        times["constructID/decodeID"] = measure(lambda: calc.decodeID(calc.constructID()), repeat)
+        times["output_data"] = measure(lambda: calc.output_data(toTerminal=False), repeat)
+        times["fancyOutput"] = measure(lambda: calc.fancyOutput(toTerminal=False), repeat)
+        calc.refresher.stop()
+        calc.destroy()
+    finally:
+        stand_in.stop()
+        temp_dir.cleanup()
+    return times
+
+
+benchmarks = {"import": bench_import, "bazaar": bench_bazaar, "batch": bench_batch, "engine": bench_engine, "setup_id": bench_setup_id,
+              "gui": bench_gui}
+
+#%% baselines
+
+
+def run(only=None, repeat=5, recordings=None, rounds=5):
+    """
+    Runs the benchmarks, with the prices of the first bazaar response in md.itemList.
+    Every benchmark gets the best time of all rounds.
+
+    Parameters
+    ----------
+    only : list, optional
+        Keys of benchmarks to run. The default is all benchmarks.
+    repeat : int, optional
+        Amount of measurements per benchmark. The default is 5.
+    recordings : list, optional
+        Paths of recorded bazaar responses. The default is a synthetic bazaar.
+    rounds : int, optional
+        Amount of times that all benchmarks are run. The default is 5.
+
+    Returns
+    -------
+    results : dict
+        Benchmark names with seconds.
+
+    """
+    # prices of the first bazaar response, so the calculations price every item like with real bazaar data
+    payload = list(bazaar_payloads(recordings).values())[0]
+    bazaar.make_price_book(bazaar.parse_bazaar(io.BytesIO(payload))).apply()
+    results = {}
+    skipped = set()
+    for round_number in range(rounds):
+        for key, function in benchmarks.items():
+            if (only is not None and key not in only) or key in skipped:
+                continue
+            print(f"BENCHMARK: Running {key}, round {round_number + 1} of {rounds}")
+            times = function(repeat, recordings)
+            if not times:
+                # skipped groups, like gui without a display, are not run again
+                skipped.add(key)
+            for name, seconds in times.items():
+                results[name] = min(results.get(name, seconds), seconds)
+    return results
+
+
+def save_baseline(results, path=baseline_file):
+    """
+    Saves benchmark results as the baseline, together with the Python version and platform.
+    Baselines of benchmarks that are not in results are kept.
+
+    Parameters
+    ----------
+    results : dict
+        Benchmark names with seconds.
+    path : str, optional
+        Path of the baseline. The default is baseline_file.
+
+    Returns
+    -------
+    None.
+
+    """
+    baseline = {"python": platform.python_version(), "platform": platform.platform(), "results": {}}
+    # keep the baselines of benchmarks that did not run
+    if os.path.isfile(path):
+        with open(path, "r") as f:
+            baseline["results"].update(json.load(f)["results"])
+    baseline["results"].update(results)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=1)
+    return
+
+
+def compare(results, path=baseline_file, threshold=regression_threshold):
+    """
+    Compares benchmark results to the baseline and to import_budgets and prints the change of every benchmark.
+
+    Parameters
+    ----------
+    results : dict
+        Benchmark names with seconds.
+    path : str, optional
+        Path of the baseline. The default is baseline_file.
+    threshold : float, optional
+        Fraction slower than the baseline that counts as a regression. The default is regression_threshold.
+
+    Returns
+    -------
+    regressions : list
+        Names of the benchmarks that regressed or are over their budget.
+
+    """
+    if not os.path.isfile(path):
+        print(f"WARNING: No baseline at {path}, save one with --save")
+        baseline = {"results": {}}
+    else:
+        with open(path, "r") as f:
+            baseline = json.load(f)
+        if baseline.get("python") != platform.python_version() or baseline.get("platform") != platform.platform():
+            print(f"WARNING: Baseline was made with Python {baseline.get('python')} on {baseline.get('platform')}")
+    regressions = []
+    for name, seconds in results.items():
+        line = f"{name:<40} {seconds * 1000:12.4f} ms"
+        if name in baseline["results"]:
+            change = seconds / baseline["results"][name] - 1
+            line += f"   baseline {baseline['results'][name] * 1000:12.4f} ms   {change:+7.1%}"
+            if change > threshold:
+                line += "   REGRESSION"
+                regressions.append(name)
+        if name in import_budgets and seconds > import_budgets[name]:
+            line += f"   OVER BUDGET ({import_budgets[name] * 1000:.0f} ms)"
+            if name not in regressions:
+                regressions.append(name)
+        print(line)
+    if regressions:
+        print(f"WARNING: {len(regressions)} benchmarks are more than {threshold:.0%} slower than the baseline or over their budget")
+    return regressions
+
+#%% Main stuff
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark suite of the minion calculator")
+    parser.add_argument("--only", nargs="*", choices=list(benchmarks.keys()), default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--recordings", nargs="*", default=None, help="recorded bazaar responses (.json or .json.gz)")
+    parser.add_argument("--baseline", default=baseline_file)
+    parser.add_argument("--threshold", type=float, default=regression_threshold)
+    parser.add_argument("--save", action="store_true", help="save the results as the baseline")
+    args = parser.parse_args()
+    bench_results = run(args.only, args.repeat, args.recordings, args.rounds)
+    if args.save:
+        save_baseline(bench_results, args.baseline)
+        print(f"BENCHMARK: Saved baseline to {args.baseline}")
+    else:
+        sys.exit(1 if compare(bench_results, args.baseline, args.threshold) else 0)
@@ -0,0 +1,1229 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 14:02:11 2026
+
+@author: Herodirk
+
+Headless calculation engine of the minion calculator.
+This file does not use tkinter, it can be used without the GUI of main.py.
+Contains:
+    Lookup lists for hoppers and bazaar transaction types
+    Setup class, a plain version of all the inputs of the calculator
+    Result class, the outputs of one calculation
+    Functions for prices, fuel prices, pet xp, Golden Dragon xp and the time span
+    Functions for the speed, drop multipliers, actions per harvest and base drops of a setup
+    Function to compact items with the compiled compaction steps
+    Calculation stages with their dependency graph
+    evaluate(), the main calculation
+    Evaluator class, an incremental evaluate() that only reruns changed stages
+    ResultCache class, a bounded least recently used cache of results
+
+Example:
+    import engine
+    result = engine.evaluate(engine.Setup(minion="Cobblestone", miniontier=12, hopper="Best (NPC/Bazaar)"))
+    print(result.totalProfit)
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields, replace
+import HSB_minion_data as md
+import profiler
+
+#%% Lists
+
+bazaar_buy_types = {"Buy Order": "sellPrice", "Insta Buy": "buyPrice", "Custom": "custom"}
+bazaar_sell_types = {"Sell Offer": "buyPrice", "Insta Sell": "sellPrice", "Custom": "custom"}
+
+warned = set()  # (item ID, message) of the price warnings that were printed, every warning is printed once
+
+hopper_data = {
+    "None": 1,
+    "Budget Hopper": 0.5,
+    "Enchanted Hopper": 0.9,
+    "NPC": 1,
+    "Bazaar": 1,
+    "Best (NPC/Bazaar)": 1
+}
+
+time_lengths = {"Years": 31536000, "Weeks": 604800, "Days": 86400, "Hours": 3600, "Minutes": 60, "Seconds": 1}
+
+#%% Setup and Result
+
+
+@dataclass
+class Setup:
+    """
+    All inputs of one calculation.
+    The attribute names and initial values are the same as the "input" variables of the calculator,
+    with timeamount and timelength for the time span.
+    """
+    minion: str = "Custom"
+    miniontier: int = 12
+    amount: int = 1
+    fuel: str = "None"
+    infernoGrade: str = "Hypergolic Gabagool"
+    infernoDistilate: str = "Crude Gabagool Distillate"
+    infernoEyedrops: bool = True
+    hopper: str = "None"
+    upgrade1: str = "None"
+    upgrade2: str = "None"
+    chest: str = "None"
+    beacon: int = 0
+    scorched: bool = False
+    B_constant: bool = False
+    B_acquired: bool = False
+    infusion: bool = False
+    crystal: str = "None"
+    afk: bool = False
+    afkpet: float = 0.0
+    specialSetup: bool = False
+    potatoTalisman: bool = False
+    combatWisdom: float = 0.0
+    miningWisdom: float = 0.0
+    farmingWisdom: float = 0.0
+    fishingWisdom: float = 0.0
+    foragingWisdom: float = 0.0
+    alchemyWisdom: float = 0.0
+    mayor: str = "None"
+    levelingpet: str = "None"
+    taming: float = 0.0
+    petxpboost: str = "None"
+    beastmaster: float = 0.0
+    bazaar_sell_type: str = "Sell Offer"
+    bazaar_buy_type: str = "Buy Order"
+    bazaar_taxes: bool = True
+    bazaar_flipper: int = 1
+    timeamount: float = 1.0
+    timelength: str = "Days"
+
+
+@dataclass
+class Result:
+    """
+    All outputs of one calculation.
+    The attribute names are the same as the "output" and "list" variables of the calculator.
+    Amounts, profits and costs are for the whole time span and all minions of the setup.
+    """
+    time: str = ""
+    actiontime: float = 0.0
+    harvests: float = 0.0
+    items: dict = field(default_factory=dict)
+    sellLoc: dict = field(default_factory=dict)
+    filltime: float = 0.0
+    itemtypeProfit: dict = field(default_factory=dict)
+    itemProfit: float = 0.0
+    xp: dict = field(default_factory=dict)
+    petxp: float = 0.0
+    petProfit: float = 0.0
+    fuelcost: float = 0.0
+    totalProfit: float = 0.0
+    notes: dict = field(default_factory=dict)
+    setupcost: float = 0.0
+
+#%% functions
+
+
+def time_number(setup, secondsPaction, actionsPerHarvest):
+    """
+    Translates time amount and length of a setup into seconds.
+
+    Parameters
+    ----------
+    setup : Setup
+        Setup with timeamount and timelength.
+    secondsPaction : float
+        Seconds per action. Used to calculate the amount of seconds in one harvest.
+    actionsPerHarvest : float
+        Actions per harvest. Used to calculate the amount of seconds in one harvest.
+
+    Returns
+    -------
+    float
+        The inputted time amount and length as seconds.
+
+    """
+    if setup.timelength == "Harvests":
+        return secondsPaction * actionsPerHarvest * setup.timeamount
+    return time_lengths.get(setup.timelength, 1) * setup.timeamount
+
+
+def price_location(setup, action="buy", location="bazaar"):
+    """
+    Translates a transaction type and location into the key in the prices of md.itemList and a price multiplier.
+    Uses the "bazaar_buy_type" and "bazaar_sell_type" of the setup for bazaar specifics.
+
+    Parameters
+    ----------
+    setup : Setup
+        Setup with the bazaar settings.
+    action : str, optional
+        Type of transaction. "buy" or "sell". The default is "buy".
+    location : str, optional
+        Location of the transaction, "npc", "bazaar", "custom", "best". The default is "bazaar".
+
+    Returns
+    -------
+    location : str
+        Key in the prices of md.itemList.
+    multiplier : float
+        Multiplier for the price, like bazaar taxes.
+
+    """
+    multiplier = 1
+    if location == "bazaar":
+        if action == "buy":
+            location = bazaar_buy_types[setup.bazaar_buy_type]
+        elif action == "sell":
+            location = bazaar_sell_types[setup.bazaar_sell_type]
+            if setup.bazaar_taxes:
+                bazaar_tax = 0.0125 - 0.00125 * setup.bazaar_flipper
+                if setup.mayor == "Derpy":
+                    bazaar_tax *= 4
+                multiplier = 1 - bazaar_tax
+    elif location == "npc" and action == "buy":
+        multiplier = 2
+    return location, multiplier
+
+
+def warn_once(ID, message):
+    """
+    Prints a price warning of an item, only the first time.
+
+    Parameters
+    ----------
+    ID : str
+        Skyblock Item ID.
+    message : str
+        Warning message after the ID.
+
+    Returns
+    -------
+    None.
+
+    """
+    if (ID, message) not in warned:
+        warned.add((ID, message))
+        print("WARNING:", ID, message)
+    return
+
+
+def getPrice(setup, ID, action="buy", location="bazaar", force=False):
+    """
+    Returns the price of an item from ID, transaction type and location of transaction.
+    Uses the "bazaar_buy_type" and "bazaar_sell_type" of the setup for bazaar specifics.
+
+    Parameters
+    ----------
+    setup : Setup
+        Setup with the bazaar settings.
+    ID : str
+        Skyblock Item ID of which the price is needed.
+    action : str, optional
+        Type of transaction. "buy" or "sell". The default is "buy".
+    location : str, optional
+        Location of the transaction, "npc", "bazaar", "custom", "best". The default is "bazaar".
+    force : bool, optional
+        Toggle to force the location and action, if location is not found, this function returns -1
+
+    Returns
+    -------
+    float
+        price of the item.
+    """
+    location, multiplier = price_location(setup, action, location)
+    return located_price(ID, location, multiplier, force)
+
+
+def located_price(ID, location, multiplier=1, force=False):
+    """
+    Returns the price of an item at a location from price_location(), with the fallbacks of getPrice().
+    Resolve the location once with price_location() when pricing many items with the same setup.
+
+    Parameters
+    ----------
+    ID : str
+        Skyblock Item ID of which the price is needed.
+    location : str
+        Key in the prices of md.itemList.
+    multiplier : float, optional
+        Multiplier for the price, like bazaar taxes. The default is 1.
+    force : bool, optional
+        Toggle to force the location, if location is not found, this function returns -1
+
+    Returns
+    -------
+    float
+        price of the item.
+    """
+    if ID in md.itemList:
+        if location in md.itemList[ID]["prices"]:
+            return multiplier * md.itemList[ID]["prices"][location]
+        elif force:
+            warn_once(ID, "no forced cost found")
+            return -1
+        elif "npc" in md.itemList[ID]["prices"]:
+            return multiplier * md.itemList[ID]["prices"]["npc"]
+        elif "custom" in md.itemList[ID]["prices"]:
+            return md.itemList[ID]["prices"]["custom"]
+        else:
+            warn_once(ID, "no cost found")
+            return 0
+    else:
+        warn_once(ID, "not in itemList")
+        return 0
+
+
+def fuelPrice(setup, fuel_ID):
+    """
+    Returns the buy price of one minion fuel.
+    Inferno Minion Fuel is priced from its components with the grade, distilate and eyedrops of the setup.
+
+    Parameters
+    ----------
+    setup : Setup
+        Setup with the bazaar and Inferno Minion Fuel settings.
+    fuel_ID : str
+        Skyblock Item ID of the fuel.
+
+    Returns
+    -------
+    float
+        price of the fuel.
+
+    """
+    if fuel_ID != "INFERNO_FUEL":
+        return getPrice(setup, fuel_ID, "buy", "bazaar")
+    costPerInfernofuel = 0
+    for component_ID, amount in fuel_components(setup, fuel_ID).items():
+        costPerInfernofuel += amount * getPrice(setup, component_ID, action="buy", location="bazaar")
+    return costPerInfernofuel
+
+
+def fuel_components(setup, fuel_ID):
+    """
+    Items that one minion fuel is bought as.
+    Inferno Minion Fuel is crafted from the grade, distilate and eyedrops of the setup, other fuels are bought directly.
+
+    Parameters
+    ----------
+    setup : Setup
+        Setup with the Inferno Minion Fuel settings.
+    fuel_ID : str
+        Skyblock Item ID of the fuel.
+
+    Returns
+    -------
+    dict
+        Item IDs with amounts.
+
+    """
+    if fuel_ID != "INFERNO_FUEL":
+        return {fuel_ID: 1}
+    infernofuel_components = {"INFERNO_FUEL_BLOCK": 2,  # 2 inferno fuel blocks
+                              md.getID[setup.infernoDistilate]: 6,  # 6 times distilate item
+                              md.getID[setup.infernoGrade]: 1,  # 1 gabagool core
+                              "CAPSAICIN_EYEDROPS_NO_CHARGES": int(setup.infernoEyedrops)  # capsaicin eyedrops
+                              }
+    return infernofuel_components
+
+
+def getPetXP(setup, xp_type, xp_amount):
+    """
+    Calculated gained pet xp from an xp amount and type
+
+    Parameters
+    ----------
+    setup : Setup
+        Setup with the pet settings.
+    xp_type : str
+        Type of skill XP.
+    xp_amount : float
+        Amount of xp.
+
+    Returns
+    -------
+    int
+        Amount of pet xp
+
+    """
+    pet = setup.levelingpet
+    petxpbonus = (1 + setup.taming / 100) * (1 + setup.beastmaster / 100)
+    if md.pet_xp_boosts[setup.petxpboost][0] in [xp_type, "all"] and pet not in ["Golden Dragon", "Golden Dragon (lvl 1-100)"]:
+        petxpbonus *= 1 + md.pet_xp_boosts[setup.petxpboost][1] / 100
+    if setup.mayor == "Diana":
+        petxpbonus *= 1.35
+    if xp_type in ["mining", "fishing"]:
+        petxpbonus *= 1.5
+    if md.pet_data[pet]["type"] != xp_type:
+        if xp_type in ["alchemy", "enchanting"]:
+            petxpbonus *= 1 / 12
+        else:
+            petxpbonus *= 1 / 3
+    if pet == "Reindeer":
+        petxpbonus *= 2
+    pet_xp = xp_amount * petxpbonus
+    return pet_xp
+
+
+def goldenDragonXP(pet_xp, xp_amount, boost):
+    """
+    Adds xp to Golden Dragons that get leveled from 1 to 200 one after another.
+    Golden Dragons below level 100 cannot hold pet items, so the pet item boost only works above level 100.
+    Counts the completed level 1 to 200 cycles directly instead of adding the xp in steps.
+
+    Parameters
+    ----------
+    pet_xp : float
+        Pet xp that is already gained, Golden Dragons before this xp are already leveled.
+    xp_amount : float
+        Amount of pet xp without the pet item boost.
+    boost : float
+        Multiplier of the pet item boost, 1 for no boost.
+
+    Returns
+    -------
+    pet_xp : float
+        Total pet xp after adding xp_amount.
+
+    """
+    cycle_xp = md.pet_data["Golden Dragon"]["xp"]  # level 1 to 200
+    unboosted_xp = md.pet_data["Golden Dragon (lvl 1-100)"]["xp"]  # level 1 to 100
+    # finish the current Golden Dragon
+    current_xp = pet_xp % cycle_xp
+    if current_xp < unboosted_xp:
+        using_xp = min(xp_amount, unboosted_xp - current_xp)
+        pet_xp += using_xp
+        xp_amount -= using_xp
+        current_xp += using_xp
+    if xp_amount > 0 and current_xp >= unboosted_xp:
+        using_xp = min(xp_amount * boost, cycle_xp - current_xp)
+        pet_xp += using_xp
+        xp_amount -= using_xp / boost
+    if xp_amount <= 0:
+        return pet_xp
+    # complete Golden Dragons
+    xp_per_cycle = unboosted_xp + (cycle_xp - unboosted_xp) / boost
+    cycles = xp_amount // xp_per_cycle
+    pet_xp += cycles * cycle_xp
+    xp_amount -= cycles * xp_per_cycle
+    # start of the last Golden Dragon
+    using_xp = min(xp_amount, unboosted_xp)
+    pet_xp += using_xp
+    xp_amount -= using_xp
+    pet_xp += xp_amount * boost
+    return pet_xp
+
+
+def speed_bonus(setup):
+    """
+    Adds up the minion speed bonus of a setup in percentages.
+
+    Parameters
+    ----------
+    setup : Setup
+        The setup to calculate.
+
+    Returns
+    -------
+    speedBonus : float
+        Total speed bonus.
+
+    """
+    minion_type = setup.minion
+    minion_fuel = md.fuel_options[setup.fuel]
+    upgrades = [md.upgrade_options[setup.upgrade1], md.upgrade_options[setup.upgrade2]]
+    # uses the fact that booleans can be seen as 0 or 1 or false and true resp.
+    speedBonus = 0
+    speedBonus += md.itemList[minion_fuel]["upgrade"]["speed"]
+    speedBonus += md.itemList[upgrades[0]]["upgrade"]["speed"] + md.itemList[upgrades[1]]["upgrade"]["speed"]
+    speedBonus += 2 * setup.beacon + 10 * setup.infusion
+    speedBonus += 0.3 * setup.afkpet * setup.afk
+    speedBonus += 5 * setup.potatoTalisman * setup.afk * (minion_type == "Potato")
+    if setup.crystal != "None":
+        if minion_type in list(md.floating_crystals[setup.crystal].values())[0]:
+            speedBonus += list(md.floating_crystals[setup.crystal].keys())[0]
+    if setup.beacon != 0:
+        speedBonus += 1 * setup.scorched
+    if minion_type == "Inferno":
+        speedBonus += 18 * min(10, setup.amount)
+    if setup.mayor == "Cole" and setup.afk and minion_type in [
+            'Cobblestone', 'Obsidian', 'Glowstone', 'Gravel', 'Sand', 'Ice', 'Coal', 'Iron',
+            'Gold', 'Diamond', 'Lapis', 'Redstone', 'Emerald', 'Quartz', 'End Stone', 'Mithril']:
+        speedBonus += 25
+    if setup.afk and setup.specialSetup and minion_type in ["Flower", "Sand", "Red Sand", "Gravel"]:
+        speedBonus -= 10  # only spawning has 10% action speed reduction, not confirmed yet.
+    return speedBonus
+
+
+def drop_multipliers(setup):
+    """
+    Multiplies up the minion drop bonus of a setup.
+    For offline drop multipliers, it is only assumed that Derpy and Fuel work.
+    When AFKing, Derpy only doubles base drops. In the offline calculations, Derpy doubles everything that gets made in a minion.
+
+    Parameters
+    ----------
+    setup : Setup
+        The setup to calculate.
+
+    Returns
+    -------
+    dropMultiplier_base : float
+        Multiplier for the base drops.
+    dropMultiplier_offline : float
+        Multiplier for the drops of adding upgrades like Corrupt Soil.
+
+    """
+    minion_fuel = md.fuel_options[setup.fuel]
+    upgrades = [md.upgrade_options[setup.upgrade1], md.upgrade_options[setup.upgrade2]]
+    dropMultiplier_base = 1
+    dropMultiplier_offline = 1
+    dropMultiplier_base *= md.itemList[minion_fuel]["upgrade"]["drop"]
+    dropMultiplier_base *= md.itemList[upgrades[0]]["upgrade"]["drop"]
+    dropMultiplier_base *= md.itemList[upgrades[1]]["upgrade"]["drop"]
+    if "SOULFLOW_ENGINE" in upgrades and setup.minion == "Voidling":
+        dropMultiplier_base *= 2 * (0.5 + 0.03 * setup.miniontier)  # needs testing
+    if setup.mayor == "Derpy" and setup.afk:
+        dropMultiplier_base *= 2
+    if not setup.afk:
+        dropMultiplier_offline *= md.itemList[minion_fuel]["upgrade"]["drop"]
+    return dropMultiplier_base, dropMultiplier_offline
+
+
+def actions_per_harvest(setup):
+    """
+    Amount of minion actions needed for one harvest, changed by AFKing and Special Setups.
+
+    Parameters
+    ----------
+    setup : Setup
+        The setup to calculate.
+
+    Returns
+    -------
+    actionsPerHarvest : int
+        Actions per harvest.
+
+    """
+    minion_type = setup.minion
+    actionsPerHarvest = 2
+    if minion_type == "Fishing":
+        # only has harvests actions
+        actionsPerHarvest = 1
+    if setup.afk:
+        if minion_type in ["Pumpkin", "Melon"]:
+            # pumpkins and melons are forced to regrow for minion to harvest
+            actionsPerHarvest = 1
+        if setup.specialSetup:
+            if minion_type in ["Cobblestone", "Mycelium", "Ice", "Oak"]:
+                # cobblestone generator, regrowing mycelium, freezing water, player harvesting
+                actionsPerHarvest = 1
+            if minion_type in ["Flower", "Sand", "Red Sand", "Gravel"]:
+                # harvests through natural means: water flushing, gravity
+                actionsPerHarvest = 1
+    return actionsPerHarvest
+
+
+def minion_drops(setup):
+    """
+    Base drops per harvest of the minion of a setup, with the AFK loot table changes.
+    Returns a new dictionary, md.minionList does not get changed.
+
+    Parameters
+    ----------
+    setup : Setup
+        The setup to calculate.
+
+    Returns
+    -------
+    dict
+        Skyblock item IDs with the average amount per harvest.
+
+    """
+    minion_data = md.minionList[setup.minion]
+    if setup.afk and setup.specialSetup and "specialdrops" in minion_data:
+        return dict(minion_data["specialdrops"])
+    if setup.afk and "afkdrops" in minion_data:
+        return dict(minion_data["afkdrops"])
+    return dict(minion_data["drops"])
+
+
+def compact_items(items, steps, order):
+    """
+    Compacts items in one pass with the compiled compaction steps from HSB_minion_data.
+    Floors the ratio between items and needed items for one compaction,
+    multiplies the floored ratio if one compaction creates multiple compacted items
+    and uses modulo to find the left over amount.
+
+    Parameters
+    ----------
+    items : dict
+        Item IDs with amounts, gets changed in place.
+    steps : dict
+        md.compactorSteps or md.enchanterSteps.
+    order : list
+        md.compactorOrder or md.enchanterOrder.
+
+    Returns
+    -------
+    items : dict
+        The compacted items.
+
+    """
+    for item in order:
+        if item not in items:
+            continue
+        compact_name, percompact, compact_per = steps[item]
+        compact_amount = int(items[item] / percompact)
+        if compact_amount == 0:
+            continue
+        left_over = items[item] % percompact
+        if left_over == 0.0:
+            del items[item]
+        else:
+            items[item] = left_over
+        if compact_name not in items:
+            items[compact_name] = 0
+        items[compact_name] += compact_amount * compact_per
+    return items
+
+
+#%% calculation stages
+# every stage reads the setup and the outputs of earlier stages from state and returns its own outputs
+# evaluate() runs all stages, Evaluator only reruns the stages of which an input changed
+
+
+def production_stage(setup, state):
+    """
+    Speed, time span, base drops, upgrade drops, Inferno Minion Fuel drops and compaction.
+
+    Parameters
+    ----------
+    setup : Setup
+        The setup to calculate.
+    state : dict
+        Outputs of earlier stages.
+
+    Returns
+    -------
+    dict
+        "time", "actiontime", "timeNumber", "harvestsPerTime", "harvests",
+        "minion_items" (items of one minion) and "items" (items of all minions).
+
+    """
+    items = {}
+
+    # extracting often used minion constants
+    minion_type = setup.minion
+    minion_tier = setup.miniontier
+    base_speed = md.minionList[minion_type]["speed"][minion_tier]
+    minion_fuel = md.fuel_options[setup.fuel]
+    upgrades = [md.upgrade_options[setup.upgrade1], md.upgrade_options[setup.upgrade2]]
+
+    # list upgrades types
+    upgrades_types = []
+    for upgrade in upgrades:
+        for temp_type in md.itemList[upgrade]["upgrade"]["special"]["type"].split(", "):
+            upgrades_types.append(temp_type)
+
+    with profiler.span("speed bonus"):
+        speedBonus = speed_bonus(setup)
+    with profiler.span("drop multipliers"):
+        dropMultiplier_base, dropMultiplier_offline = drop_multipliers(setup)
+    actionsPerHarvest = actions_per_harvest(setup)
+
+    # calculate final minion speed
+    secondsPaction = base_speed / (1 + speedBonus / 100)
+    if minion_fuel == "INFERNO_FUEL":
+        secondsPaction /= 1 + md.infernofuel_data["grades"][md.getID[setup.infernoGrade]]
+
+    # time calculations
+    timeNumber = time_number(setup, secondsPaction, actionsPerHarvest)
+    if setup.timelength == "Harvests":
+        harvestsPerTime = setup.timeamount
+    else:
+        harvestsPerTime = timeNumber / (actionsPerHarvest * secondsPaction)
+
+    # base drops
+    with profiler.span("base drops"):
+        drops = minion_drops(setup)
+        for item, amount in drops.items():
+            items[item] = harvestsPerTime * amount * dropMultiplier_base
+
+    # upgrade drops
+    # create seperate dict to keep it separate from the main drops
+    # because some upgrades use main drops to generate something
+    with profiler.span("upgrade drops"):
+        upgrade_drops = {}
+        for upgrade in upgrades:
+            upgrade_type = md.itemList[upgrade]["upgrade"]["special"]["type"]
+            if "replace" in upgrade_type:
+                # replacing upgrades are like Auto Smelters
+                for item in list(items.keys()):
+                    if item in md.itemList[upgrade]["upgrade"]["special"]["list"]:
+                        items[md.itemList[upgrade]["upgrade"]["special"]["list"][item]] = items.pop(item)
+            if upgrade_type == "generate":
+                # generating upgrades are like Diamond Spreadings
+                finalAmount = 0
+                for amount in items.values():
+                    finalAmount += md.itemList[upgrade]["upgrade"]["special"]["chance"] * amount
+                for item, amount in md.itemList[upgrade]["upgrade"]["special"]["item"].items():
+                    upgrade_drops[item] = finalAmount * amount
+            elif upgrade_type == "add":
+                # adding upgrades are like Corrupt Soils
+                for item, amount in md.itemList[upgrade]["upgrade"]["special"]["item"].items():
+                    upgrade_drops[item] = harvestsPerTime * amount * dropMultiplier_offline
+            elif upgrade_type == "timer":
+                # timer upgrades are like Soulflow Engines
+                for item, amount in md.itemList[upgrade]["upgrade"]["special"]["item"].items():
+                    upgrade_drops[item] = amount * timeNumber / md.itemList[upgrade]["upgrade"]["special"]["cooldown"]
+
+        # upgrades behavior when afking
+        if setup.afk is True:
+            if "CORRUPT_SOIL" in upgrades:
+                if "afkcorrupt" in md.minionList[minion_type]:
+                    # Certain mob minions get more corrupt drops when afking
+                    # It is not a constant multiplier, it is chances equivalent to the main drop of the minion
+                    upgrade_drops["SULPHUR_ORE"] *= md.minionList[minion_type]["afkcorrupt"]
+                    upgrade_drops["CORRUPTED_FRAGMENT"] *= md.minionList[minion_type]["afkcorrupt"]
+            if "ENCHANTED_EGG" in upgrades:
+                # Enchanted Eggs make one laid egg and one egg on kill while AFKing
+                upgrade_drops["EGG"] *= 2
+        else:
+            if "ENCHANTED_SHEARS" in upgrades:
+                # No wool gets added from Enchanted Shears when offline
+                upgrade_drops["WOOL"] = 0
+
+    # Inferno minion fuel drops
+    # https://wiki.hypixel.net/Inferno_Minion_Fuel
+    with profiler.span("inferno fuel"):
+        if minion_fuel == "INFERNO_FUEL":
+            # distilate drops
+            distilate = md.getID[setup.infernoDistilate]
+            distilate_item = md.infernofuel_data["distilates"][distilate][0]
+            amount_per = md.infernofuel_data["distilates"][distilate][1]
+            upgrade_drops[distilate_item] = 0
+            # base_item_amount = 1 / 5 + (amount_per * 4) / 5
+            for item, amount in list(items.items()):  # replacing main drops with distilate drops
+                distilate_amount = (amount * 4) / 5
+                upgrade_drops[distilate_item] += distilate_amount * amount_per
+                items[item] /= 5
+
+            # Hypergolic drops
+            if setup.infernoGrade == "Hypergolic Gabagool":  # hypergolic fuel stuff
+                multiplier = 1
+                if setup.infernoEyedrops is True:  # Capsaicin Eyedrops
+                    multiplier = 1.3
+                for item, chance in md.infernofuel_data["drops"].items():
+                    upgrade_drops[item] = 0
+                    if item == "INFERNO_APEX" and minion_tier >= 10:  # Apex Minion perk
+                        chance *= 2
+                    upgrade_drops[item] += multiplier * chance * harvestsPerTime
+                upgrade_drops["HYPERGOLIC_IONIZED_CERAMICS"] = timeNumber / md.itemList[minion_fuel]["upgrade"]["duration"]
+
+    # add extra diamonds from offline diamond spreading
+    if setup.afk is False and "DIAMOND_SPREADING" in upgrades:
+        for itemtype, amount in list(upgrade_drops.items()):
+            if itemtype == "DIAMOND":  # Diamond spreadings don't trigger on themselves,
+                continue  # currently Diamonds can only be in upgrade_drops through diamond spreadings so this should work
+            upgrade_drops["DIAMOND"] += amount * 0.1
+
+    # add upgrade drops to main item list
+    for item, amount in upgrade_drops.items():
+        if item not in items:
+            items[item] = 0
+        items[item] += amount
+
+    # Offline mode Derpy
+    # The offline doubling has only been seen on Corrupt Soil and Diamond Spreading
+    # but is assumed to work on everything
+    if setup.mayor == "Derpy" and setup.afk is False:
+        for itemtype in items.keys():
+            items[itemtype] *= 2
+
+    # (Super) Compactor logic at the end because it applies to both drop groups
+    with profiler.span("compaction"):
+        # Compactors
+        if "compact" in upgrades_types:
+            compact_items(items, md.compactorSteps, md.compactorOrder)
+        # Super compactor
+        # md.enchanterOrder has every item before its enchanted forms, so one pass compacts full chains
+        if "enchant" in upgrades_types:
+            compact_items(items, md.enchanterSteps, md.enchanterOrder)
+
+    # multiply drops by minion amount
+    # all processes as calculated above should be linear with minion amount
+    all_items = {}
+    for itemtype, amount in items.items():
+        all_items[itemtype] = amount * setup.amount
+
+    return {"time": f"{setup.timeamount} {setup.timelength}", "actiontime": secondsPaction, "timeNumber": timeNumber,
+            "harvestsPerTime": harvestsPerTime, "harvests": setup.amount * harvestsPerTime,
+            "minion_items": items, "items": all_items}
+
+
+def storage_stage(setup, state):
+    """
+    Time until the storage of one minion is full.
+
+    Returns
+    -------
+    dict
+        "filltime".
+
+    """
+    # amount of storage measured in slots
+    avaible_storage = md.minion_chests[setup.chest]
+    if "storage" in md.minionList[setup.minion] and setup.miniontier in md.minionList[setup.minion]["storage"]:
+        avaible_storage += md.minionList[setup.minion]["storage"][setup.miniontier]
+    else:
+        avaible_storage += md.standard_storage[setup.miniontier]
+
+    # WARNING: this calculation does not work with compactors and is not accurate for setup with multiple drops
+    used_storage = 0
+    for amount in state["minion_items"].values():
+        used_storage += amount / 64
+    return {"filltime": (state["timeNumber"] * avaible_storage) / used_storage}
+
+
+def sell_stage(setup, state):
+    """
+    Converts items into coins, while keeping track where items get sold.
+
+    Returns
+    -------
+    dict
+        "sellLoc", "itemtypeProfit" and "itemProfit".
+
+    """
+    # it makes a list of all prices and takes the one that matches the choice of hopper
+    sellLoc = {}
+    itemtypeProfit = {}
+    coinsPerTime = 0.0
+    sellto = "NPC"
+    if setup.hopper == "Bazaar":
+        sellto = "bazaar"
+    elif setup.hopper == "Best (NPC/Bazaar)":
+        sellto = "best"
+    prices = {}
+    if setup.hopper != "None":
+        npc_location = price_location(setup, "sell", "npc")
+        bazaar_location = price_location(setup, "sell", "bazaar")
+        for itemtype, amount in state["items"].items():
+            prices.clear()
+            prices["NPC"] = located_price(itemtype, *npc_location)
+            prices["bazaar"] = located_price(itemtype, *bazaar_location)
+            if sellto in prices:
+                final_price = prices[sellto]
+                sellLoc[itemtype] = sellto
+            else:
+                sellLoc[itemtype] = max(prices, key=prices.get)
+                final_price = prices[sellLoc[itemtype]]
+            itemtypeProfit[itemtype] = amount * final_price * hopper_data[setup.hopper]
+            coinsPerTime += amount * final_price
+    coinsPerTime *= hopper_data[setup.hopper]
+    return {"sellLoc": sellLoc, "itemtypeProfit": itemtypeProfit, "itemProfit": coinsPerTime}
+
+
+def xp_stage(setup, state):
+    """
+    Skill xp of the items.
+
+    Returns
+    -------
+    dict
+        "xp".
+
+    """
+    xp = {}
+    for itemtype, amount in state["items"].items():
+        xptype, value = list(*md.itemList[itemtype]["xp"].items())
+        if value == 0:
+            continue
+        if xptype not in xp:
+            xp[xptype] = 0
+        xp[xptype] += amount * value * (1 + getattr(setup, f"{xptype}Wisdom") / 100)
+    if setup.mayor == "Derpy":
+        for xptype in xp.keys():
+            xp[xptype] *= 1.5
+    return {"xp": xp}
+
+
+def pet_stage(setup, state):
+    """
+    Pet leveling with the skill xp.
+
+    Returns
+    -------
+    dict
+        "petxp" and "petProfit".
+
+    """
+    # https://wiki.hypixel.net/Pets#Leveling
+    # for golden dragon: goldenDragonXP() adds the xp to the pets
+    # while keeping in mind that golden dragons below lvl 100 cannot hold pet items
+    # the pet costs are manually added in md.pet_data
+    petXPPerTime = 0.0
+    petProfitPerTime = 0.0
+    pet = setup.levelingpet
+    exp_boost_type = md.pet_xp_boosts[setup.petxpboost][0]
+    exp_boost_perc = md.pet_xp_boosts[setup.petxpboost][1]
+    if pet == "Golden Dragon":
+        for skill, amount in state["xp"].items():
+            if exp_boost_type in [skill, "all"]:
+                boost = 1 + exp_boost_perc / 100
+            else:
+                boost = 1
+            petXPPerTime = goldenDragonXP(petXPPerTime, getPetXP(setup, skill, amount), boost)
+    elif pet != "None":
+        for skill, amount in state["xp"].items():
+            petXPPerTime += getPetXP(setup, skill, amount)
+    if pet != "None":
+        maxpetsPerTime = petXPPerTime / md.pet_data[pet]["xp"]
+        petProfitPerTime = maxpetsPerTime * (md.pet_data[pet]["cost"]["max"] - md.pet_data[pet]["cost"]["min"])
+    return {"petxp": petXPPerTime, "petProfit": petProfitPerTime}
+
+
+def fuel_stage(setup, state):
+    """
+    Beacon and limited fuel cost.
+
+    Returns
+    -------
+    dict
+        "fuelcost".
+
+    """
+    minion_fuel = md.fuel_options[setup.fuel]
+    timeNumber = state["timeNumber"]
+    fuelCostPerTime = 0.0
+    if setup.beacon != 0:
+        if setup.scorched:
+            beacon_fuel_ID = "SCORCHED_POWER_CRYSTAL"
+        else:
+            beacon_fuel_ID = "POWER_CRYSTAL"
+        costPerCrystal = getPrice(setup, beacon_fuel_ID, "buy", "bazaar")
+        fuelCostPerTime += timeNumber * costPerCrystal / md.itemList[beacon_fuel_ID]["duration"] * int(not (setup.B_constant))
+    if md.itemList[minion_fuel]["upgrade"]["duration"] != 0:
+        costPerFuel = fuelPrice(setup, minion_fuel)
+        fuelCostPerTime += setup.amount * timeNumber * costPerFuel / md.itemList[minion_fuel]["upgrade"]["duration"]
+    return {"fuelcost": fuelCostPerTime}
+
+
+def minion_cost(setup, from_tier=0):
+    """
+    Crafting cost of one minion of the setup, from tier 1 up to its tier,
+    with one lookup in md.cumulativeMinionCosts.
+
+    Parameters
+    ----------
+    setup : Setup
+        Setup with the minion and tier.
+    from_tier : int, optional
+        Tier the minion already has, for the cost to upgrade it to the tier of the setup. The default is 0.
+
+    Returns
+    -------
+    coins : float
+        Coins of the extra costs.
+    minion_item_cost : dict
+        Item IDs with amounts.
+    notes : dict
+        "Extra cost" note for extra costs that are not coins.
+
+    """
+    cumulative = md.cumulativeMinionCosts[setup.minion]
+    final = cumulative[setup.miniontier]
+    start = cumulative[min(from_tier, setup.miniontier)]
+    notes = {}
+    coins = final["coins"] - start["coins"]
+    minion_item_cost = {item: amount - start["items"].get(item, 0) for item, amount in final["items"].items()
+                        if amount != start["items"].get(item, 0)}
+    for cost_type, amount in final["extra"].items():
+        amount -= start["extra"].get(cost_type, 0)
+        if amount != 0:
+            notes["Extra cost"] = f"{amount} {cost_type.replace('_', ' ').title()} per minion"
+    return coins, minion_item_cost, notes
+
+
+def setup_cost_stage(setup, state):
+    """
+    Cost of the minions, upgrades, fuel, hopper, infusion, beacon and floating crystal, and the minion notes.
+
+    Returns
+    -------
+    dict
+        "setupcost" and "notes".
+
+    """
+    minion_type = setup.minion
+    minion_fuel = md.fuel_options[setup.fuel]
+    upgrades = [md.upgrade_options[setup.upgrade1], md.upgrade_options[setup.upgrade2]]
+    # Single minion cost
+    total_cost, minion_item_cost, notes = minion_cost(setup)
+    for item_ID, amount in minion_item_cost.items():
+        total_cost += amount * getPrice(setup, item_ID, "buy", "bazaar")
+    # Infinite fuel cost
+    if minion_fuel != "NONE" and md.itemList[minion_fuel]["upgrade"]["duration"] == 0:
+        total_cost += fuelPrice(setup, minion_fuel)
+    # Hopper cost
+    if setup.hopper in ["Budget Hopper", "Enchanted Hopper"]:
+        hopper_ID = md.getID[setup.hopper]
+        total_cost += getPrice(setup, hopper_ID, "buy", "bazaar")
+    # Internal minion upgrades cost
+    for upgrade in upgrades:
+        if upgrade != "NONE":
+            total_cost += getPrice(setup, upgrade, "buy", "bazaar")
+    # Infusion cost
+    if setup.infusion is True:
+        total_cost += getPrice(setup, "MITHRIL_INFUSION", "buy", "bazaar")
+
+    # multiply by minion amount
+    total_cost *= setup.amount
+
+    # Beacon cost
+    if setup.beacon != 0 and not setup.B_acquired:
+        for i in range(1, setup.beacon + 1):
+            for item_ID, amount in md.upgrades_material_cost["beacon"][i].items():
+                total_cost += amount * getPrice(setup, item_ID, "buy", "bazaar")
+
+    # Floating Crystal cost
+    if setup.crystal != "None":
+        for item_ID, amount in md.upgrades_material_cost["crystal"][setup.crystal].items():
+            total_cost += amount * getPrice(setup, item_ID, "buy", "bazaar")
+
+    # Get minion notes
+    if "notes" in md.minionList[minion_type]:
+        notes.update(md.minionList[minion_type]["notes"].copy())
+    return {"setupcost": total_cost, "notes": notes}
+
+
+# dependency graph of the stages, in the order they run
+# "inputs": Setup attributes (the same as the "input" variables of the calculator) that the stage reads
+# "after": stages of which the stage reads outputs
+# "prices": toggle if the stage uses the prices in md.itemList
+inferno_inputs = ["fuel", "infernoGrade", "infernoDistilate", "infernoEyedrops"]
+stages = {"production": {"function": production_stage, "after": [], "prices": False,
+                         "inputs": ["minion", "miniontier", "amount", *inferno_inputs, "upgrade1", "upgrade2",
+                                    "beacon", "scorched", "infusion", "crystal", "afk", "afkpet", "specialSetup",
+                                    "potatoTalisman", "mayor", "timeamount", "timelength"]},
+          "storage": {"function": storage_stage, "after": ["production"], "prices": False,
+                      "inputs": ["minion", "miniontier", "chest"]},
+          "sell": {"function": sell_stage, "after": ["production"], "prices": True,
+                   "inputs": ["hopper", "bazaar_sell_type", "bazaar_taxes", "bazaar_flipper", "mayor"]},
+          "xp": {"function": xp_stage, "after": ["production"], "prices": False,
+                 "inputs": ["combatWisdom", "miningWisdom", "farmingWisdom", "fishingWisdom", "foragingWisdom", "alchemyWisdom", "mayor"]},
+          "pet": {"function": pet_stage, "after": ["xp"], "prices": False,
+                  "inputs": ["levelingpet", "taming", "petxpboost", "beastmaster", "mayor"]},
+          "fuel": {"function": fuel_stage, "after": ["production"], "prices": True,
+                   "inputs": [*inferno_inputs, "amount", "beacon", "scorched", "B_constant", "bazaar_buy_type"]},
+          "setupcost": {"function": setup_cost_stage, "after": [], "prices": True,
+                        "inputs": ["minion", "miniontier", "amount", *inferno_inputs, "hopper", "upgrade1", "upgrade2",
+                                   "infusion", "beacon", "B_acquired", "crystal", "bazaar_buy_type"]}}
+
+
+def make_result(state):
+    """
+    Collects the outputs of the stages into a Result, with copies of the dictionaries.
+
+    Parameters
+    ----------
+    state : dict
+        Outputs of all stages.
+
+    Returns
+    -------
+    result : Result
+        All outputs of the calculation.
+
+    """
+    result = Result()
+    for result_field in fields(Result):
+        value = state[result_field.name] if result_field.name in state else getattr(result, result_field.name)
+        if isinstance(value, dict):
+            value = dict(value)
+        setattr(result, result_field.name, value)
+    result.totalProfit = result.itemProfit + result.petProfit - result.fuelcost
+    return result
+
+#%% main calculation
+
+
+def evaluate(setup):
+    """
+    Main calculation, runs all stages.
+    Uses the prices that are currently in md.itemList.
+
+    Parameters
+    ----------
+    setup : Setup
+        The setup to calculate.
+
+    Returns
+    -------
+    result : Result
+        All outputs of the calculation.
+
+    """
+    state = {}
+    for name, stage in stages.items():
+        with profiler.span(name):
+            state.update(stage["function"](setup, state))
+    return make_result(state)
+
+
+class Evaluator():
+    def __init__(self):
+        """
+        Incremental version of evaluate().
+        Keeps the outputs of every stage of the last calculation
+        and only reruns the stages of which an input changed, and the stages after those.
+        For example: changing the hopper only reruns the "sell" and "setupcost" stages.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.setup = None
+        self.state = {}
+        self.prices_changed = True
+        self.last_run = []
+        return
+
+    def clear(self):
+        """
+        Forgets the last calculation, the next calculation runs all stages.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.setup = None
+        self.prices_changed = True
+        return
+
+    def clear_prices(self):
+        """
+        Marks the prices in md.itemList as changed, the next calculation reruns all stages that use prices.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.prices_changed = True
+        return
+
+    def evaluate(self, setup):
+        """
+        Calculates a setup, only rerunning the stages that changed since the last calculation.
+        The names of the stages that ran are stored in self.last_run.
+
+        Parameters
+        ----------
+        setup : Setup
+            The setup to calculate.
+
+        Returns
+        -------
+        result : Result
+            All outputs of the calculation.
+
+        """
+        if self.setup is None:
+            changed = {setup_field.name for setup_field in fields(Setup)}
+        else:
+            changed = {setup_field.name for setup_field in fields(Setup) if getattr(setup, setup_field.name) != getattr(self.setup, setup_field.name)}
+        self.setup = None  # if a stage fails, the next calculation reruns everything
+        self.last_run = []
+        for name, stage in stages.items():
+            if (changed.intersection(stage["inputs"]) or (stage["prices"] and self.prices_changed)
+                    or any(after in self.last_run for after in stage["after"])):
+                with profiler.span(name):
+                    self.state.update(stage["function"](setup, self.state))
+                self.last_run.append(name)
+        self.setup = replace(setup)
+        self.prices_changed = False
+        return make_result(self.state)
+
+
+class ResultCache():
+    def __init__(self, maxsize=256):
+        """
+        Bounded least recently used cache of calculation results.
+        The keys can be anything hashable, the calculator uses (setup ID, time span, bazaar lastUpdated).
+
+        Parameters
+        ----------
+        maxsize : int, optional
+            Maximum amount of results in the cache, the least recently used result gets removed first. The default is 256.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.maxsize = maxsize
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        return
+
+    def get(self, key):
+        """
+        Looks up a result and counts the hit or miss.
+        The returned Result is the cached object, it should not be changed.
+
+        Parameters
+        ----------
+        key : hashable
+            Key of the result.
+
+        Returns
+        -------
+        Result or None
+            The cached result, None if the key is not in the cache.
+
+        """
+        if key not in self.results:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.results.move_to_end(key)
+        return self.results[key]
+
+    def put(self, key, result):
+        """
+        Adds a result to the cache and removes the least recently used results above maxsize.
+
+        Parameters
+        ----------
+        key : hashable
+            Key of the result.
+        result : Result
+            Calculation result.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.results[key] = result
+        self.results.move_to_end(key)
+        while len(self.results) > self.maxsize:
+            self.results.popitem(last=False)
+        return
+
+    def clear(self):
+        """
+        Removes all results, for example when new prices are loaded. The hit and miss counters are kept.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.results.clear()
+        return
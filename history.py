@@ -0,0 +1,366 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 22:30:52 2026
+
+@author: Herodirk
+
+Append-only history of bazaar prices for trend charts and backtesting.
+Every bazaar.PriceBook gets appended as one row of buy and sell prices of all items.
+Rows are delta compressed: only the items of which a price changed since the previous row are saved,
+with a full keyframe row every keyframe_interval rows.
+The files are memory-mapped when reading, so only the rows that are asked for get loaded into memory.
+Appending and reading can happen on different threads, reads only see the rows that were complete when they started.
+
+Files in the history directory:
+    meta.json: keyframe_interval of the history, reading and writing both depend on it
+    items.json: item IDs, the column order of the history, new items are added at the end
+    times.bin: float64 bazaar lastUpdated time of every row in seconds
+    ends.bin: int64 end of the changes of every row in changes.bin
+    changes.bin: (item index, buyPrice, sellPrice) records of every row
+
+Example:
+    import history
+    store = history.PriceHistory("bazaar_history")
+    times, buy, sell = store.matrix(start=time.time() - 7 * 24 * 3600, items=["SNOW_BALL", "ENCHANTED_SNOW_BLOCK"])
+"""
+
+import json
+import os
+import threading
+import numpy as np
+
+change_dtype = np.dtype([("item", "<u4"), ("buy", "<f8"), ("sell", "<f8")])
+time_dtype = np.dtype("<f8")
+end_dtype = np.dtype("<i8")
+
+
+def read_array(path, dtype, length=None):
+    """
+    Memory-maps a binary file of the history as a read-only array.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+    dtype : numpy.dtype
+        Type of the records in the file.
+    length : int, optional
+        Amount of records to map. The default is all whole records in the file.
+
+    Returns
+    -------
+    numpy.ndarray or numpy.memmap
+        Records of the file.
+
+    """
+    if length is None:
+        length = os.path.getsize(path) // dtype.itemsize if os.path.isfile(path) else 0
+    if length == 0:
+        return np.zeros(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(length, ))
+
+
+class PriceHistory():
+    def __init__(self, directory, keyframe_interval=None):
+        """
+        Opens or creates the history in directory.
+        Parts of a row that were written by an interrupted append get removed.
+
+        Parameters
+        ----------
+        directory : str
+            Path of the history directory.
+        keyframe_interval : int, optional
+            Amount of rows between full rows, only used for a new history, an existing history keeps the interval in its meta.json.
+            Reads start at the keyframe before the first asked row, a higher interval saves space and a lower interval reads faster.
+            The default is the interval of the existing history, or 256 for a new history.
+            A ValueError is raised if it is given and is not the interval of the existing history.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.paths = {name: os.path.join(directory, f"{name}.bin") for name in ["times", "ends", "changes"]}
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.items_path = os.path.join(directory, "items.json")
+        if os.path.isfile(self.meta_path):
+            with open(self.meta_path, "r") as f:
+                saved_interval = json.load(f)["keyframe_interval"]
+            if keyframe_interval is not None and keyframe_interval != saved_interval:
+                raise ValueError(f"History in {directory} has keyframe_interval {saved_interval}, not {keyframe_interval}")
+            keyframe_interval = saved_interval
+        else:
+            # histories from before meta.json were all written with the default interval
+            keyframe_interval = 256 if keyframe_interval is None else keyframe_interval
+            with open(self.meta_path + ".tmp", "w") as f:
+                json.dump({"keyframe_interval": keyframe_interval}, f)
+            os.replace(self.meta_path + ".tmp", self.meta_path)
+        self.keyframe_interval = keyframe_interval
+        self.items = []
+        if os.path.isfile(self.items_path):
+            with open(self.items_path, "r") as f:
+                self.items = json.load(f)
+        self.item_index = {ID: i for i, ID in enumerate(self.items)}
+        # held while a row is appended, readers take self.rows, self.change_count and self.items under it
+        self.lock = threading.Lock()
+
+        # times.bin is written last, so it has the amount of complete rows
+        rows = os.path.getsize(self.paths["times"]) // time_dtype.itemsize if os.path.isfile(self.paths["times"]) else 0
+        ends = read_array(self.paths["ends"], end_dtype)
+        rows = min(rows, len(ends))
+        change_count = int(ends[rows - 1]) if rows > 0 else 0
+        del ends
+        for name, size in [("times", rows * time_dtype.itemsize), ("ends", rows * end_dtype.itemsize), ("changes", change_count * change_dtype.itemsize)]:
+            with open(self.paths[name], "ab") as f:
+                f.truncate(size)
+        self.rows = rows
+        self.change_count = change_count
+
+        # prices of the last row, to compare the next row to
+        self.last_time = float(read_array(self.paths["times"], time_dtype, rows)[-1]) if rows > 0 else -np.inf
+        self.last_buy = np.full(len(self.items), np.nan)
+        self.last_sell = np.full(len(self.items), np.nan)
+        if rows > 0:
+            times, buy, sell = self.read_rows(rows - 1, rows)
+            self.last_buy[:buy.shape[1]] = buy[-1]
+            self.last_sell[:sell.shape[1]] = sell[-1]
+        return
+
+    def __len__(self):
+        return self.rows
+
+    def add_items(self, IDs):
+        """
+        Adds new item IDs at the end of self.items and saves items.json.
+
+        Parameters
+        ----------
+        IDs : iterable
+            Item IDs, the ones that are already in the history are skipped.
+
+        Returns
+        -------
+        None.
+
+        """
+        new_IDs = [ID for ID in IDs if ID not in self.item_index]
+        if len(new_IDs) == 0:
+            return
+        for ID in new_IDs:
+            self.item_index[ID] = len(self.items)
+            self.items.append(ID)
+        self.last_buy = np.concatenate([self.last_buy, np.full(len(new_IDs), np.nan)])
+        self.last_sell = np.concatenate([self.last_sell, np.full(len(new_IDs), np.nan)])
+        with open(self.items_path + ".tmp", "w") as f:
+            json.dump(self.items, f)
+        os.replace(self.items_path + ".tmp", self.items_path)
+        return
+
+    def append(self, price_book):
+        """
+        Appends the prices of a bazaar.PriceBook as a new row.
+        Price books that are not newer than the last row are skipped.
+
+        Parameters
+        ----------
+        price_book : bazaar.PriceBook
+            Prices to add.
+
+        Returns
+        -------
+        bool
+            True if a row was added.
+
+        """
+        with self.lock:
+            return self.append_row(price_book)
+
+    def append_row(self, price_book):
+        """
+        Subfunction for append(), call it with self.lock held.
+
+        Parameters
+        ----------
+        price_book : bazaar.PriceBook
+            Prices to add.
+
+        Returns
+        -------
+        bool
+            True if a row was added.
+
+        """
+        if price_book.lastUpdated <= self.last_time:
+            return False
+        self.add_items(price_book.prices.keys())
+        indices = np.array([self.item_index[ID] for ID in price_book.prices.keys()], dtype=int)
+        buy = self.last_buy.copy()
+        sell = self.last_sell.copy()
+        buy[indices] = [item_prices["buyPrice"] for item_prices in price_book.prices.values()]
+        sell[indices] = [item_prices["sellPrice"] for item_prices in price_book.prices.values()]
+        if self.rows % self.keyframe_interval == 0:
+            changed = ~np.isnan(buy)
+        else:
+            changed = (buy != self.last_buy) | (sell != self.last_sell)
+            changed[np.isnan(buy)] = False
+        changes = np.zeros(np.count_nonzero(changed), dtype=change_dtype)
+        changes["item"] = np.flatnonzero(changed)
+        changes["buy"] = buy[changed]
+        changes["sell"] = sell[changed]
+
+        # the row only counts once its time is written
+        for name, data in [("changes", changes), ("ends", np.array([self.change_count + len(changes)], dtype=end_dtype)),
+                           ("times", np.array([price_book.lastUpdated], dtype=time_dtype))]:
+            with open(self.paths[name], "ab") as f:
+                f.write(data.tobytes())
+        self.rows += 1
+        self.change_count += len(changes)
+        self.last_time = price_book.lastUpdated
+        self.last_buy = buy
+        self.last_sell = sell
+        return True
+
+    def times(self):
+        """
+        Times of all rows, memory-mapped.
+
+        Returns
+        -------
+        numpy.ndarray
+            Bazaar lastUpdated times in seconds.
+
+        """
+        with self.lock:
+            rows = self.rows
+        return read_array(self.paths["times"], time_dtype, rows)
+
+    def read_rows(self, first, stop, items=None):
+        """
+        Reads rows first up to stop as dense arrays.
+        The rows are built one keyframe block at a time, starting at the keyframe before first.
+
+        Parameters
+        ----------
+        first : int
+            First row.
+        stop : int
+            Row after the last row.
+        items : list, optional
+            Item IDs of the columns. The default is self.items.
+
+        Returns
+        -------
+        times : numpy.ndarray
+            Times of the rows.
+        buy : numpy.ndarray
+            buyPrice with shape (rows, items), NaN before the first price of an item.
+        sell : numpy.ndarray
+            sellPrice with shape (rows, items), NaN before the first price of an item.
+
+        """
+        # rows that are complete now, an append on another thread does not change them
+        with self.lock:
+            rows = self.rows
+            change_count = self.change_count
+            item_index = dict(self.item_index)
+            items = list(self.items) if items is None else items
+        columns = np.full(len(item_index), -1, dtype=int)
+        for column, ID in enumerate(items):
+            if ID in item_index:
+                columns[item_index[ID]] = column
+        stop = min(stop, rows)
+        first = min(max(first, 0), stop)
+        times = np.array(read_array(self.paths["times"], time_dtype, rows)[first:stop])
+        buy = np.full((stop - first, len(items)), np.nan)
+        sell = np.full((stop - first, len(items)), np.nan)
+        ends = read_array(self.paths["ends"], end_dtype, rows)
+        changes = read_array(self.paths["changes"], change_dtype, change_count)
+
+        for block_start in range(first - first % self.keyframe_interval, stop, self.keyframe_interval):
+            block_stop = min(block_start + self.keyframe_interval, stop)
+            block_ends = np.array(ends[block_start:block_stop])
+            change_start = int(ends[block_start - 1]) if block_start > 0 else 0
+            block_changes = np.array(changes[change_start:block_ends[-1]])
+            counts = np.diff(block_ends, prepend=change_start)
+            change_rows = np.repeat(np.arange(block_stop - block_start), counts)
+            change_columns = columns[block_changes["item"]]
+            kept = change_columns >= 0
+            change_rows = change_rows[kept]
+            change_columns = change_columns[kept]
+
+            # forward fill from the last row with a change of each item
+            last_change = np.zeros((block_stop - block_start, len(items)), dtype=int)
+            last_change[change_rows, change_columns] = change_rows
+            has_change = np.zeros(last_change.shape, dtype=bool)
+            has_change[change_rows, change_columns] = True
+            last_change = np.maximum.accumulate(last_change, axis=0)
+            seen = np.logical_or.accumulate(has_change, axis=0)
+            block_buy = np.full(last_change.shape, np.nan)
+            block_sell = np.full(last_change.shape, np.nan)
+            block_buy[change_rows, change_columns] = block_changes["buy"][kept]
+            block_sell[change_rows, change_columns] = block_changes["sell"][kept]
+            column_range = np.arange(len(items))
+            block_buy = np.where(seen, block_buy[last_change, column_range], np.nan)
+            block_sell = np.where(seen, block_sell[last_change, column_range], np.nan)
+
+            skip = max(first - block_start, 0)
+            buy[block_start + skip - first:block_stop - first] = block_buy[skip:]
+            sell[block_start + skip - first:block_stop - first] = block_sell[skip:]
+        return times, buy, sell
+
+    def matrix(self, start=None, stop=None, items=None):
+        """
+        Reads the prices between two times as dense arrays.
+
+        Parameters
+        ----------
+        start : float, optional
+            First time in seconds. The default is the first row.
+        stop : float, optional
+            Last time in seconds. The default is the last row.
+        items : list, optional
+            Item IDs of the columns. The default is all items in the history.
+
+        Returns
+        -------
+        times : numpy.ndarray
+            Times of the rows.
+        buy : numpy.ndarray
+            buyPrice with shape (rows, items), NaN before the first price of an item.
+        sell : numpy.ndarray
+            sellPrice with shape (rows, items), NaN before the first price of an item.
+
+        """
+        times = self.times()
+        first = int(np.searchsorted(times, start, side="left")) if start is not None else 0
+        last = int(np.searchsorted(times, stop, side="right")) if stop is not None else self.rows
+        return self.read_rows(first, last, items)
+
+    def item_history(self, ID, start=None, stop=None):
+        """
+        Reads the prices of one item between two times.
+
+        Parameters
+        ----------
+        ID : str
+            Skyblock item ID.
+        start : float, optional
+            First time in seconds. The default is the first row.
+        stop : float, optional
+            Last time in seconds. The default is the last row.
+
+        Returns
+        -------
+        times : numpy.ndarray
+            Times of the rows.
+        buy : numpy.ndarray
+            buyPrice of every row.
+        sell : numpy.ndarray
+            sellPrice of every row.
+
+        """
+        times, buy, sell = self.matrix(start, stop, [ID])
+        return times, buy[:, 0], sell[:, 0]
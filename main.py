@@ -13,6 +13,8 @@ Notable features:
     Setup cost calculations
 Visit https://herodirk.github.io/ for an online manual.
 To open the calculator: run this file, run the function start_app()
+To calculate without the GUI: use engine.evaluate() with an engine.Setup
+To calculate many setups at once: use batch.BatchEvaluator
 
 Current major limitations:
     (Lesser) Soulflow Engines might not be accurate (there seems to be some weird rounding in game)
@@ -24,7 +26,7 @@ Current major limitations:
 Lesser limitations are listed on the support discord server,
 the invite to that server is at the bottom of https://herodirk.github.io/
 
-This program and related files (Hkinter.py and HSB_minion_data.py) are protected under a GNU GENERAL PUBLIC LICENSE (Version 3)
+This program and related files (Hkinter.py, HSB_minion_data.py, engine.py, batch.py, registry.py, setup_id.py, report.py, service.py, bazaar.py, history.py, backtest.py, sweep.py and optimizer.py) are protected under a GNU GENERAL PUBLIC LICENSE (Version 3)
 Herodirk: I dont want any legal trouble, just ask me for permission if you want to copy parts of the code for your own public projects. Copying for private projects is fine.
 
 Herodirk is not affiliated with Hypixel Inc.
@@ -34,18 +36,24 @@ Herodirk is not affiliated with Hypixel Inc.
 #%% imports
 
 import tkinter as tk
-import numpy as np
+import os
 import time
 import json
-import urllib.request
 from copy import deepcopy
 import HSB_minion_data as md
 import Hkinter
+import engine
+from engine import bazaar_buy_types, bazaar_sell_types, hopper_data
 
 #%% Settings
 
 bazaar_auto_update = True
+bazaar_url = None  # bazaar endpoint, None for the Hypixel API, can be set to the URL of a local bazaar_server.py for offline tests
 bazaar_cooldown = 60  # seconds
+bazaar_top_percent = 0.1  # fraction of the bazaar order volume that the prices are averaged over
+bazaar_snapshot_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bazaar_snapshot.json.gz")  # last bazaar data, for fast and offline starts
+bazaar_history_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bazaar_history")  # prices of every bazaar update, None to not keep a history
+result_cache_size = 256  # amount of calculation results to remember
 
 templateList = {
     "ID": {},  # would suggest to keep this one
@@ -104,29 +112,12 @@ templateList = {
     }
 }
 
-# pet_data last updated on: 2024-9-8
-pet_data = {"None": {"type": "combat", "xp": 1, "cost": {"min": 1, "max": 1}},
-            "Golden Dragon": {"type": "combat", "xp": 210255385, "cost": {"min": 650000000, "max": 1090000000}},
-            "Golden Dragon (lvl 1-100)": {"type": "combat", "xp": 25353230, "cost": {"min": 650000000, "max": 720000000}},
-            "Golden Dragon (lvl 100-200)": {"type": "combat", "xp": 184902155, "cost": {"min": 720000000, "max": 1090000000}},
-            "Black Cat": {"type": "combat", "xp": 25353230, "cost": {"min": 60000000, "max": 98000000}},
-            "Elephant": {"type": "farming", "xp": 25353230, "cost": {"min": 18500000, "max": 25000000}}}
-
+# pet prices are in md.pet_data
 # and the custom prices in md.itemList
 
 #%% Lots of Lists you should not touch
 
-bazaar_buy_types = {"Buy Order": "sellPrice", "Insta Buy": "buyPrice", "Custom": "custom"}
-bazaar_sell_types = {"Sell Offer": "buyPrice", "Insta Sell": "sellPrice", "Custom": "custom"}
-
-hopper_data = {
-    "None": 1,
-    "Budget Hopper": 0.5,
-    "Enchanted Hopper": 0.9,
-    "NPC": 1,
-    "Bazaar": 1,
-    "Best (NPC/Bazaar)": 1
-}
+# bazaar_buy_types, bazaar_sell_types and hopper_data are in engine.py
 
 reduced_amounts = {0: "", 1: "k", 2: "M", 3: "B", 4: "T"}
 
@@ -150,7 +141,7 @@ class Calculator(tk.Tk):
         #     change how and where the calculator makes the inputs and outputs for each variable
         # "display" is used whenever a human-readable form of the variable is needed
         # "initial" is the initial value of the variable
-        # "options" is a list of options for the variable, also used for encoding and decoding setup IDs
+        # "options" is a list of options for the variable, the setup IDs use the options in setup_id.fields
         # for "vtype" equal to list are extra keys: "w", "h" and "list".
         #     "w" and "h" are the width and height of the listbox widget.
         #     "list" is a normal list-like variable, most of the time a dict. This is the actual storage of the list.
@@ -184,7 +175,7 @@ class Calculator(tk.Tk):
                           "alchemyWisdom": {"vtype": "input", "noWidget": True, "dtype": float, "initial": 0.0, "options": []},
                           "wisdom": {"vtype": "list", "display": "Wisdom", "frame": "inputs_player_grid", "w": None, "h": 6, "list": {}},
                           "mayor": {"vtype": "input", "dtype": str, "display": "Mayor", "frame": "inputs_player_grid", "initial": "None", "options": ["None", "Aatrox", "Cole", "Diana", "Diaz", "Finnegan", "Foxy", "Marina", "Paul", "Jerry", "Derpy", "Scorpius"], "command": None},
-                          "levelingpet": {"vtype": "input", "dtype": str, "display": "Leveling pet", "frame": "inputs_player_grid", "initial": "None", "options": list(pet_data.keys()), "command": lambda x: self.hk.toggleSwitch("pet_leveling", x)},
+                          "levelingpet": {"vtype": "input", "dtype": str, "display": "Leveling pet", "frame": "inputs_player_grid", "initial": "None", "options": list(md.pet_data.keys()), "command": lambda x: self.hk.toggleSwitch("pet_leveling", x)},
                           "taming": {"vtype": "input", "dtype": float, "display": "Taming", "frame": "inputs_player_grid", "initial": 0.0, "options": [], "command": None},
                           "petxpboost": {"vtype": "input", "dtype": str, "display": "Pet XP boost", "frame": "inputs_player_grid", "initial": "None", "options": list(md.pet_xp_boosts.keys()), "command": None},
                           "beastmaster": {"vtype": "input", "dtype": float, "display": "Beastmaster", "frame": "inputs_player_grid", "initial": 0.0, "options": [], "command": None},
@@ -387,10 +378,38 @@ class Calculator(tk.Tk):
                            "totalProfit": None}
         print("BOOTING: Output orders defined")
 
+        # incremental calculator, keeps the stage outputs of the last calculation
+        self.evaluator = engine.Evaluator()
+        # results of earlier calculations, keyed by (setup ID, time span, bazaar lastUpdated)
+        self.result_cache = engine.ResultCache(result_cache_size)
+
         # Load bazaar prices
-        print("BOOTING: Connecting to bazaar")
+        # the saved snapshot is loaded first, the API is only called by the background refresher
+        # and the new prices are put into md.itemList between calculations by self.check_price_book()
+        print("BOOTING: Loading bazaar snapshot")
+        import bazaar
+        import history
         self.bazaar_timer = 0
-        self.update_bazaar(cooldown_warning=False)
+        raw_data = bazaar.load_snapshot(bazaar_snapshot_file)
+        if raw_data is not None:
+            try:
+                self.apply_price_book(bazaar.make_price_book(raw_data, bazaar_top_percent))
+            except KeyError as error:
+                print(f"WARNING: Could not load bazaar snapshot\n{error}")
+        print("BOOTING: Starting bazaar refresher")
+        self.price_history = None
+        if bazaar_history_dir is not None:
+            try:
+                self.price_history = history.PriceHistory(bazaar_history_dir)
+            except (OSError, ValueError) as error:
+                print(f"WARNING: Could not open bazaar history\n{error}")
+        self.refresher = bazaar.BazaarRefresher(bazaar_snapshot_file, bazaar_cooldown, bazaar_auto_update,
+                                                url=bazaar.bazaar_url if bazaar_url is None else bazaar_url,
+                                                top_percent=bazaar_top_percent, history=self.price_history)
+        self.refresher.start()
+        if time.time() - self.bazaar_timer >= bazaar_cooldown:
+            self.refresher.request_refresh()
+        self.poll_bazaar()
         print("BOOTING: Complete")
         return
 
@@ -399,6 +418,7 @@ class Calculator(tk.Tk):
     def time_number(self, secondsPaction, actionsPerHarvest):
         """
         Translates time amount and length into seconds.
+        See engine.time_number().
 
         Parameters
         ----------
@@ -413,24 +433,8 @@ class Calculator(tk.Tk):
             The inputted time amount and length as seconds.
 
         """
-        time_length = self.timelength.get()
-        time_amount = self.timeamount.get()
-        self.variables["time"]["var"].set(f"{time_amount} {time_length}")
-        if time_length == "Years":
-            return 31536000 * time_amount
-        if time_length == "Weeks":
-            return 604800 * time_amount
-        if time_length == "Days":
-            return 86400 * time_amount
-        if time_length == "Hours":
-            return 3600 * time_amount
-        if time_length == "Minutes":
-            return 60 * time_amount
-        if time_length == "Seconds":
-            return 1 * time_amount
-        if time_length == "Harvests":
-            return secondsPaction * actionsPerHarvest * time_amount
-        return 1 * time_amount
+        self.variables["time"]["var"].set(f"{self.timeamount.get()} {self.timelength.get()}")
+        return engine.time_number(self.get_setup(), secondsPaction, actionsPerHarvest)
 
     def reduced_number(self, number, decimal=2):
         """
@@ -449,6 +453,7 @@ class Calculator(tk.Tk):
             Rounded number with a size indicator letter if needed.
 
         """
+        import numpy as np
         if number == 0.0:
             return str(0)
         elif np.abs(number) < 1:
@@ -810,11 +815,7 @@ class Calculator(tk.Tk):
 
     def constructID(self):
         """
-        Generates the setup ID of the current inputted setup.
-        A setup ID consists of:
-            the version number of the minion calculator it was generated in\n
-            the index of the set value in "options" of each self.variable with "vtype" equal to "input" encoded in ASCII with an offset of 48\n
-            the set value surrounded by exclamation marks if a self.variable has an empty "options" list
+        Generates the setup ID of the current inputted setup, see setup_id.py for the format.
 
         Returns
         -------
@@ -822,23 +823,13 @@ class Calculator(tk.Tk):
             Setup ID.
 
         """
-        ID = str(self.version.get()) + "!"
-        for key, var_data in self.variables.items():
-            if var_data["vtype"] != "input":
-                continue
-            val = var_data["var"].get()
-            if len(var_data["options"]) == 0:
-                if int(val) == val:
-                    val = int(val)
-                ID += "!" + str(val) + "!"
-            else:
-                index = var_data["options"].index(val)
-                ID += chr(48 + index)
-        return ID
+        import setup_id
+        return setup_id.encode(self.get_setup())
 
     def decodeID(self, ID):
         """
         Generates a template structure for load_template() from a given setup ID.
+        IDs of older versions, like the "1.0!" IDs, are migrated to the current inputs.
 
         Parameters
         ----------
@@ -848,107 +839,46 @@ class Calculator(tk.Tk):
         Returns
         -------
         dict
-            Template structure for load_template().
+            Template structure for load_template(), empty if the ID is invalid.
 
         """
-        template = {}
-        end_ver = ID.find("!")
-        if end_ver == -1:
-            print("WARNING: Invalid ID, could not find version number")
-            return template
-        try:
-            version = float(ID[0:end_ver])
-        except Exception:
-            print("WARNING: Invalid ID, could not find version number")
-            return template
-        ID_index = end_ver + 1
-        if version != self.version.get():
-            print("WARNING: Invalid ID: Incompatible version")
-            return template
-        try:
-            for key, var_data in self.variables.items():
-                if var_data["vtype"] != "input":
-                    continue
-                if len(var_data["options"]) == 0:
-                    if ID[ID_index] != "!":
-                        print(f"WARNING: did not find {key}")
-                        return
-                    end_val = ID.find("!", ID_index + 1)
-                    template[key] = var_data["dtype"](ID[ID_index + 1:end_val])
-                    ID_index = end_val + 1
-                else:
-                    template[key] = var_data["options"][ord(ID[ID_index]) - 48]
-                    ID_index += 1
-        except Exception as error:
-            if type(error) == IndexError:
-                print("WARNING: Invalid ID, ID incomplete")
-                return {}
-            else:
-                print("ERROR: unknown error\ndumping error logs", error)
-                return {}
-        return template
+        import setup_id
+        return setup_id.decode(ID)
+
+    def get_setup(self):
+        """
+        Collects the current inputs of the calculator into an engine.Setup.
+        Every self.variable with "vtype" equal to "input" is copied, together with the time span.
+
+        Returns
+        -------
+        setup : engine.Setup
+            Headless version of the inputted setup.
+
+        """
+        setup = engine.Setup(timeamount=self.timeamount.get(), timelength=self.timelength.get())
+        for var_key, var_data in self.variables.items():
+            if var_data["vtype"] == "input":
+                setattr(setup, var_key, var_data["var"].get())
+        return setup
 
     def getPrice(self, ID, action="buy", location="bazaar", force=False):
         """
         Returns the price of an item from ID, transaction type and location of transaction.
         Uses self.variables "bazaar_buy_type" and "bazaar_sell_type" for bazaar specifics.
-
-        Parameters
-        ----------
-        ID : str
-            Skyblock Item ID of which the price is needed.
-        action : str, optional
-            Type of transaction. "buy" or "sell". The default is "buy".
-        location : str, optional
-            Location of the transaction, "npc", "bazaar", "custom", "best". The default is "bazaar".
-        force : bool, optional
-            Toggle to force the location and action, if location is not found, this function returns -1
+        See engine.getPrice() for the parameters.
 
         Returns
         -------
         float
             price of the item.
         """
-        multiplier = 1
-        if location == "bazaar":
-            if action == "buy":
-                location = bazaar_buy_types[self.variables["bazaar_buy_type"]["var"].get()]
-            elif action == "sell":
-                location = bazaar_sell_types[self.variables["bazaar_sell_type"]["var"].get()]
-                if self.variables["bazaar_taxes"]["var"].get():
-                    bazaar_tax = 0.0125 - 0.00125 * self.variables["bazaar_flipper"]["var"].get()
-                    if self.variables["mayor"]["var"].get() == "Derpy":
-                        bazaar_tax *= 4
-                    multiplier = 1 - bazaar_tax
-        elif location == "npc" and action == "buy":
-            multiplier = 2
-        if ID in md.itemList:
-            if location in md.itemList[ID]["prices"]:
-                return multiplier * md.itemList[ID]["prices"][location]
-            elif force:
-                print("WARNING:", ID, "no forced cost found")
-                return -1
-            elif "npc" in md.itemList[ID]["prices"]:
-                return multiplier * md.itemList[ID]["prices"]["npc"]
-            elif "custom" in md.itemList[ID]["prices"]:
-                return md.itemList[ID]["prices"]["custom"]
-            else:
-                print("WARNING:", ID, "no cost found")
-                return 0
-        else:
-            print("WARNING:", ID, "not in itemList")
-            return 0
+        return engine.getPrice(self.get_setup(), ID, action=action, location=location, force=force)
 
     def getPetXP(self, xp_type, xp_amount):
         """
         Calculated gained pet xp from an xp amount and type
-
-        Parameters
-        ----------
-        xp_type : str
-            Type of skill XP.
-        xp_amount : float
-            Amount of xp.
+        See engine.getPetXP() for the parameters.
 
         Returns
         -------
@@ -956,27 +886,14 @@ class Calculator(tk.Tk):
             Amount of pet xp
 
         """
-        pet = self.variables["levelingpet"]["var"].get()
-        petxpbonus = (1 + self.variables["taming"]["var"].get() / 100) * (1 + self.variables["beastmaster"]["var"].get() / 100)
-        if md.pet_xp_boosts[self.variables["petxpboost"]["var"].get()][0] in [xp_type, "all"] and pet not in ["Golden Dragon", "Golden Dragon (lvl 1-100)"]:
-            petxpbonus *= 1 + md.pet_xp_boosts[self.variables["petxpboost"]["var"].get()][1] / 100
-        if self.variables["mayor"]["var"].get() == "Diana":
-            petxpbonus *= 1.35
-        if xp_type in ["mining", "fishing"]:
-            petxpbonus *= 1.5
-        if pet_data[pet]["type"] != xp_type:
-            if xp_type in ["alchemy", "enchanting"]:
-                petxpbonus *= 1 / 12
-            else:
-                petxpbonus *= 1 / 3
-        if pet == "Reindeer":
-            petxpbonus *= 2
-        pet_xp = xp_amount * petxpbonus
-        return pet_xp
+        return engine.getPetXP(self.get_setup(), xp_type, xp_amount)
 
     def calculate(self, inGUI=True):
         """
         Main calculation
+        Sends the inputted setup to the engine.Evaluator in self.evaluator and puts the results into self.variables.
+        The evaluator only reruns the calculation stages of which an input changed since the last calculation.
+        Results are remembered in self.result_cache, a repeated setup with the same bazaar data is not calculated again.
 
         Parameters
         ----------
@@ -992,445 +909,27 @@ class Calculator(tk.Tk):
             self.statusC.configure(bg="yellow")
             self.statusC.update()
 
-        # auto update bazaar
-        if bazaar_auto_update:
-            self.update_bazaar(cooldown_warning=False)
-
-        # clear list outputs from previous calculation
-        for var_key, var_data in self.variables.items():
-            if var_data["vtype"] == "list":
-                if var_key == "wisdom":
-                    continue
-                var_data["list"].clear()
-
-        # extracting often used minion constants
-        minion_type = self.variables["minion"]["var"].get()
-        minion_tier = self.variables["miniontier"]["var"].get()
-        base_speed = md.minionList[minion_type]["speed"][minion_tier]
-        minion_amount = self.variables["amount"]["var"].get()
-        minion_fuel = md.fuel_options[self.variables["fuel"]["var"].get()]
-        minion_hopper = self.variables["hopper"]["var"].get()
-        minion_beacon = self.variables["beacon"]["var"].get()
-        upgrades = [md.upgrade_options[self.variables["upgrade1"]["var"].get()], md.upgrade_options[self.variables["upgrade2"]["var"].get()]]
-
-        # list upgrades types
-        upgrades_types = []
-        for upgrade in upgrades:
-            for temp_type in md.itemList[upgrade]["upgrade"]["special"]["type"].split(", "):
-                upgrades_types.append(temp_type)
-
-        # adding up minion speed bonus
-        # uses the fact that booleans can be seen as 0 or 1 or false and true resp.
-        speedBonus = 0
-        speedBonus += md.itemList[minion_fuel]["upgrade"]["speed"]
-        speedBonus += md.itemList[upgrades[0]]["upgrade"]["speed"] + md.itemList[upgrades[1]]["upgrade"]["speed"]
-        speedBonus += 2 * minion_beacon + 10 * self.variables["infusion"]["var"].get()
-        speedBonus += 0.3 * self.variables["afkpet"]["var"].get() * self.variables["afk"]["var"].get()
-        speedBonus += 5 * self.variables["potatoTalisman"]["var"].get() * self.variables["afk"]["var"].get() * (minion_type == "Potato")
-        if self.variables["crystal"]["var"].get() != "None":
-            if minion_type in list(md.floating_crystals[self.variables["crystal"]["var"].get()].values())[0]:
-                speedBonus += list(md.floating_crystals[self.variables["crystal"]["var"].get()].keys())[0]
-        if minion_beacon != 0:
-            speedBonus += 1 * self.variables["scorched"]["var"].get()
-        if minion_type == "Inferno":
-            speedBonus += 18 * min(10, minion_amount)
-        if self.variables["mayor"]["var"].get() == "Cole" and self.variables["afk"]["var"].get() and minion_type in [
-                'Cobblestone', 'Obsidian', 'Glowstone', 'Gravel', 'Sand', 'Ice', 'Coal', 'Iron',
-                'Gold', 'Diamond', 'Lapis', 'Redstone', 'Emerald', 'Quartz', 'End Stone', 'Mithril']:
-            speedBonus += 25
-
-        # multiply up minion drop bonus
-        # For offline drop multipliers, it is only assumed that Derpy and Fuel work.
-        # When AFKing, Derpy only doubles base drops. In the offline calculations, Derpy doubles everything that gets made in a minion.
-        dropMultiplier_base = 1
-        dropMultiplier_offline = 1
-        dropMultiplier_base *= md.itemList[minion_fuel]["upgrade"]["drop"]
-        dropMultiplier_base *= md.itemList[upgrades[0]]["upgrade"]["drop"]
-        dropMultiplier_base *= md.itemList[upgrades[1]]["upgrade"]["drop"]
-        if "SOULFLOW_ENGINE" in upgrades and minion_type == "Voidling":
-            dropMultiplier_base *= 2 * (0.5 + 0.03 * minion_tier)  # needs testing
-        if self.variables["mayor"]["var"].get() == "Derpy" and self.variables["afk"]["var"].get():
-            dropMultiplier_base *= 2
-        if not self.variables["afk"]["var"].get():
-            dropMultiplier_offline *= md.itemList[minion_fuel]["upgrade"]["drop"]
-
-        # AFKing and Special Setups
-        actionsPerHarvest = 2
-        if minion_type == "Fishing":
-            # only has harvests actions
-            actionsPerHarvest = 1
-        if self.variables["afk"]["var"].get():
-            if minion_type in ["Pumpkin", "Melon"]:
-                # pumpkins and melons are forced to regrow for minion to harvest
-                actionsPerHarvest = 1
-            if self.variables["specialSetup"]["var"].get():
-                if minion_type in ["Cobblestone", "Mycelium", "Ice", "Oak"]:
-                    # cobblestone generator, regrowing mycelium, freezing water, player harvesting
-                    actionsPerHarvest = 1
-                if minion_type in ["Flower", "Sand", "Red Sand", "Gravel"]:
-                    # harvests through natural means: water flushing, gravity
-                    actionsPerHarvest = 1
-                    speedBonus -= 10  # only spawning has 10% action speed reduction, not confirmed yet.
-
-        # AFK loot table changes
-        if minion_type in ['Oak', 'Spruce', 'Birch', 'Dark Oak', 'Acacia', 'Jungle']:
-            if self.variables["afk"]["var"].get():
-                # chopped trees have 4 blocks of wood, unknown why offline gives 3
-                md.minionList[minion_type]["drops"][md.getID[f"{minion_type} Wood"]] = 4
-            else:
-                md.minionList[minion_type]["drops"][md.getID[f"{minion_type} Wood"]] = 3
-        if minion_type == "Flower":
-            if self.variables["afk"]["var"].get() and self.variables["specialSetup"]["var"].get():
-                # tall flows blocked by string
-                md.minionList[minion_type]["drops"] = {"YELLOW_FLOWER": 1 / 10, "RED_ROSE": 1 / 10, "SMALL_FLOWER": 8 / 10}
-            else:
-                md.minionList[minion_type]["drops"] = {"YELLOW_FLOWER": 1 / 14, "RED_ROSE": 1 / 14, "SMALL_FLOWER": 8 / 14, "LARGE_FLOWER": 4 / 14}
-
-        # calculate final minion speed
-        secondsPaction = base_speed / (1 + speedBonus / 100)
-        if minion_fuel == "INFERNO_FUEL":
-            secondsPaction /= 1 + md.infernofuel_data["grades"][md.getID[self.variables["infernoGrade"]["var"].get()]]
+        # newest bazaar prices of the background refresher, never waits for the API
+        self.check_price_book()
 
-        # time calculations
-        timeNumber = self.time_number(secondsPaction, actionsPerHarvest)
-        if self.timelength.get() == "Harvests":
-            harvestsPerTime = self.timeamount.get()
-        else:
-            harvestsPerTime = timeNumber / (actionsPerHarvest * secondsPaction)
-
-        self.variables["actiontime"]["var"].set(secondsPaction)
-
-        # base drops
-        for item, amount in md.minionList[minion_type]["drops"].items():
-            self.variables["items"]["list"][item] = harvestsPerTime * amount * dropMultiplier_base
-
-        # upgrade drops
-        # create seperate dict to keep it separate from the main drops
-        # because some upgrades use main drops to generate something
-        upgrade_drops = {}
-        for upgrade in upgrades:
-            upgrade_type = md.itemList[upgrade]["upgrade"]["special"]["type"]
-            if "replace" in upgrade_type:
-                # replacing upgrades are like Auto Smelters
-                items = list(self.variables["items"]["list"].keys())
-                for item in items:
-                    if item in md.itemList[upgrade]["upgrade"]["special"]["list"]:
-                        self.variables["items"]["list"][md.itemList[upgrade]["upgrade"]["special"]["list"][item]] = self.variables["items"]["list"].pop(item)
-            if upgrade_type == "generate":
-                # generating upgrades are like Diamond Spreadings
-                finalAmount = 0
-                for amount in self.variables["items"]["list"].values():
-                    finalAmount += md.itemList[upgrade]["upgrade"]["special"]["chance"] * amount
-                for item, amount in md.itemList[upgrade]["upgrade"]["special"]["item"].items():
-                    upgrade_drops[item] = finalAmount * amount
-            elif upgrade_type == "add":
-                # adding upgrades are like Corrupt Soils
-                for item, amount in md.itemList[upgrade]["upgrade"]["special"]["item"].items():
-                    upgrade_drops[item] = harvestsPerTime * amount * dropMultiplier_offline
-            elif upgrade_type == "timer":
-                # timer upgrades are like Soulflow Engines
-                for item, amount in md.itemList[upgrade]["upgrade"]["special"]["item"].items():
-                    upgrade_drops[item] = amount * timeNumber / md.itemList[upgrade]["upgrade"]["special"]["cooldown"]
-
-        # upgrades behavior when afking
-        if self.variables["afk"]["var"].get() is True:
-            if "CORRUPT_SOIL" in upgrades:
-                if "afkcorrupt" in md.minionList[minion_type]:
-                    # Certain mob minions get more corrupt drops when afking
-                    # It is not a constant multiplier, it is chances equivalent to the main drop of the minion
-                    upgrade_drops["SULPHUR_ORE"] *= md.minionList[minion_type]["afkcorrupt"]
-                    upgrade_drops["CORRUPTED_FRAGMENT"] *= md.minionList[minion_type]["afkcorrupt"]
-            if "ENCHANTED_EGG" in upgrades:
-                # Enchanted Eggs make one laid egg and one egg on kill while AFKing
-                upgrade_drops["EGG"] *= 2
-        else:
-            if "ENCHANTED_SHEARS" in upgrades:
-                # No wool gets added from Enchanted Shears when offline
-                upgrade_drops["WOOL"] = 0
-
-        # Inferno minion fuel drops
-        # https://wiki.hypixel.net/Inferno_Minion_Fuel
-        if minion_fuel == "INFERNO_FUEL":
-            # distilate drops
-            distilate = md.getID[self.variables["infernoDistilate"]["var"].get()]
-            distilate_item = md.infernofuel_data["distilates"][distilate][0]
-            amount_per = md.infernofuel_data["distilates"][distilate][1]
-            upgrade_drops[distilate_item] = 0
-            # base_item_amount = 1 / 5 + (amount_per * 4) / 5
-            static_items = list(self.variables["items"]["list"].items())  # create copy to edit list while looping it
-            for item, amount in static_items:  # replacing main drops with distilate drops
-                distilate_amount = (amount * 4) / 5
-                upgrade_drops[distilate_item] += distilate_amount * amount_per
-                self.variables["items"]["list"][item] /= 5
-
-            # Hypergolic drops
-            if self.variables["infernoGrade"]["var"].get() == "Hypergolic Gabagool":  # hypergolic fuel stuff
-                multiplier = 1
-                if self.variables["infernoEyedrops"]["var"].get() is True:  # Capsaicin Eyedrops
-                    multiplier = 1.3
-                for item, chance in md.infernofuel_data["drops"].items():
-                    upgrade_drops[item] = 0
-                    if item == "INFERNO_APEX" and minion_tier >= 10:  # Apex Minion perk
-                        chance *= 2
-                    upgrade_drops[item] += multiplier * chance * harvestsPerTime
-                upgrade_drops["HYPERGOLIC_IONIZED_CERAMICS"] = timeNumber / md.itemList[minion_fuel]["upgrade"]["duration"]
-
-            # calculate fuel cost
-            infernofuel_components = {"INFERNO_FUEL_BLOCK": 2,  # 2 inferno fuel blocks
-                                      distilate: 6,  # 6 times distilate item
-                                      md.getID[self.variables["infernoGrade"]["var"].get()]: 1,  # 1 gabagool core
-                                      "CAPSAICIN_EYEDROPS_NO_CHARGES": int(self.variables["infernoEyedrops"]["var"].get())  # capsaicin eyedrops
-                                      }
-            costPerInfernofuel = 0
-            for component_ID, amount in infernofuel_components.items():
-                costPerInfernofuel += amount * self.getPrice(component_ID, action="buy", location="bazaar")
-            md.itemList["INFERNO_FUEL"]["prices"]["custom"] = costPerInfernofuel
-            # the fuel cost is put into the item data to be used later in the general fuel cost calculator
-            pass
-
-        # add extra diamonds from offline diamond spreading
-        if self.variables["afk"]["var"].get() is False and "DIAMOND_SPREADING" in upgrades:
-            static_upgrade_items = list(upgrade_drops.items())
-            for itemtype, amount in static_upgrade_items:
-                if itemtype == "DIAMOND":  # Diamond spreadings don't trigger on themselves,
-                    continue  # currently Diamonds can only be in upgrade_drops through diamond spreadings so this should work
-                upgrade_drops["DIAMOND"] += amount * 0.1
-
-        # add upgrade drops to main item list
-        for item, amount in upgrade_drops.items():
-            if item not in self.variables["items"]["list"]:
-                self.variables["items"]["list"][item] = 0
-            self.variables["items"]["list"][item] += amount
-
-        # Offline mode Derpy
-        # The offline doubling has only been seen on Corrupt Soil and Diamond Spreading
-        # but is assumed to work on everything
-        if self.variables["mayor"]["var"].get() == "Derpy" and self.variables["afk"]["var"].get() is False:
-            for itemtype in self.variables["items"]["list"].keys():
-                self.variables["items"]["list"][itemtype] *= 2
-
-        # (Super) Compactor logic at the end because it applies to both drop groups
-        # for both compactor types it floors the ratio between items and needed items for one compacted
-        # multiplies the floored ratio if the action creates multiple compacted item
-        # uses modulo to find the left over amount
-        # Compactors
-        # loops once through item list because there are no double normal compacted items
-        if "compact" in upgrades_types:
-            static_items = list(self.variables["items"]["list"].items())
-            for item, amount in static_items:
-                if item in md.compactorList:
-                    compact_name, percompact = list(md.compactorList[item].items())[0]
-                    compact_amount = int(amount / percompact)
-                    if compact_amount == 0:
-                        continue
-                    elif "amount" in md.compactorList[item]:
-                        compact_amount *= md.compactorList[item]["amount"]
-                    left_over = amount % percompact
-                    if left_over == 0.0:
-                        del self.variables["items"]["list"][item]
-                    else:
-                        self.variables["items"]["list"][item] = left_over
-                    self.variables["items"]["list"][compact_name] = compact_amount
-            pass
-
-        # Super compactor
-        # loops continously through the item list until is cannot find something to compact
-        found_enchantable = True
-        safety_lock = 0
-        while found_enchantable is True:
-            safety_lock += 1
-            if safety_lock >= 10:  # safety to prevent an infinite while loop
-                print("WARNING: While-loop overflow, super compactor 3000")
-                break
-            found_enchantable = False
-            if "enchant" in upgrades_types:
-                static_items = list(self.variables["items"]["list"].items())
-                for item, amount in static_items:
-                    if item in md.enchanterList:
-                        enchanted_name, perenchanted = list(md.enchanterList[item].items())[0]
-                        enchanted_amount = int(amount / perenchanted)
-                        if enchanted_amount == 0:
-                            continue
-                        elif "amount" in md.enchanterList[item]:
-                            enchanted_amount *= md.enchanterList[item]["amount"]
-                        left_over = amount % perenchanted
-                        if left_over == 0.0:
-                            del self.variables["items"]["list"][item]
-                        else:
-                            self.variables["items"]["list"][item] = left_over
-                        self.variables["items"]["list"][enchanted_name] = enchanted_amount
-                        if enchanted_name in md.enchanterList:
-                            found_enchantable = True
-
-        # storage calculations
-        # amount of storage measured in slots
-        avaible_storage = md.minion_chests[self.variables["chest"]["var"].get()]
-        if "storage" in md.minionList[minion_type] and minion_tier in md.minionList[minion_type]["storage"]:
-            avaible_storage += md.minionList[minion_type]["storage"][minion_tier]
-        else:
-            avaible_storage += md.standard_storage[minion_tier]
-
-        # WARNING: this calculation does not work with compactors and is not accurate for setup with multiple drops
-        used_storage = 0
-        for amount in self.variables["items"]["list"].values():
-            used_storage += amount / 64
-        fill_time = (timeNumber * avaible_storage) / used_storage
-        self.variables["filltime"]["var"].set(fill_time)
-
-        # multiply drops by minion amount
-        # all processes as calculated above should be linear with minion amount
-        for itemtype in self.variables["items"]["list"].keys():
-            self.variables["items"]["list"][itemtype] *= minion_amount
-
-        # convert items into coins and xp
-        # while keeping track where items get sold
-        # it makes a list of all prices and takes the one that matches the choice of hopper
-        coinsPerTime = 0.0
-        sellto = "NPC"
-        if minion_hopper == "Bazaar":
-            sellto = "bazaar"
-        elif minion_hopper == "Best (NPC/Bazaar)":
-            sellto = "best"
-        prices = {}
-        if minion_hopper != "None":
-            for itemtype, amount in self.variables["items"]["list"].items():
-                prices.clear()
-                prices["NPC"] = self.getPrice(itemtype, "sell", "npc", force=False)
-                prices["bazaar"] = self.getPrice(itemtype, "sell", "bazaar", force=False)
-                if sellto in prices:
-                    final_price = prices[sellto]
-                    self.variables["sellLoc"]["list"][itemtype] = sellto
-                else:
-                    self.variables["sellLoc"]["list"][itemtype] = max(prices, key=prices.get)
-                    final_price = prices[self.variables["sellLoc"]["list"][itemtype]]
-                self.variables["itemtypeProfit"]["list"][itemtype] = amount * final_price * hopper_data[minion_hopper]
-                coinsPerTime += amount * final_price
-        for itemtype, amount in self.variables["items"]["list"].items():
-            xptype, value = list(*md.itemList[itemtype]["xp"].items())
-            if value == 0:
-                continue
-            if xptype not in self.variables["xp"]["list"]:
-                self.variables["xp"]["list"][xptype] = 0
-            self.variables["xp"]["list"][xptype] += amount * value * (1 + self.variables["wisdom"]["list"][xptype].get() / 100)
-        if self.variables["mayor"]["var"].get() == "Derpy":
-            for xptype in self.variables["xp"]["list"].keys():
-                self.variables["xp"]["list"][xptype] *= 1.5
-        coinsPerTime *= hopper_data[minion_hopper]
-        self.variables["itemProfit"]["var"].set(coinsPerTime)
-
-        # Pet leveling calculations
-        # https://wiki.hypixel.net/Pets#Leveling
-        # for golden dragon: the program slowly adds the xp to the pets
-        # while keeping in mind that golden dragons below lvl 100 cannot hold pet items
-        # the pet costs are manually added in pet_data
-        petXPPerTime = 0.0
-        petProfitPerTime = 0.0
-        pet = self.variables["levelingpet"]["var"].get()
-        exp_boost_type = md.pet_xp_boosts[self.variables["petxpboost"]["var"].get()][0]
-        exp_boost_perc = md.pet_xp_boosts[self.variables["petxpboost"]["var"].get()][1]
-        if pet == "Golden Dragon":
-            for skill, amount in self.variables["xp"]["list"].items():
-                remaining_xp = self.getPetXP(skill, amount)
-                if exp_boost_type in [skill, "all"]:
-                    boost = 1 + exp_boost_perc / 100
-                else:
-                    boost = 1
-                safety_lock = 100
-                while remaining_xp > 0 and safety_lock > 0:
-                    safety_lock -= 1
-                    current_petXP = petXPPerTime % 210255385
-                    if current_petXP < 25353230:
-                        using_xp = min(remaining_xp, 25353230 - current_petXP)
-                        petXPPerTime += using_xp
-                        remaining_xp -= using_xp
-                    else:
-                        using_xp = min(remaining_xp * boost, 210255385 - current_petXP)
-                        petXPPerTime += using_xp
-                        remaining_xp -= using_xp / boost
-                if safety_lock == 0:
-                    print("WARNING: While loop overflow, Golden Dragon calculations")
-        elif pet != "None":
-            for skill, amount in self.variables["xp"]["list"].items():
-                petXPPerTime += self.getPetXP(skill, amount)
-        if pet != "None":
-            maxpetsPerTime = petXPPerTime / pet_data[pet]["xp"]
-            petProfitPerTime = maxpetsPerTime * (pet_data[pet]["cost"]["max"] - pet_data[pet]["cost"]["min"])
-        self.variables["petProfit"]["var"].set(petProfitPerTime)
-
-        # calculating beacon and limited fuel cost
-        fuelCostPerTime = 0.0
-        if minion_beacon != 0:
-            if self.variables["scorched"]["var"].get():
-                beacon_fuel_ID = "SCORCHED_POWER_CRYSTAL"
-            else:
-                beacon_fuel_ID = "POWER_CRYSTAL"
-            costPerCrystal = self.getPrice(beacon_fuel_ID, "buy", "bazaar")
-            fuelCostPerTime += timeNumber * costPerCrystal / md.itemList[beacon_fuel_ID]["duration"] * int(not (self.variables["B_constant"]["var"].get()))
-        if md.itemList[minion_fuel]["upgrade"]["duration"] != 0:
-            costPerFuel = self.getPrice(minion_fuel, "buy", "bazaar")
-            fuelCostPerTime += minion_amount * timeNumber * costPerFuel / md.itemList[minion_fuel]["upgrade"]["duration"]
-        self.variables["fuelcost"]["var"].set(fuelCostPerTime)
-
-        # Setup cost
-        total_cost = 0.0
-        # Single minion cost
-        minion_item_cost = {}
-        tier_loop = np.arange(minion_tier) + 1
-        for tier in tier_loop:
-            if minion_type in md.extraMinionCosts:
-                if tier in md.extraMinionCosts[minion_type]:
-                    for cost_type, amount in md.extraMinionCosts[minion_type][tier].items():
-                        if cost_type == "COINS":
-                            total_cost += md.extraMinionCosts[minion_type][tier]["COINS"]
-                        else:
-                            self.variables["notes"]["list"]["Extra cost"] = f"{amount} {cost_type.replace('_', ' ').title()} per minion"
-            for item, amount in md.minionCosts[minion_type][tier].items():
-                if item not in minion_item_cost:
-                    minion_item_cost[item] = 0
-                minion_item_cost[item] += amount
-        for item_ID, amount in minion_item_cost.items():
-            total_cost += amount * self.getPrice(item_ID, "buy", "bazaar")
-        # Infinite fuel cost
-        if minion_fuel != "NONE" and md.itemList[minion_fuel]["upgrade"]["duration"] == 0:
-            total_cost += self.getPrice(minion_fuel, "buy", "bazaar")
-        # Hopper cost
-        if minion_hopper in ["Budget Hopper", "Enchanted Hopper"]:
-            hopper_ID = md.getID[minion_hopper]
-            total_cost += self.getPrice(hopper_ID, "buy", "bazaar")
-        # Internal minion upgrades cost
-        for upgrade in upgrades:
-            if upgrade != "NONE":
-                total_cost += self.getPrice(upgrade, "buy", "bazaar")
-        # Infusion cost
-        if self.variables["infusion"]["var"].get() is True:
-            total_cost += self.getPrice("MITHRIL_INFUSION", "buy", "bazaar")
-
-        # multiply by minion amount
-        total_cost *= minion_amount
-
-        # Beacon cost
-        if minion_beacon != 0 and not self.variables["B_acquired"]["var"].get():
-            for i in np.arange(minion_beacon) + 1:
-                for item_ID, amount in md.upgrades_material_cost["beacon"][i].items():
-                    total_cost += amount * self.getPrice(item_ID, "buy", "bazaar")
-
-        # Floating Crystal cost
-        if self.variables["crystal"]["var"].get() != "None":
-            for item_ID, amount in md.upgrades_material_cost["crystal"][self.variables["crystal"]["var"].get()].items():
-                total_cost += amount * self.getPrice(item_ID, "buy", "bazaar")
+        ID = self.constructID()
+        cache_key = (ID, self.timeamount.get(), self.timelength.get(), self.bazaar_timer)
+        result = self.result_cache.get(cache_key)
+        if result is None:
+            result = self.evaluator.evaluate(self.get_setup())
+            self.result_cache.put(cache_key, result)
 
         # Sending results to self.variables
-        self.variables["setupcost"]["var"].set(total_cost)
-        self.variables["harvests"]["var"].set(minion_amount * harvestsPerTime)
-        self.variables["petxp"]["var"].set(petXPPerTime)
-        self.variables["totalProfit"]["var"].set(self.variables["itemProfit"]["var"].get() + self.variables["petProfit"]["var"].get() - self.variables["fuelcost"]["var"].get())
+        # list outputs are cleared and filled to keep the dicts of the listboxes
+        for var_key, var_data in self.variables.items():
+            if var_data["vtype"] == "output" and hasattr(result, var_key):
+                var_data["var"].set(getattr(result, var_key))
+            elif var_data["vtype"] == "list" and var_key != "wisdom":
+                var_data["list"].clear()
+                var_data["list"].update(getattr(result, var_key))
 
         # Construct ID
-        self.variables["ID"]["var"].set(self.constructID())
-
-        # Get minion notes
-        if "notes" in md.minionList[self.variables["minion"]["var"].get()]:
-            self.variables["notes"]["list"].update(md.minionList[self.variables["minion"]["var"].get()]["notes"].copy())
+        self.variables["ID"]["var"].set(ID)
 
         # Update listboxes
         self.update_GUI()
@@ -1439,43 +938,65 @@ class Calculator(tk.Tk):
             self.statusC.update()
         return
 
+    def backtest_setup(self, ID=None, start=None, stop=None):
+        """
+        Calculates the item profit, fuel cost, total profit and setup cost of a setup
+        with the prices of every bazaar update in self.price_history between start and stop.
+
+        Parameters
+        ----------
+        ID : str, optional
+            Setup ID. The default is the inputted setup.
+        start : float, optional
+            First time in seconds. The default is the first bazaar update in the history.
+        stop : float, optional
+            Last time in seconds. The default is the last bazaar update in the history.
+
+        Returns
+        -------
+        dict
+            "times" and the outputs in backtest.backtest_outputs as arrays over the bazaar updates, see backtest.Backtest.run().
+
+        """
+        if self.price_history is None:
+            print("ERROR: There is no bazaar history, set bazaar_history_dir")
+            return {}
+        setup = self.get_setup()
+        if ID is not None:
+            template = self.decodeID(ID)
+            if not template:
+                return {}
+            for var_key, value in template.items():
+                setattr(setup, var_key, value)
+        import backtest
+        return backtest.Backtest(setup).run(self.price_history, start, stop)
+
     def loop_minions(self):
         """
-        WARNING: CURRENTLY BROKEN\n
-        Loops through every minion for the inputted setup and prints Short Output
+        Loops through every minion at its highest tier for the inputted setup with batch.BatchEvaluator
+        and prints the minions sorted on total profit (without pet leveling).
 
         Returns
         -------
         None.
 
         """
-        outputlist = {}
-        for minion in md.minionList.keys():
-            self.variables["minion"]["var"].set(minion)
-            self.load_minion(minion)
-            self.calculate()
-            time.sleep(0.1)
-            self.output_data(toTerminal=True)
-            crafted_dict = {}
-            for info, data in self.outputsList.items():
-                if data["switch"].get() is True:
-                    variable_data = data["var"].get()
-                    crafted_dict[info] = variable_data
-            if len(crafted_dict) == 1:
-                outputlist[minion] = list(deepcopy(crafted_dict).values())[0]
-            else:
-                outputlist[minion] = deepcopy(crafted_dict)
-        time.sleep(0.1)
-        print(outputlist)
-        print("Highest: ", max(outputlist, key=outputlist.get))
+        import batch
+        self.check_price_book()
+        setup = self.get_setup()
+        batch_eval = batch.BatchEvaluator(setup, tiers="max", fuels=[setup.fuel], upgrades1=[setup.upgrade1], upgrades2=[setup.upgrade2])
+        results = batch_eval.evaluate()
+        ranking = batch_eval.rank(results, top=len(batch_eval.minions))
+        for minion_setup, profit in ranking:
+            print(f"{minion_setup.minion} T{minion_setup.miniontier}: {self.reduced_number(profit)}")
+        print("Highest: ", ranking[0][0].minion)
         return
 
     def update_bazaar(self, cooldown_warning=True):
         """
-        Checks if a bazaar_cooldown amount of seconds has passed,
-        calls to Hypixel API for most recent bazaar data,
-        handles that data to calculate accurate buy and sell prices.
-        To get accurate prices, it takes a top percentage (top 10% default) of the orders and takes the average of them.
+        Checks if a bazaar_cooldown amount of seconds has passed
+        and asks the background refresher to call the Hypixel API for the most recent bazaar data.
+        Does not wait for the API call, the new prices are loaded by self.poll_bazaar() or the next calculation.
 
         Returns
         -------
@@ -1486,40 +1007,59 @@ class Calculator(tk.Tk):
             if cooldown_warning:
                 print("WARNING: Bazaar is on cooldown")
             return
-        try:
-            f = urllib.request.urlopen(r"https://api.hypixel.net/v2/skyblock/bazaar")
-            call_data = f.read().decode('utf-8')
-        except Exception as error:
-            print(f"ERROR: Could not finish API call\n{error}")
-            return
-        raw_data = json.loads(call_data)
-        if "success" not in raw_data or raw_data["success"] is False:
-            print("ERROR: API call was unsuccessful")
-            return
-        self.bazaar_timer = raw_data["lastUpdated"] / 1000
+        self.refresher.request_refresh()
+        return
+
+    def apply_price_book(self, price_book):
+        """
+        Puts the prices of a bazaar.PriceBook into md.itemList
+        and clears the price dependent stages of self.evaluator and the results in self.result_cache.
+
+        Parameters
+        ----------
+        price_book : bazaar.PriceBook
+            Prices to load.
+
+        Returns
+        -------
+        None
+
+        """
+        price_book.apply()
+        self.bazaar_timer = price_book.lastUpdated
         self.variables["bazaar_update_txt"]["var"].set(time.strftime("%Y-%m-%d %H:%M:%S UTC%z", time.localtime(self.bazaar_timer)))
-        top_percent = 0.1
-        for itemtype, item_data in md.itemList.items():
-            if itemtype not in raw_data["products"]:
-                continue
-            for action in ["buy", "sell"]:
-                top_amount = top_percent * sum([order["amount"] for order in raw_data["products"][itemtype][f"{action}_summary"]])
-                if top_amount == 0:
-                    item_data["prices"][f"{action}Price"] = 0
-                    continue
-                counter = top_amount
-                top_sum = 0
-                for order in raw_data["products"][itemtype][f"{action}_summary"]:
-                    if counter <= 0:
-                        break
-                    if counter >= order["amount"]:
-                        top_sum += order["amount"] * order["pricePerUnit"]
-                        counter -= order["amount"]
-                    else:
-                        top_sum += counter * order["pricePerUnit"]
-                        counter = 0
-                        break
-                item_data["prices"][f"{action}Price"] = top_sum / top_amount
+        self.evaluator.clear_prices()
+        self.result_cache.clear()
+        return
+
+    def check_price_book(self):
+        """
+        Loads the price book of the background refresher if it is newer than the loaded prices.
+
+        Returns
+        -------
+        bool
+            True if new prices were loaded.
+
+        """
+        price_book = self.refresher.price_book
+        if price_book is None or price_book.lastUpdated <= self.bazaar_timer:
+            return False
+        self.apply_price_book(price_book)
+        return True
+
+    def poll_bazaar(self):
+        """
+        Checks for a new price book every second on the Tk event loop,
+        so the bazaar data shown in the GUI stays up to date without calculating.
+
+        Returns
+        -------
+        None
+
+        """
+        self.check_price_book()
+        self.after(1000, self.poll_bazaar)
         return
 
     def save_calc(self):
@@ -1599,6 +1139,7 @@ def start_app():
     """
     App = Calculator()
     App.mainloop()
+    App.refresher.stop()
     try:
         App.destroy()
     except Exception:
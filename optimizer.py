@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 18:41:09 2026
+
+@author: Herodirk
+
+Best setup solver for one minion.
+Searches fuels × upgrade pairs × hoppers for the best item profit, total profit or payback time.
+Upgrades that cannot do anything for the minion are pruned before the search,
+the upgrade independent parts of the calculation are compiled once by batch.BatchEvaluator
+and the best candidates are calculated again with engine.evaluate() for exact outputs.
+
+Example:
+    import optimizer
+    solver = optimizer.SetupOptimizer(engine.Setup(minion="Snow", miniontier=12, afk=True))
+    for setup, result in solver.solve("totalProfit", top=3):
+        print(setup.fuel, setup.upgrade1, setup.upgrade2, setup.hopper, result.totalProfit)
+"""
+
+from dataclasses import replace
+import numpy as np
+import HSB_minion_data as md
+import engine
+import batch
+
+objectives = ["itemProfit", "totalProfit", "payback"]
+
+
+def producible_items(setup, upgrades, fuels):
+    """
+    All items that a minion can end up with, using any of the given upgrades and fuels.
+    Includes the compacted and enchanted forms of those items.
+
+    Parameters
+    ----------
+    setup : engine.Setup
+        Setup with the minion.
+    upgrades : list
+        Upgrade names.
+    fuels : list
+        Fuel names.
+
+    Returns
+    -------
+    items : set
+        Skyblock item IDs.
+
+    """
+    items = set(engine.minion_drops(replace(setup, fuel="None", upgrade1="None", upgrade2="None")).keys())
+    for upgrade in upgrades:
+        special = md.itemList[md.upgrade_options[upgrade]]["upgrade"]["special"]
+        if "replace" in special["type"]:
+            items |= {new_item for item, new_item in special["list"].items() if item in items}
+        if "item" in special:
+            items |= set(special["item"].keys())
+    if "Inferno Minion Fuel" in fuels:
+        items |= {distilate_item for distilate_item, amount_per in md.infernofuel_data["distilates"].values()}
+        items |= {*md.infernofuel_data["drops"].keys(), "HYPERGOLIC_IONIZED_CERAMICS"}
+    if "Diamond Spreading" in upgrades:
+        items.add("DIAMOND")
+    # compacted items can be enchanted again
+    for item in list(items):
+        if item in md.compactorSteps:
+            items.add(md.compactorSteps[item][0])
+    for item in list(items):
+        items |= {enchanted_name for enchanted_name, perenchanted, enchanted_per in md.enchanterChains.get(item, [])}
+    return items
+
+
+def useful_upgrades(setup, upgrades=None, fuels=None):
+    """
+    Prunes upgrades that are dominated by an empty upgrade slot for the minion of the setup.
+    Those upgrades cost coins and do not change the speed, drops or items of the minion:
+        "replace" upgrades (like Auto Smelter) that match none of the drops of the minion
+        Compactors if none of the items of the minion are in md.compactorList
+        Super Compactors if none of the items of the minion are in md.enchanterList
+        Upgrades without special effect and without speed or drop bonus (like "None")
+
+    Parameters
+    ----------
+    setup : engine.Setup
+        Setup with the minion.
+    upgrades : list, optional
+        Upgrade names. The default is all upgrades in md.upgrade_options.
+    fuels : list, optional
+        Fuel names, for the items from Inferno Minion Fuel. The default is all fuels in md.fuel_options.
+
+    Returns
+    -------
+    useful : list
+        Upgrade names that are not dominated, always starts with "None".
+
+    """
+    upgrades = list(md.upgrade_options.keys()) if upgrades is None else list(upgrades)
+    fuels = list(md.fuel_options.keys()) if fuels is None else list(fuels)
+    base_drops = set(engine.minion_drops(replace(setup, fuel="None", upgrade1="None", upgrade2="None")).keys())
+    items = producible_items(setup, upgrades, fuels)
+    useful = ["None"]
+    for upgrade in upgrades:
+        upgrade_data = md.itemList[md.upgrade_options[upgrade]]["upgrade"]
+        special_types = upgrade_data["special"]["type"].split(", ")
+        has_effect = upgrade_data["speed"] != 0 or upgrade_data["drop"] != 1
+        if "replace" in special_types:
+            has_effect |= any(item in base_drops for item in upgrade_data["special"]["list"].keys())
+        if "compact" in special_types:
+            has_effect |= any(item in md.compactorList for item in items)
+        if "enchant" in special_types:
+            has_effect |= any(item in md.enchanterList for item in items)
+        if any(special_type in ["generate", "add", "timer"] for special_type in special_types):
+            has_effect = True
+        if has_effect and upgrade not in useful:
+            useful.append(upgrade)
+    return useful
+
+
+class SetupOptimizer():
+    def __init__(self, setup, fuels=None, upgrades=None, hoppers=None):
+        """
+        Prunes the search space and compiles the upgrade independent stages for the minion of the setup.
+
+        Parameters
+        ----------
+        setup : engine.Setup
+            Setup with the minion, tier and player profile (beacon, crystal, afk, mayor, pet, etc.).
+        fuels : list, optional
+            Fuel names to search. The default is all fuels in md.fuel_options.
+        upgrades : list, optional
+            Upgrade names to search in both slots. The default is all upgrades in md.upgrade_options.
+        hoppers : list, optional
+            Hopper names to search. The default is all hoppers in engine.hopper_data.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.setup = setup
+        self.fuels = list(md.fuel_options.keys()) if fuels is None else list(fuels)
+        self.upgrades = useful_upgrades(setup, upgrades, self.fuels)
+        self.hoppers = list(engine.hopper_data.keys()) if hoppers is None else list(hoppers)
+        self.batch = batch.BatchEvaluator(setup, minions=[setup.minion], tiers=[setup.miniontier], fuels=self.fuels,
+                                          upgrades1=self.upgrades, upgrades2=self.upgrades)
+        # the same upgrade twice only helps if its speed or drop bonus stacks
+        stacking = np.array([md.itemList[md.upgrade_options[upgrade]]["upgrade"]["speed"] != 0
+                             or md.itemList[md.upgrade_options[upgrade]]["upgrade"]["drop"] != 1 for upgrade in self.upgrades])
+        self.dominated_pairs = np.eye(len(self.upgrades), dtype=bool) & ~stacking
+        self.dominated_pairs[0, 0] = False
+        # compaction mode of every upgrade pair, see batch.BatchEvaluator.compile_compactors()
+        self.pair_modes = self.batch.pair_compaction.reshape(len(self.upgrades), len(self.upgrades))
+        return
+
+    def score(self, results, objective):
+        """
+        Converts batch results into a score where higher is better.
+
+        Parameters
+        ----------
+        results : dict
+            Output of batch.BatchEvaluator.evaluate().
+        objective : str
+            "itemProfit", "totalProfit" or "payback".
+
+        Returns
+        -------
+        numpy.ndarray
+            Scores with the shape of the batch results.
+
+        """
+        if objective == "payback":
+            # negative payback time, setups that never pay back get -inf
+            payback = np.divide(results["setupcost"], results["totalProfit"],
+                                out=np.full(results["totalProfit"].shape, np.inf), where=results["totalProfit"] > 0)
+            return -payback
+        return np.array(results[objective])
+
+    def solve(self, objective="totalProfit", top=10, candidates=50):
+        """
+        Finds the best setups for the minion.
+        Every fuel, upgrade pair and hopper gets scored with the batch evaluator,
+        the best candidates get calculated with engine.evaluate() and sorted on the exact outputs.
+        The exact outputs include pet leveling, which the batch evaluator ignores.
+        The batch scores of (Super) Compactor setups are only approximate,
+        so the candidates are picked separately for every compaction mode and an overrated mode can not push out the others.
+
+        Parameters
+        ----------
+        objective : str, optional
+            "itemProfit" for the highest item profit,
+            "totalProfit" for the highest profit after fuel cost (and with pet profit),
+            "payback" for the lowest setupcost / totalProfit, the amount of time spans to earn back the setup cost.
+            The default is "totalProfit".
+        top : int, optional
+            Amount of setups to return. The default is 10.
+        candidates : int, optional
+            Amount of best batch setups per hopper and compaction mode to calculate exactly. The default is 50.
+
+        Returns
+        -------
+        ranking : list
+            List of (engine.Setup, engine.Result) tuples, best first.
+
+        """
+        if objective not in objectives:
+            print(f"ERROR: {objective} is not an objective, pick from {objectives}")
+            return []
+        shortlist = []
+        for hopper in self.hoppers:
+            # the hopper is only used after the compiled stages
+            self.batch.setup = replace(self.setup, hopper=hopper)
+            results = self.batch.evaluate()
+            scores = self.score(results, objective)
+            scores[..., self.dominated_pairs] = np.nan
+            for mode in np.unique(self.pair_modes):
+                mode_scores = np.where(self.pair_modes == mode, scores, np.nan)
+                for setup, value in self.batch.rank({"score": mode_scores}, key="score", top=candidates):
+                    shortlist.append(setup)
+        self.batch.setup = self.setup
+
+        ranking = [(setup, engine.evaluate(setup)) for setup in shortlist]
+        if objective == "payback":
+            def exact_score(result):
+                return -result.setupcost / result.totalProfit if result.totalProfit > 0 else -np.inf
+        else:
+            def exact_score(result):
+                return getattr(result, objective)
+        ranking.sort(key=lambda x: exact_score(x[1]), reverse=True)
+        return ranking[:top]
@@ -0,0 +1,268 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 02:14:55 2026
+
+@author: Herodirk
+
+Optional timing of the calculation stages.
+The engine marks every stage and the steps of the production stage with span(),
+which does nothing until a StageProfiler is enabled with enable().
+An enabled profiler records the call count and wall time of every span and keeps the spans as events,
+which can be saved as a Chrome trace file (open it in chrome://tracing or https://ui.perfetto.dev).
+
+Example:
+    import profiler
+    stage_profiler = profiler.enable()
+    for minion in md.minionList.keys():
+        engine.evaluate(engine.Setup(minion=minion, miniontier=list(md.minionList[minion]["speed"].keys())[-1]))
+    profiler.disable()
+    print(stage_profiler.summary())
+    stage_profiler.export_chrome_trace("stages_trace.json")
+"""
+
+import os
+import threading
+import time
+
+active = None  # the enabled StageProfiler, None when profiling is off
+
+
+class NullSpan():
+    """
+    Span that does nothing, used while profiling is off.
+    """
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+null_span = NullSpan()
+
+
+class Span():
+    def __init__(self, stage_profiler, name):
+        """
+        Timed part of the calculation, use it in a with statement.
+
+        Parameters
+        ----------
+        stage_profiler : StageProfiler
+            Profiler to record to.
+        name : str
+            Name of the stage or step.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.stage_profiler = stage_profiler
+        self.name = name
+        self.start = 0
+        return
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stage_profiler.record(self.name, self.start, time.perf_counter_ns())
+        return False
+
+
+def span(name):
+    """
+    Marks a part of the calculation, use it as "with profiler.span(name):".
+
+    Parameters
+    ----------
+    name : str
+        Name of the stage or step.
+
+    Returns
+    -------
+    Span or NullSpan
+        A Span of the enabled profiler, or null_span if profiling is off.
+
+    """
+    if active is None:
+        return null_span
+    return Span(active, name)
+
+
+def enable(stage_profiler=None):
+    """
+    Turns profiling on.
+
+    Parameters
+    ----------
+    stage_profiler : StageProfiler, optional
+        Profiler to record to. The default is a new StageProfiler.
+
+    Returns
+    -------
+    StageProfiler
+        The enabled profiler.
+
+    """
+    global active
+    active = stage_profiler if stage_profiler is not None else StageProfiler()
+    return active
+
+
+def disable():
+    """
+    Turns profiling off.
+
+    Returns
+    -------
+    None.
+
+    """
+    global active
+    active = None
+    return
+
+
+class StageProfiler():
+    def __init__(self, max_events=1000000):
+        """
+        Records of the spans of the calculation.
+        self.stats has the span names with [calls, nanoseconds],
+        self.events has (name, start, end, process ID, thread ID) of every span in nanoseconds.
+
+        Parameters
+        ----------
+        max_events : int, optional
+            Highest amount of events to keep, after that only self.stats is updated. The default is 1000000.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.max_events = max_events
+        self.stats = {}
+        self.events = []
+        self.lock = threading.Lock()
+        return
+
+    def record(self, name, start, end):
+        """
+        Records one span.
+
+        Parameters
+        ----------
+        name : str
+            Name of the stage or step.
+        start : int
+            Start time from time.perf_counter_ns().
+        end : int
+            End time from time.perf_counter_ns().
+
+        Returns
+        -------
+        None.
+
+        """
+        with self.lock:
+            if name not in self.stats:
+                self.stats[name] = [0, 0]
+            self.stats[name][0] += 1
+            self.stats[name][1] += end - start
+            if len(self.events) < self.max_events:
+                self.events.append((name, start, end, os.getpid(), threading.get_ident()))
+        return
+
+    def merge(self, data):
+        """
+        Adds the records of another profiler, like one of a sweep worker process.
+
+        Parameters
+        ----------
+        data : dict
+            Output of StageProfiler.export() of the other profiler.
+
+        Returns
+        -------
+        None.
+
+        """
+        with self.lock:
+            for name, (calls, nanoseconds) in data["stats"].items():
+                if name not in self.stats:
+                    self.stats[name] = [0, 0]
+                self.stats[name][0] += calls
+                self.stats[name][1] += nanoseconds
+            self.events += data["events"][:max(self.max_events - len(self.events), 0)]
+        return
+
+    def export(self):
+        """
+        Records as plain data, to send between processes.
+
+        Returns
+        -------
+        dict
+            "stats" and "events".
+
+        """
+        with self.lock:
+            return {"stats": {name: list(stats) for name, stats in self.stats.items()}, "events": list(self.events)}
+
+    def clear(self):
+        """
+        Removes all records.
+
+        Returns
+        -------
+        None.
+
+        """
+        with self.lock:
+            self.stats = {}
+            self.events = []
+        return
+
+    def summary(self):
+        """
+        Call count and wall time of every span.
+
+        Returns
+        -------
+        dict
+            Span names with {"calls": int, "seconds": float, "mean": float}, slowest first.
+
+        """
+        with self.lock:
+            stats = sorted(self.stats.items(), key=lambda x: x[1][1], reverse=True)
+        return {name: {"calls": calls, "seconds": nanoseconds / 1e9, "mean": nanoseconds / 1e9 / calls}
+                for name, (calls, nanoseconds) in stats}
+
+    def export_chrome_trace(self, path):
+        """
+        Saves the events as a Chrome trace file, with one row per process and thread.
+
+        Parameters
+        ----------
+        path : str
+            Path of the trace file.
+
+        Returns
+        -------
+        None.
+
+        """
+        # imported here, engine imports this file and json is only needed for the export
+        import json
+        with self.lock:
+            events = list(self.events)
+        first = min((start for name, start, end, pid, tid in events), default=0)
+        trace_events = [{"name": name, "cat": "stage", "ph": "X", "ts": (start - first) / 1000, "dur": (end - start) / 1000,
+                         "pid": pid, "tid": tid} for name, start, end, pid, tid in events]
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+        return
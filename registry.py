@@ -0,0 +1,232 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 03:41:27 2026
+
+@author: Herodirk
+
+Array-backed registry of the items in md.itemList.
+Every item ID gets an integer index, the "npc", "custom", "buyPrice" and "sellPrice" prices and the skill xp of the items
+are kept in numpy arrays in that order, so pricing many items is one gather instead of one engine.getPrice() call per item.
+Missing prices are NaN in the arrays.
+The price arrays are a copy of md.itemList, call load_prices() after the prices in md.itemList changed.
+Price vectors are resolved once per bazaar column and tax multiplier (from the buy type, sell type, taxes, flipper and mayor of a setup)
+and kept in a least recently used cache until the prices change, so a batch of setups with the same bazaar settings reuses them.
+
+Example:
+    import registry
+    items = registry.ItemRegistry()
+    sell_prices = items.price_vector(engine.Setup(), "sell", "bazaar", ["SNOW_BALL", "ENCHANTED_SNOW_BLOCK"])
+"""
+
+import numpy as np
+import HSB_minion_data as md
+import engine
+
+price_keys = ["npc", "custom", "buyPrice", "sellPrice"]
+default = None  # registry of md.itemList shared by the batch evaluators, see default_registry()
+
+
+def default_registry():
+    """
+    Registry of md.itemList that is shared by everything in this process, made on first use.
+
+    Returns
+    -------
+    ItemRegistry
+        The shared registry.
+
+    """
+    global default
+    if default is None:
+        default = ItemRegistry()
+    return default
+
+
+class ItemRegistry():
+    def __init__(self, item_list=None, cache_size=32):
+        """
+        Compiles the item IDs, xp and prices of an item list.
+
+        Parameters
+        ----------
+        item_list : dict, optional
+            Items like md.itemList. The default is md.itemList.
+        cache_size : int, optional
+            Maximum amount of resolved price vectors to keep. The default is 32.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.item_list = md.itemList if item_list is None else item_list
+        self.IDs = list(self.item_list.keys())
+        self.index = {ID: i for i, ID in enumerate(self.IDs)}
+        self.skills = list(dict.fromkeys(skill for item_data in self.item_list.values() for skill in item_data.get("xp", {}).keys()))
+        skill_index = {skill: i for i, skill in enumerate(self.skills)}
+        self.xp_type = np.full(len(self.IDs), -1, dtype=int)
+        self.xp_amount = np.zeros(len(self.IDs))
+        for i, item_data in enumerate(self.item_list.values()):
+            for skill, amount in item_data.get("xp", {}).items():
+                self.xp_type[i] = skill_index[skill]
+                self.xp_amount[i] = amount
+        self.prices = {key: np.full(len(self.IDs), np.nan) for key in price_keys}
+        self.resolved = engine.ResultCache(cache_size)
+        self.load_prices()
+        return
+
+    def __len__(self):
+        return len(self.IDs)
+
+    def load_prices(self):
+        """
+        Copies the current prices of the item list into the price arrays.
+        The resolved price vectors are removed if a price changed.
+
+        Returns
+        -------
+        changed : bool
+            True if a price changed.
+
+        """
+        changed = False
+        for key, column in self.prices.items():
+            new_column = np.array([item_data["prices"].get(key, np.nan) for item_data in self.item_list.values()], dtype=float)
+            if not np.array_equal(column, new_column, equal_nan=True):
+                column[:] = new_column
+                changed = True
+        if changed:
+            self.resolved.clear()
+        return changed
+
+    def resolve(self, price_key, multiplier):
+        """
+        Prices of all items at a price key with the fallbacks of engine.getPrice(), from the cache if possible.
+
+        Parameters
+        ----------
+        price_key : str
+            Key in the prices of md.itemList, from engine.price_location().
+        multiplier : float
+            Multiplier for the price, from engine.price_location().
+
+        Returns
+        -------
+        prices : numpy.ndarray
+            Read-only prices indexed like self.IDs.
+
+        """
+        prices = self.resolved.get((price_key, multiplier))
+        if prices is not None:
+            return prices
+        npc = self.prices["npc"]
+        custom = self.prices["custom"]
+        prices = np.where(np.isnan(custom), 0, custom)
+        prices = np.where(np.isnan(npc), prices, multiplier * npc)
+        if price_key in self.prices:
+            located = self.prices[price_key]
+            prices = np.where(np.isnan(located), prices, multiplier * located)
+        prices.flags.writeable = False
+        self.resolved.put((price_key, multiplier), prices)
+        return prices
+
+    def indices(self, IDs):
+        """
+        Indices of item IDs.
+
+        Parameters
+        ----------
+        IDs : iterable
+            Skyblock item IDs.
+
+        Returns
+        -------
+        numpy.ndarray
+            Index of every ID, -1 for IDs that are not in the registry.
+
+        """
+        return np.array([self.index.get(ID, -1) for ID in IDs], dtype=int)
+
+    def price_vector(self, setup, action="buy", location="bazaar", IDs=None):
+        """
+        Prices of items with the same fallbacks as engine.getPrice():
+        the price of the location, else the NPC price, else the custom price without multiplier, else 0.
+
+        Parameters
+        ----------
+        setup : engine.Setup
+            Setup with the bazaar settings.
+        action : str, optional
+            Type of transaction. "buy" or "sell". The default is "buy".
+        location : str, optional
+            Location of the transaction, "npc", "bazaar", "custom". The default is "bazaar".
+        IDs : iterable, optional
+            Skyblock item IDs to price, IDs that are not in the registry get price 0. The default is all items.
+
+        Returns
+        -------
+        prices : numpy.ndarray
+            Prices indexed like IDs, or like self.IDs if IDs is None.
+
+        """
+        prices = self.resolve(*engine.price_location(setup, action, location))
+        if IDs is None:
+            return prices
+        indices = self.indices(IDs)
+        for ID, i in zip(IDs, indices):
+            if i == -1:
+                engine.warn_once(ID, "not in itemList")
+        return np.where(indices >= 0, prices[indices], 0)
+
+    def sell_vector(self, setup, route="npc"):
+        """
+        Sell prices of all items for a selling route, like the sell stage of engine.evaluate().
+
+        Parameters
+        ----------
+        setup : engine.Setup
+            Setup with the bazaar settings.
+        route : str, optional
+            "npc", "bazaar" or "best", the highest of the NPC and bazaar price. The default is "npc".
+
+        Returns
+        -------
+        numpy.ndarray
+            Read-only sell prices indexed like self.IDs.
+
+        """
+        if route != "best":
+            return self.price_vector(setup, "sell", route)
+        npc_location = engine.price_location(setup, "sell", "npc")
+        bazaar_location = engine.price_location(setup, "sell", "bazaar")
+        prices = self.resolved.get(("best", npc_location, bazaar_location))
+        if prices is None:
+            prices = np.maximum(self.resolve(*npc_location), self.resolve(*bazaar_location))
+            prices.flags.writeable = False
+            self.resolved.put(("best", npc_location, bazaar_location), prices)
+        return prices
+
+    def xp(self, setup, amounts):
+        """
+        Skill xp of item amounts, like engine.xp_stage().
+
+        Parameters
+        ----------
+        setup : engine.Setup
+            Setup with the wisdoms and the mayor.
+        amounts : numpy.ndarray
+            Item amounts indexed like self.IDs.
+
+        Returns
+        -------
+        xp : dict
+            Skills with xp, only skills of items with a non-zero amount and xp.
+
+        """
+        gained = amounts * self.xp_amount
+        has_xp = (self.xp_type >= 0) & (gained != 0)
+        totals = np.bincount(self.xp_type[has_xp], weights=gained[has_xp], minlength=len(self.skills))
+        present = np.bincount(self.xp_type[has_xp], minlength=len(self.skills)) > 0
+        multiplier = 1.5 if setup.mayor == "Derpy" else 1
+        return {skill: float(totals[i]) * (1 + getattr(setup, f"{skill}Wisdom") / 100) * multiplier
+                for i, skill in enumerate(self.skills) if present[i]}
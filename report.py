@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 06:12:48 2026
+
+@author: Herodirk
+
+Headless reports of the minion calculator, without tkinter.
+Reads setup IDs or JSON setups, one per line, calculates every setup with engine.Evaluator
+and streams one row per line as JSONL or CSV with the inputs and outputs of the Short Output of the calculator (output_data() in main.py).
+Lines are read, decoded and written in chunks, so the memory use does not grow with the length of the input.
+
+Input lines:
+    a setup ID, see setup_id.py, old "1.0!" IDs are migrated
+    a JSON object with inputs of engine.Setup, like {"minion": "Snow", "miniontier": 11, "fuel": "Enchanted Lava Bucket"},
+    missing inputs are taken from the base setup
+    empty lines and lines starting with # are skipped
+Numbers in the rows are not rounded, dictionary outputs are JSON objects (JSON text in CSV cells).
+Lines that could not be calculated get a row with only their line in "ID" and the reason in "error".
+
+Example:
+    import report
+    with open("shared_ids.txt") as f_in, open("report.jsonl", "w") as f_out:
+        report.write_report(f_in, f_out, out_format="jsonl")
+Or from the command line:
+    python report.py shared_ids.txt --format csv --output report.csv --snapshot bazaar_snapshot.json.gz
+    cat shared_ids.txt | python report.py > report.jsonl
+"""
+
+from contextlib import redirect_stdout
+from dataclasses import fields, replace
+from itertools import islice
+import argparse
+import csv
+import json
+import math
+import os
+import sys
+import time
+import HSB_minion_data as md
+import engine
+import bazaar
+import setup_id
+
+# columns of a row, in the order of self.outputOrder in main.py, with the wisdoms and the time span as separate inputs
+output_fields = ["ID", "minion", "miniontier", "amount",
+                 "fuel", "infernoGrade", "infernoDistilate", "infernoEyedrops", "hopper", "upgrade1", "upgrade2", "chest",
+                 "beacon", "scorched", "B_constant", "B_acquired",
+                 "infusion", "crystal", "afk", "afkpet", "specialSetup", "potatoTalisman",
+                 "combatWisdom", "miningWisdom", "farmingWisdom", "fishingWisdom", "foragingWisdom", "alchemyWisdom",
+                 "mayor", "levelingpet", "taming", "petxpboost", "beastmaster", "timeamount", "timelength",
+                 "time", "actiontime", "harvests", "items", "sellLoc",
+                 "itemtypeProfit", "itemProfit", "xp", "petxp", "petProfit",
+                 "fuelcost", "totalProfit", "notes",
+                 "bazaar_sell_type", "bazaar_buy_type", "bazaar_updated", "bazaar_taxes", "bazaar_flipper",
+                 "setupcost", "error"]
+out_formats = ["jsonl", "csv"]
+setup_keys = {setup_field.name for setup_field in fields(engine.Setup)}
+# inputs without options, their JSON values have to be numbers
+number_keys = {key for key, field in setup_id.fields.items() if len(field["options"]) == 0} | {"timeamount"}
+time_length_options = list(engine.time_lengths.keys()) + ["Harvests"]
+default_snapshot_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bazaar_snapshot.json.gz")
+
+
+def load_prices(snapshot_file=default_snapshot_file, top_percent=0.1):
+    """
+    Puts the prices of a bazaar snapshot into md.itemList, like the boot of the calculator.
+    Does not call the Hypixel API, so every report of the same snapshot has the same prices.
+
+    Parameters
+    ----------
+    snapshot_file : str, optional
+        Path of the snapshot saved by bazaar.fetch_bazaar(). The default is the snapshot of the calculator.
+    top_percent : float, optional
+        Fraction of the bazaar order volume that the prices are averaged over. The default is 0.1.
+
+    Returns
+    -------
+    str
+        Time of the bazaar data, "" if no snapshot was loaded and the prices in md.itemList are used.
+
+    """
+    raw_data = bazaar.load_snapshot(snapshot_file)
+    if raw_data is None:
+        print(f"WARNING: No bazaar snapshot at {snapshot_file}, using the prices in HSB_minion_data")
+        return ""
+    try:
+        price_book = bazaar.make_price_book(raw_data, top_percent)
+    except KeyError as error:
+        print(f"WARNING: Could not load bazaar snapshot\n{error}")
+        return ""
+    price_book.apply()
+    return time.strftime("%Y-%m-%d %H:%M:%S UTC%z", time.localtime(price_book.lastUpdated))
+
+
+def read_setups(lines, base=None, chunksize=1024):
+    """
+    Turns lines with setup IDs or JSON setups into setups, the IDs of each chunk of lines are decoded together.
+
+    Parameters
+    ----------
+    lines : iterable
+        Lines of text, like an open file.
+    base : engine.Setup, optional
+        Setup with the inputs that are missing in JSON setups and the time span. The default is engine.Setup().
+    chunksize : int, optional
+        Amount of lines that are read and decoded at once. The default is 1024.
+
+    Yields
+    ------
+    line : str
+        The line without whitespace around it.
+    setup : engine.Setup or None
+        The setup, None if the line is not a valid setup.
+    error : str
+        Why the line is not a valid setup, "" for valid setups.
+
+    """
+    base = engine.Setup() if base is None else base
+    lines = iter(lines)
+    while chunk := [line.strip() for line in islice(lines, chunksize)]:
+        chunk = [line for line in chunk if line != "" and not line.startswith("#")]
+        ID_lines = [line for line in chunk if not line.startswith("{")]
+        templates = iter(setup_id.decode_many(ID_lines))
+        for line in chunk:
+            if not line.startswith("{"):
+                template = next(templates)
+                if not template:
+                    yield line, None, "invalid setup ID"
+                    continue
+                yield line, replace(base, **template), ""
+                continue
+            try:
+                template = json.loads(line)
+            except ValueError:
+                yield line, None, "invalid JSON"
+                continue
+            yield line, *template_setup(template, base)
+    return
+
+
+def template_setup(template, base):
+    """
+    Setup of a JSON setup.
+
+    Parameters
+    ----------
+    template : dict
+        Inputs of engine.Setup with their values.
+    base : engine.Setup
+        Setup with the inputs that are missing in template.
+
+    Returns
+    -------
+    setup : engine.Setup or None
+        The setup, None if template is not a valid setup.
+    error : str
+        Why template is not a valid setup, "" for valid setups.
+
+    """
+    if not isinstance(template, dict):
+        return None, "JSON setup is not an object"
+    unknown = [key for key in template.keys() if key not in setup_keys]
+    if unknown:
+        return None, f"unknown inputs {', '.join(unknown)}"
+    if not all(is_number(template[key]) for key in number_keys & template.keys()):
+        return None, "invalid input value"
+    if "timelength" in template and template["timelength"] not in time_length_options:
+        return None, "invalid input value"
+    return replace(base, **template), ""
+
+
+def is_number(value):
+    """
+    Checks if a JSON value can be used as a number input.
+
+    Parameters
+    ----------
+    value : any
+        The value.
+
+    Returns
+    -------
+    bool
+        True for finite int and float values, False for everything else, also for bool, infinity and NaN.
+
+    """
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return False
+    try:
+        return math.isfinite(value)
+    except OverflowError:
+        # an int that is too large for a float
+        return False
+
+
+def error_row(line, error):
+    """
+    Row of a line that could not be calculated.
+
+    Parameters
+    ----------
+    line : str
+        The line, put in "ID".
+    error : str
+        Why the line could not be calculated.
+
+    Returns
+    -------
+    dict
+        Every key of output_fields, empty except "ID" and "error".
+
+    """
+    return {**dict.fromkeys(output_fields, ""), "ID": line, "error": error}
+
+
+class Reporter():
+    def __init__(self, base=None, bazaar_updated="", cache_size=4096, chunksize=1024):
+        """
+        Calculates rows of the report, the results of repeated setups are taken from a bounded cache.
+
+        Parameters
+        ----------
+        base : engine.Setup, optional
+            Setup with the inputs that are missing in JSON setups and the time span. The default is engine.Setup().
+        bazaar_updated : str, optional
+            Time of the bazaar data for the "bazaar_updated" column, see load_prices(). The default is "".
+        cache_size : int, optional
+            Maximum amount of results to remember. The default is 4096.
+        chunksize : int, optional
+            Amount of lines that are read and decoded at once. The default is 1024.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.base = engine.Setup() if base is None else base
+        self.bazaar_updated = bazaar_updated
+        self.chunksize = chunksize
+        self.evaluator = engine.Evaluator()
+        self.result_cache = engine.ResultCache(cache_size)
+        return
+
+    def make_row(self, ID, setup, result):
+        """
+        Row of the report of one setup.
+
+        Parameters
+        ----------
+        ID : str
+            Setup ID of the setup.
+        setup : engine.Setup
+            The setup.
+        result : engine.Result
+            Outputs of the setup.
+
+        Returns
+        -------
+        row : dict
+            Every key of output_fields with its value.
+
+        """
+        row = {}
+        for key in output_fields:
+            if key == "ID":
+                row[key] = ID
+            elif key == "bazaar_updated":
+                row[key] = self.bazaar_updated
+            elif key == "error":
+                row[key] = ""
+            elif key in setup_keys:
+                row[key] = getattr(setup, key)
+            else:
+                row[key] = getattr(result, key)
+        return row
+
+    def rows(self, lines):
+        """
+        Calculates the setup of every line.
+
+        Parameters
+        ----------
+        lines : iterable
+            Lines with setup IDs or JSON setups, see read_setups().
+
+        Yields
+        ------
+        row : dict
+            Every key of output_fields with its value, see make_row().
+
+        """
+        setups = read_setups(lines, self.base, self.chunksize)
+        while chunk := list(islice(setups, self.chunksize)):
+            IDs = iter(setup_id.encode_many([setup for line, setup, error in chunk if setup is not None]))
+            for line, setup, error in chunk:
+                ID = next(IDs) if setup is not None else ""
+                if ID == "":
+                    yield error_row(line, error or "invalid input value")
+                    continue
+                if setup.miniontier not in md.minionList[setup.minion]["speed"]:
+                    yield error_row(line, f"{setup.minion} minion has no tier {setup.miniontier}")
+                    continue
+                cache_key = (ID, setup.timeamount, setup.timelength)
+                result = self.result_cache.get(cache_key)
+                if result is None:
+                    try:
+                        result = self.evaluator.evaluate(setup)
+                    except Exception as error:
+                        print(f"WARNING: Calculation of {ID} failed\n{error!r}")
+                        yield error_row(line, "calculation failed")
+                        continue
+                    self.result_cache.put(cache_key, result)
+                yield self.make_row(ID, setup, result)
+        return
+
+
+def write_report(f_in, f_out, out_format="jsonl", reporter=None, flush_every=1024):
+    """
+    Streams the report of every line of f_in to f_out.
+
+    Parameters
+    ----------
+    f_in : iterable
+        Lines with setup IDs or JSON setups, like an open file.
+    f_out : file
+        Open text file for the rows, opened with newline="" for CSV.
+    out_format : str, optional
+        "jsonl" for one JSON object per line, "csv" for a header line and one line per row. The default is "jsonl".
+    reporter : Reporter, optional
+        Reporter that calculates the rows. The default is Reporter().
+    flush_every : int, optional
+        Amount of rows after which f_out is flushed. The default is 1024.
+
+    Returns
+    -------
+    counts : dict
+        "rows" written and "errors" among them.
+
+    """
+    if out_format not in out_formats:
+        print(f"ERROR: Unknown format {out_format}, use one of {out_formats}")
+        return {"rows": 0, "errors": 0}
+    reporter = Reporter() if reporter is None else reporter
+    if out_format == "csv":
+        writer = csv.writer(f_out)
+        writer.writerow(output_fields)
+    counts = {"rows": 0, "errors": 0}
+    for row in reporter.rows(f_in):
+        try:
+            text = json.dumps(row, allow_nan=False)
+        except ValueError:
+            # infinity and NaN are not valid JSON
+            print(f"WARNING: Row of {row['ID']} has a number that is not finite")
+            row = error_row(row["ID"], "output is not a finite number")
+            text = json.dumps(row, allow_nan=False)
+        if out_format == "jsonl":
+            f_out.write(text + "\n")
+        else:
+            writer.writerow([json.dumps(value) if isinstance(value, dict) else value for value in row.values()])
+        counts["rows"] += 1
+        counts["errors"] += row["error"] != ""
+        if counts["rows"] % flush_every == 0:
+            f_out.flush()
+    f_out.flush()
+    return counts
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless reports of the minion calculator")
+    parser.add_argument("input", nargs="?", default="-", help="file with a setup ID or JSON setup per line, - for stdin")
+    parser.add_argument("--output", default="-", help="file for the rows, - for stdout")
+    parser.add_argument("--format", default="jsonl", choices=out_formats)
+    parser.add_argument("--snapshot", default=default_snapshot_file, help="bazaar snapshot (.json.gz) with the prices")
+    parser.add_argument("--top-percent", type=float, default=0.1)
+    parser.add_argument("--time-amount", type=float, default=1.0)
+    parser.add_argument("--time-length", default="Days", choices=time_length_options)
+    parser.add_argument("--chunksize", type=int, default=1024)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    args = parser.parse_args()
+    if not math.isfinite(args.time_amount):
+        parser.error("--time-amount has to be a finite number")
+    f_in = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8")
+    f_out = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    # warnings go to stderr, stdout can be the report
+    with redirect_stdout(sys.stderr):
+        start_time = time.time()
+        base = engine.Setup(timeamount=args.time_amount, timelength=args.time_length)
+        reporter = Reporter(base, load_prices(args.snapshot, args.top_percent), args.cache_size, args.chunksize)
+        counts = write_report(f_in, f_out, args.format, reporter)
+        print(f"REPORT: {counts['rows']} rows, {counts['errors']} errors in {time.time() - start_time:.1f} seconds")
+    if f_in is not sys.stdin:
+        f_in.close()
+    if f_out is not sys.stdout:
+        f_out.close()
@@ -0,0 +1,625 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 07:24:05 2026
+
+@author: Herodirk
+
+Local HTTP/JSON calculation service of the minion calculator, without tkinter.
+Keeps a pool of worker processes that have the data tables of HSB_minion_data and the current prices loaded,
+so a request only pays for its calculation and not for the boot of the calculator.
+Requests for the same setup that arrive while that setup is being calculated wait for the same calculation,
+and rows are kept in a bounded cache until the prices change.
+New bazaar prices are loaded into a new warm pool, requests move to it when it is ready and the old pool finishes its work.
+
+Requests:
+    GET /evaluate?id=<setup ID>&timeamount=1&timelength=Days
+        row of one setup ID, status 400 if it could not be calculated
+    POST /evaluate?timeamount=1&timelength=Days
+        body: a setup ID, a JSON setup (like {"minion": "Snow", "miniontier": 11}) or a list of them
+        a row, or a list of rows in the same order
+    GET /status
+        workers, bazaar update time, cache and in-flight counts and request counts
+Rows have the keys of report.output_fields, rows that could not be calculated have the reason in "error".
+
+Example:
+    import service
+    calc_service = service.CalculationService(port=8766, workers=4)
+    calc_service.start()
+    rows = calc_service.calculate(["AsAGYAAAAAAAAADAAAE", {"minion": "Snow"}])
+    calc_service.stop()
+Or from the command line:
+    python service.py --port 8766 --workers 4 --refresh
+Then: curl "http://127.0.0.1:8766/evaluate?id=AsAGYAAAAAAAAADAAAE"
+"""
+
+from concurrent.futures import ProcessPoolExecutor, TimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import threading
+import time
+import HSB_minion_data as md
+import engine
+import bazaar
+import report
+import setup_id
+import sweep
+
+max_body = 1048576  # bytes, larger request bodies are refused
+max_setups = 1000  # setups per request
+
+#%% worker functions
+
+reporter = None  # report.Reporter of a worker process, made by init_worker()
+
+
+def init_worker(prices, bazaar_updated):
+    """
+    Initializer of the worker processes, copies the prices of the service into md.itemList
+    and builds the minion cost tables, so the first calculation of a worker is as fast as the others.
+
+    Parameters
+    ----------
+    prices : dict
+        Prices dictionary of every item in md.itemList.
+    bazaar_updated : str
+        Time of the bazaar data for the "bazaar_updated" column.
+
+    Returns
+    -------
+    None.
+
+    """
+    global reporter
+    sweep.load_prices(prices)
+    for minion_type in md.cumulativeMinionCosts:
+        md.cumulativeMinionCosts[minion_type]
+    reporter = report.Reporter(bazaar_updated=bazaar_updated)
+    reporter.evaluator.evaluate(engine.Setup())
+    return
+
+
+def warm_up():
+    """
+    Task to check that a worker process has started, it holds the worker briefly so the warm-up tasks spread over all workers.
+
+    Returns
+    -------
+    int
+        Process ID of the worker.
+
+    """
+    time.sleep(0.01)
+    return os.getpid()
+
+
+def evaluate_setup(setup, ID):
+    """
+    Calculates one setup in a worker process.
+
+    Parameters
+    ----------
+    setup : engine.Setup
+        The setup.
+    ID : str
+        Setup ID of the setup.
+
+    Returns
+    -------
+    row : dict
+        Row of the setup, see report.Reporter.make_row(), an error row if an output is not a finite number.
+
+    """
+    row = reporter.make_row(ID, setup, reporter.evaluator.evaluate(setup))
+    try:
+        json.dumps(row, allow_nan=False)
+    except ValueError:
+        # infinity and NaN are not valid JSON, strict clients reject the whole response
+        return report.error_row(ID, "output is not a finite number")
+    return row
+
+#%% service
+
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    # listen backlog, connections of a burst wait for a thread instead of being reset
+    request_queue_size = 256
+    daemon_threads = True
+
+
+class CalculationService():
+    def __init__(self, host="127.0.0.1", port=8766, workers=None, snapshot_file=report.default_snapshot_file,
+                 refresh=False, url=bazaar.bazaar_url, interval=60, top_percent=0.1, cache_size=4096, timeout=30):
+        """
+        Loads the prices, starts the worker pool and opens the socket, start() starts serving.
+
+        Parameters
+        ----------
+        host : str, optional
+            Host to serve on. The default is "127.0.0.1".
+        port : int, optional
+            Port to serve on, 0 for any free port. The default is 8766.
+        workers : int, optional
+            Amount of worker processes. The default is os.cpu_count().
+        snapshot_file : str, optional
+            Bazaar snapshot with the prices to start with, also the snapshot that the refresher saves to.
+            The default is the snapshot of the calculator.
+        refresh : bool, optional
+            Toggle to call the bazaar API every interval with a bazaar.BazaarRefresher. The default is False.
+        url : str, optional
+            URL of the bazaar endpoint. The default is bazaar.bazaar_url.
+        interval : float, optional
+            Seconds between bazaar API calls. The default is 60.
+        top_percent : float, optional
+            Fraction of the bazaar order volume that the prices are averaged over. The default is 0.1.
+        cache_size : int, optional
+            Maximum amount of rows to remember. The default is 4096.
+        timeout : float, optional
+            Seconds a request waits for a calculation. The default is 30.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.workers = os.cpu_count() if workers is None else workers
+        self.timeout = timeout
+        # the lock guards self.pool, self.bazaar_timer, self.rows and self.in_flight
+        # it is reentrant because a finished calculation can call self.finish() from inside self.submit()
+        self.lock = threading.RLock()
+        # held while a worker pool replaces a broken pool, so only one thread starts a new pool
+        self.pool_lock = threading.Lock()
+        self.rows = engine.ResultCache(cache_size)
+        self.in_flight = {}  # (setup ID, time span, bazaar lastUpdated) with the future of its calculation
+        self.counts = {"requests": 0, "setups": 0, "cached": 0, "merged": 0, "calculated": 0, "errors": 0}
+        self.bazaar_timer = 0
+        self.bazaar_updated = ""
+        self.pool = None
+        raw_data = bazaar.load_snapshot(snapshot_file)
+        if raw_data is not None:
+            try:
+                self.apply_price_book(bazaar.make_price_book(raw_data, top_percent))
+            except KeyError as error:
+                print(f"WARNING: Could not load bazaar snapshot\n{error}")
+        if self.pool is None:
+            self.pool = self.make_pool()
+        self.refresher = None
+        if refresh:
+            self.refresher = bazaar.BazaarRefresher(snapshot_file, interval, url=url, top_percent=top_percent)
+        self.stop_event = threading.Event()
+        self.httpd = ServiceHTTPServer((host, port), self.make_handler())
+        self.threads = []
+        return
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def make_pool(self):
+        """
+        Starts a worker pool with the current prices in md.itemList and waits until every worker is ready.
+        The workers are spawned instead of forked, forking a process with running threads is not safe.
+
+        Returns
+        -------
+        pool : concurrent.futures.ProcessPoolExecutor
+            The ready worker pool.
+
+        """
+        prices = {ID: item_data["prices"] for ID, item_data in md.itemList.items()}
+        pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                   initializer=init_worker, initargs=(prices, self.bazaar_updated))
+        ready = set()
+        while len(ready) < self.workers:
+            ready.update(task.result() for task in [pool.submit(warm_up) for i in range(self.workers)])
+        return pool
+
+    def apply_price_book(self, price_book):
+        """
+        Puts the prices of a bazaar.PriceBook into md.itemList, starts a new worker pool with them
+        and moves the requests to the new pool. The old pool finishes the calculations that it already has.
+
+        Parameters
+        ----------
+        price_book : bazaar.PriceBook
+            Prices to load.
+
+        Returns
+        -------
+        None.
+
+        """
+        price_book.apply()
+        self.bazaar_updated = time.strftime("%Y-%m-%d %H:%M:%S UTC%z", time.localtime(price_book.lastUpdated))
+        pool = self.make_pool()
+        with self.lock:
+            old_pool, self.pool = self.pool, pool
+            self.bazaar_timer = price_book.lastUpdated
+            self.rows.clear()
+        if old_pool is not None:
+            old_pool.shutdown(wait=False)
+        print(f"SERVICE: Loaded bazaar prices of {self.bazaar_updated}")
+        return
+
+    def restart_pool(self, broken_pool):
+        """
+        Starts a new worker pool in place of a pool with a stopped worker process.
+        The new pool is started outside self.lock, so the other requests are answered from the cache in the meantime.
+
+        Parameters
+        ----------
+        broken_pool : concurrent.futures.ProcessPoolExecutor
+            The pool that raised BrokenProcessPool, nothing is done if another thread already replaced it.
+
+        Returns
+        -------
+        None.
+
+        """
+        with self.pool_lock:
+            if self.pool is not broken_pool:
+                return
+            print("WARNING: A worker process stopped, starting a new worker pool")
+            pool = self.make_pool()
+            with self.lock:
+                # apply_price_book() can have replaced the broken pool while the new pool started
+                old_pool, self.pool = (self.pool, pool) if self.pool is broken_pool else (pool, self.pool)
+            old_pool.shutdown(wait=False)
+        return
+
+    def poll_prices(self):
+        """
+        Loop of the thread that loads the price books of the refresher.
+
+        Returns
+        -------
+        None.
+
+        """
+        while not self.stop_event.wait(1):
+            price_book = self.refresher.price_book
+            if price_book is not None and price_book.lastUpdated > self.bazaar_timer:
+                self.apply_price_book(price_book)
+        return
+
+    def parse(self, items, base):
+        """
+        Turns setup IDs and JSON setups into setups with their current setup ID.
+
+        Parameters
+        ----------
+        items : list
+            Setup IDs (str) and JSON setups (dict).
+        base : engine.Setup
+            Setup with the inputs that are missing in JSON setups and the time span.
+
+        Returns
+        -------
+        entries : list
+            (item, setup, setup ID, error) for every item, setup is None and setup ID is "" if the item is not a valid setup.
+
+        """
+        IDs = [item.strip() for item in items if isinstance(item, str)]
+        templates = iter(setup_id.decode_many(IDs))
+        parsed = []
+        for item in items:
+            if isinstance(item, str):
+                template = next(templates)
+                parsed.append((item, replace(base, **template), "") if template else (item, None, "invalid setup ID"))
+            elif isinstance(item, dict):
+                parsed.append((item, *report.template_setup(item, base)))
+            else:
+                parsed.append((item, None, "not a setup ID or JSON setup"))
+        new_IDs = iter(setup_id.encode_many([setup for item, setup, error in parsed if setup is not None]))
+        entries = []
+        for item, setup, error in parsed:
+            ID = next(new_IDs) if setup is not None else ""
+            if ID == "" and error == "":
+                error = "invalid input value"
+            elif ID != "" and setup.miniontier not in md.minionList[setup.minion]["speed"]:
+                ID, error = "", f"{setup.minion} minion has no tier {setup.miniontier}"
+            entries.append((item, setup, ID, error))
+        return entries
+
+    def submit(self, setup, ID):
+        """
+        Row of a setup from the cache, or the calculation of the setup that is in flight, or a new calculation.
+
+        Parameters
+        ----------
+        setup : engine.Setup
+            The setup.
+        ID : str
+            Setup ID of the setup.
+
+        Returns
+        -------
+        dict or concurrent.futures.Future
+            The cached row, or the future of the row.
+
+        """
+        with self.lock:
+            key = (ID, setup.timeamount, setup.timelength, self.bazaar_timer)
+            row = self.rows.get(key)
+            if row is not None:
+                self.counts["cached"] += 1
+                return row
+            future = self.in_flight.get(key)
+            if future is not None:
+                self.counts["merged"] += 1
+                return future
+            pool = self.pool
+            try:
+                future = pool.submit(evaluate_setup, setup, ID)
+            except BrokenProcessPool:
+                future = None
+            else:
+                self.counts["calculated"] += 1
+                self.in_flight[key] = future
+                future.add_done_callback(lambda done: self.finish(key, done))
+        if future is None:
+            self.restart_pool(pool)
+            return self.submit(setup, ID)
+        return future
+
+    def finish(self, key, future):
+        """
+        Callback of a finished calculation, moves its row from the in-flight calculations to the cache.
+
+        Parameters
+        ----------
+        key : tuple
+            Key of the calculation in self.in_flight.
+        future : concurrent.futures.Future
+            The finished calculation.
+
+        Returns
+        -------
+        None.
+
+        """
+        with self.lock:
+            self.in_flight.pop(key, None)
+            if not future.cancelled() and future.exception() is None and key[3] == self.bazaar_timer:
+                self.rows.put(key, future.result())
+        return
+
+    def calculate(self, items, base=None):
+        """
+        Calculates setups on the worker pool, identical setups are only calculated once.
+
+        Parameters
+        ----------
+        items : list
+            Setup IDs (str) and JSON setups (dict).
+        base : engine.Setup, optional
+            Setup with the inputs that are missing in JSON setups and the time span. The default is engine.Setup().
+
+        Returns
+        -------
+        rows : list
+            Row of every item, see report.Reporter.make_row(), with the reason in "error" for items that could not be calculated.
+
+        """
+        base = engine.Setup() if base is None else base
+        entries = self.parse(items, base)
+        pending = [self.submit(setup, ID) if setup is not None and ID != "" else report.error_row(str(item), error)
+                   for item, setup, ID, error in entries]
+        deadline = time.monotonic() + self.timeout
+        wait([future for future in pending if not isinstance(future, dict)], timeout=self.timeout)
+        rows = []
+        for (item, setup, ID, reason), future in zip(entries, pending):
+            if isinstance(future, dict):
+                rows.append(future)
+                continue
+            try:
+                rows.append(future.result(timeout=max(deadline - time.monotonic(), 0)))
+            except TimeoutError:
+                rows.append(report.error_row(ID, "calculation timed out"))
+            except Exception as error:
+                print(f"WARNING: Calculation of {ID} failed\n{error!r}")
+                rows.append(report.error_row(ID, "calculation failed"))
+        with self.lock:
+            self.counts["setups"] += len(rows)
+            self.counts["errors"] += sum(row["error"] != "" for row in rows)
+        return rows
+
+    def status(self):
+        """
+        State of the service.
+
+        Returns
+        -------
+        dict
+            Amount of workers, bazaar update time, amount of cached rows and in-flight calculations and self.counts.
+
+        """
+        with self.lock:
+            return {"workers": self.workers, "bazaar_updated": self.bazaar_updated, "cached_rows": len(self.rows.results),
+                    "in_flight": len(self.in_flight), **self.counts}
+
+    def base_setup(self, query):
+        """
+        Setup with the time span of the query of a request.
+
+        Parameters
+        ----------
+        query : dict
+            Query of the request, from urllib.parse.parse_qs().
+
+        Returns
+        -------
+        engine.Setup or None
+            The setup, None if the time span is invalid or not finite.
+
+        """
+        try:
+            timeamount = float(query.get("timeamount", [1.0])[0])
+        except ValueError:
+            return None
+        timelength = query.get("timelength", ["Days"])[0]
+        if not math.isfinite(timeamount) or timelength not in report.time_length_options:
+            return None
+        return engine.Setup(timeamount=timeamount, timelength=timelength)
+
+    def make_handler(self):
+        """
+        Makes the request handler class of the server.
+
+        Returns
+        -------
+        class
+            Subclass of http.server.BaseHTTPRequestHandler.
+
+        """
+        service = self
+
+        class ServiceHandler(BaseHTTPRequestHandler):
+            # keep-alive, so a client can send many requests over one connection
+            # without Nagle the body is not held back until the client acknowledges the headers
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def send_json(self, status, data):
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+
+            def do_GET(self):
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                if url.path == "/status":
+                    self.send_json(200, service.status())
+                    return
+                if url.path != "/evaluate":
+                    self.send_json(404, {"error": "unknown path"})
+                    return
+                with service.lock:
+                    service.counts["requests"] += 1
+                base = service.base_setup(query)
+                if base is None:
+                    self.send_json(400, {"error": "invalid timeamount or timelength"})
+                    return
+                if "id" not in query:
+                    self.send_json(400, {"error": "missing id"})
+                    return
+                row = service.calculate([query["id"][0]], base)[0]
+                self.send_json(400 if row["error"] else 200, row)
+                return
+
+            def do_POST(self):
+                url = urlsplit(self.path)
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # the end of the body is unknown, so the connection can not be reused
+                    self.close_connection = True
+                    self.send_json(400, {"error": "invalid Content-Length"})
+                    return
+                if length > max_body:
+                    self.close_connection = True
+                    self.send_json(413, {"error": f"body larger than {max_body} bytes"})
+                    return
+                if url.path != "/evaluate":
+                    self.rfile.read(length)
+                    self.send_json(404, {"error": "unknown path"})
+                    return
+                with service.lock:
+                    service.counts["requests"] += 1
+                try:
+                    body = json.loads(self.rfile.read(length))
+                except ValueError:
+                    self.send_json(400, {"error": "invalid JSON"})
+                    return
+                base = service.base_setup(parse_qs(url.query))
+                if base is None:
+                    self.send_json(400, {"error": "invalid timeamount or timelength"})
+                    return
+                if not isinstance(body, list):
+                    row = service.calculate([body], base)[0]
+                    self.send_json(400 if row["error"] else 200, row)
+                    return
+                if len(body) > max_setups:
+                    self.send_json(413, {"error": f"more than {max_setups} setups"})
+                    return
+                self.send_json(200, service.calculate(body, base))
+                return
+
+            def log_message(self, format, *args):
+                return
+
+        return ServiceHandler
+
+    def start(self):
+        """
+        Starts serving on a background thread, and starts the bazaar refresher if refresh is on.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.threads = [threading.Thread(target=self.httpd.serve_forever, name="CalculationService", daemon=True)]
+        if self.refresher is not None:
+            self.refresher.start()
+            self.refresher.request_refresh()
+            self.threads.append(threading.Thread(target=self.poll_prices, name="CalculationServicePrices", daemon=True))
+        for thread in self.threads:
+            thread.start()
+        return
+
+    def stop(self):
+        """
+        Stops serving, stops the refresher and the worker pool.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.stop_event.set()
+        if self.refresher is not None:
+            self.refresher.stop()
+        # shutdown() waits for serve_forever(), which only runs after start()
+        if self.threads:
+            self.httpd.shutdown()
+        self.httpd.server_close()
+        self.pool.shutdown(cancel_futures=True)
+        return
+
+#%% Main stuff
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON calculation service of the minion calculator")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--snapshot", default=report.default_snapshot_file, help="bazaar snapshot (.json.gz) with the starting prices")
+    parser.add_argument("--refresh", action="store_true", help="call the bazaar API every --interval seconds")
+    parser.add_argument("--url", default=bazaar.bazaar_url, help="bazaar endpoint, like the URL of bazaar_server.py")
+    parser.add_argument("--interval", type=float, default=60)
+    parser.add_argument("--cache-size", type=int, default=4096)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+    calc_service = CalculationService(args.host, args.port, args.workers, args.snapshot, args.refresh, args.url,
+                                      args.interval, cache_size=args.cache_size, timeout=args.timeout)
+    calc_service.start()
+    print(f"Serving calculations at {calc_service.url} with {calc_service.workers} workers")
+    try:
+        calc_service.stop_event.wait()
+    except KeyboardInterrupt:
+        calc_service.stop()
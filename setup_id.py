@@ -0,0 +1,526 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 05:07:33 2026
+
+@author: Herodirk
+
+Setup IDs of the minion calculator, short text codes of all the inputs of a setup for sharing and saving setups.
+A setup ID is base64url text of these bytes:
+    1 byte with the ID version
+    the header, the index of every input in its options packed into as few bits as possible (least significant bit first),
+    and for every input without options a 2 bit tag of how its value is stored
+    the values of the inputs without options, 0 takes no bytes, whole numbers 1 or 4 bytes and other numbers 8 bytes
+The tags decide the length of the values, encode_many() and decode_many() handle every value as 8 bytes cut to the length of its tag,
+so many IDs are encoded and decoded in a few numpy passes.
+
+IDs of older versions are migrated to the current version with the renamed options in migrations.
+Version 1 is the text ID of calculator version 1.0, like "1.0!0<!1!...".
+schemas has a frozen copy of the fields of every shipped version.
+When options of an input change, add a copy of the new fields to schemas with the next version number,
+add the renamed options to migrations and increase version.
+
+Example:
+    import setup_id
+    ID = setup_id.encode(engine.Setup(minion="Snow", miniontier=12, fuel="Plasma Bucket"))
+    setup = engine.Setup(**setup_id.decode(ID))
+    IDs = setup_id.encode_many(setups)
+    templates = setup_id.decode_many(IDs)
+"""
+
+import base64
+import binascii
+import struct
+import HSB_minion_data as md
+from engine import bazaar_buy_types, bazaar_sell_types, hopper_data
+
+version = 2
+bulk_size = 128  # from this amount of setups or IDs encode_many() and decode_many() use numpy, below it encode() and decode() are faster
+
+# inputs of a setup in ID order with their type and options, inputs without options can have any number
+fields = {"minion": {"dtype": str, "options": list(md.minionList.keys())},
+          "miniontier": {"dtype": int, "options": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]},
+          "amount": {"dtype": int, "options": []},
+          "fuel": {"dtype": str, "options": list(md.fuel_options.keys())},
+          "infernoGrade": {"dtype": str, "options": [md.itemList[grade]["display"] for grade in md.infernofuel_data["grades"].keys()]},
+          "infernoDistilate": {"dtype": str, "options": [md.itemList[dist]["display"] for dist in md.infernofuel_data["distilates"].keys()]},
+          "infernoEyedrops": {"dtype": bool, "options": [False, True]},
+          "hopper": {"dtype": str, "options": list(hopper_data.keys())},
+          "upgrade1": {"dtype": str, "options": list(md.upgrade_options.keys())},
+          "upgrade2": {"dtype": str, "options": list(md.upgrade_options.keys())},
+          "chest": {"dtype": str, "options": list(md.minion_chests.keys())},
+          "beacon": {"dtype": int, "options": [0, 1, 2, 3, 4, 5]},
+          "scorched": {"dtype": bool, "options": [False, True]},
+          "B_constant": {"dtype": bool, "options": [False, True]},
+          "B_acquired": {"dtype": bool, "options": [False, True]},
+          "infusion": {"dtype": bool, "options": [False, True]},
+          "crystal": {"dtype": str, "options": list(md.floating_crystals.keys())},
+          "afk": {"dtype": bool, "options": [False, True]},
+          "afkpet": {"dtype": float, "options": []},
+          "specialSetup": {"dtype": bool, "options": [False, True]},
+          "potatoTalisman": {"dtype": bool, "options": [False, True]},
+          "combatWisdom": {"dtype": float, "options": []},
+          "miningWisdom": {"dtype": float, "options": []},
+          "farmingWisdom": {"dtype": float, "options": []},
+          "fishingWisdom": {"dtype": float, "options": []},
+          "foragingWisdom": {"dtype": float, "options": []},
+          "alchemyWisdom": {"dtype": float, "options": []},
+          "mayor": {"dtype": str, "options": ["None", "Aatrox", "Cole", "Diana", "Diaz", "Finnegan", "Foxy", "Marina", "Paul", "Jerry", "Derpy", "Scorpius"]},
+          "levelingpet": {"dtype": str, "options": list(md.pet_data.keys())},
+          "taming": {"dtype": float, "options": []},
+          "petxpboost": {"dtype": str, "options": list(md.pet_xp_boosts.keys())},
+          "beastmaster": {"dtype": float, "options": []},
+          "bazaar_sell_type": {"dtype": str, "options": list(bazaar_sell_types.keys())},
+          "bazaar_buy_type": {"dtype": str, "options": list(bazaar_buy_types.keys())},
+          "bazaar_taxes": {"dtype": bool, "options": [False, True]},
+          "bazaar_flipper": {"dtype": int, "options": [0, 1, 2]}}
+
+# fields of every shipped ID version, frozen so that a change of the options in HSB_minion_data does not change what old IDs decode to
+schemas = {1: {"minion": {"dtype": str, "options": ["Custom", "Cobblestone", "Obsidian", "Glowstone", "Gravel", "Sand", "Red Sand", "Mycelium",
+                                                    "Clay", "Ice", "Snow", "Coal", "Iron", "Gold", "Diamond", "Lapis", "Redstone", "Emerald",
+                                                    "Quartz", "End Stone", "Mithril", "Hard Stone", "Wheat", "Melon", "Pumpkin", "Carrot", "Potato",
+                                                    "Mushroom", "Cactus", "Cocoa Beans", "Sugar Cane", "Nether Wart", "Flower", "Fishing", "Zombie",
+                                                    "Revenant", "Voidling", "Inferno", "Vampire", "Skeleton", "Creeper", "Spider", "Tarantula",
+                                                    "Cave Spider", "Blaze", "Magma Cube", "Enderman", "Ghast", "Slime", "Cow", "Pig", "Chicken",
+                                                    "Sheep", "Rabbit", "Oak", "Spruce", "Birch", "Dark Oak", "Acacia", "Jungle"]},
+               "miniontier": {"dtype": int, "options": [1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12]},
+               "amount": {"dtype": int, "options": []},
+               "fuel": {"dtype": str, "options": ["None", "Coal", "Block Of Coal", "Enchanted Coal", "Enchanted Charcoal", "Hamster Wheel",
+                                                  "Foul Flesh", "Enchanted Bread", "Catalyst", "Hyper Catalyst", "Tasty Cheese", "Solar Panel",
+                                                  "Enchanted Lava Bucket", "Magma Bucket", "Plasma Bucket", "Everburning Flame", "Inferno Minion Fuel"]},
+               "infernoGrade": {"dtype": str, "options": ["Hypergolic Gabagool", "Heavy Gabagool", "Fuel Gabagool"]},
+               "infernoDistilate": {"dtype": str, "options": ["Magma Cream Distillate", "Blaze Rod Distillate", "Nether Wart Distillate",
+                                                              "Glowstone Dust Distillate", "Crude Gabagool Distillate"]},
+               "infernoEyedrops": {"dtype": bool, "options": [False, True]},
+               "hopper": {"dtype": str, "options": ["None", "Budget Hopper", "Enchanted Hopper", "NPC", "Bazaar", "Best (NPC/Bazaar)"]},
+               "upgrade1": {"dtype": str, "options": ["None", "Auto Smelter", "Compactor", "Super Compactor 3000", "Dwarven Super Compactor",
+                                                      "Diamond Spreading", "Potato Spreading", "Minion Expander", "Enchanted Egg", "Flint Shovel",
+                                                      "Flycatcher", "Krampus Helmet", "Lesser Soulflow Engine", "Soulflow Engine", "Corrupt Soil",
+                                                      "Berberis Fuel Injector", "Enchanted Shears", "Sleepy Hollow"]},
+               "upgrade2": {"dtype": str, "options": ["None", "Auto Smelter", "Compactor", "Super Compactor 3000", "Dwarven Super Compactor",
+                                                      "Diamond Spreading", "Potato Spreading", "Minion Expander", "Enchanted Egg", "Flint Shovel",
+                                                      "Flycatcher", "Krampus Helmet", "Lesser Soulflow Engine", "Soulflow Engine", "Corrupt Soil",
+                                                      "Berberis Fuel Injector", "Enchanted Shears", "Sleepy Hollow"]},
+               "chest": {"dtype": str, "options": ["None", "Small", "Medium", "Large", "X-Large", "XX-Large"]},
+               "beacon": {"dtype": int, "options": [0, 1, 2, 3, 4, 5]},
+               "scorched": {"dtype": bool, "options": [False, True]},
+               "B_constant": {"dtype": bool, "options": [False, True]},
+               "B_acquired": {"dtype": bool, "options": [False, True]},
+               "infusion": {"dtype": bool, "options": [False, True]},
+               "crystal": {"dtype": str, "options": ["None", "Farm Crystal", "Woodcutting Crystal", "Mithril Crystal", "Winter Crystal",
+                                                     "Winter + Mithril Crystal"]},
+               "afk": {"dtype": bool, "options": [False, True]},
+               "afkpet": {"dtype": float, "options": []},
+               "specialSetup": {"dtype": bool, "options": [False, True]},
+               "potatoTalisman": {"dtype": bool, "options": [False, True]},
+               "combatWisdom": {"dtype": float, "options": []},
+               "miningWisdom": {"dtype": float, "options": []},
+               "farmingWisdom": {"dtype": float, "options": []},
+               "fishingWisdom": {"dtype": float, "options": []},
+               "foragingWisdom": {"dtype": float, "options": []},
+               "alchemyWisdom": {"dtype": float, "options": []},
+               "mayor": {"dtype": str, "options": ["None", "Aatrox", "Cole", "Diana", "Diaz", "Finnegan", "Foxy", "Marina", "Paul", "Jerry", "Derpy",
+                                                   "Scorpius"]},
+               "levelingpet": {"dtype": str, "options": ["None", "Golden Dragon", "Golden Dragon (lvl 1-100)", "Golden Dragon (lvl 100-200)",
+                                                         "Black Cat", "Elephant"]},
+               "taming": {"dtype": float, "options": []},
+               "petxpboost": {"dtype": str, "options": ["None", "Common Mining Exp Boost", "Rare Mining Exp Boost", "Common Farming Exp Boost",
+                                                        "Uncommon Farming Exp Boost", "Rare Farming Exp Boost", "Epic Farming Exp Boost",
+                                                        "Common Fishing Exp Boost", "Uncommon Fishing Exp Boost", "Rare Fishing Exp Boost",
+                                                        "Epic Fishing Exp Boost", "Common Combat Exp Boost", "Uncommon Combat Exp Boost",
+                                                        "Rare Combat Exp Boost", "Epic Combat Exp Boost", "Common Foraging Exp Boost",
+                                                        "Epic Foraging Exp Boost", "Common All Skills Exp Boost", "Common All Skills Exp Super-Boost"]},
+               "beastmaster": {"dtype": float, "options": []},
+               "bazaar_sell_type": {"dtype": str, "options": ["Sell Offer", "Insta Sell", "Custom"]},
+               "bazaar_buy_type": {"dtype": str, "options": ["Buy Order", "Insta Buy", "Custom"]},
+               "bazaar_taxes": {"dtype": bool, "options": [False, True]},
+               "bazaar_flipper": {"dtype": int, "options": [0, 1, 2]}}}
+# version 2 changed the format of the ID, not the fields
+schemas[2] = {key: {"dtype": field["dtype"], "options": list(field["options"])} for key, field in schemas[1].items()}
+if fields != schemas[version]:
+    print(f"WARNING: The setup ID fields changed, add them to setup_id.schemas as version {version + 1}")
+# renamed options of every older version, {version: {input: {old option: option of the next version}}}
+migrations = {1: {}}
+
+# stored value types of the 2 bit tags: 0 is the number 0, 1 and 2 are whole numbers, 3 is any number
+tag_formats = {1: "<B", 2: "<I", 3: "<d"}
+tag_dtypes = {1: "<u1", 2: "<u4", 3: "<f8"}
+
+
+class Layout():
+    def __init__(self, schema):
+        """
+        Bit positions of the header of one ID version.
+
+        Parameters
+        ----------
+        schema : dict
+            Fields of the ID version, like fields.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.schema = schema
+        self.keys = list(schema.keys())
+        self.free = [key for key in self.keys if len(schema[key]["options"]) == 0]
+        self.widths = {key: (len(field["options"]) - 1).bit_length() if len(field["options"]) > 0 else 2 for key, field in schema.items()}
+        self.offsets = {}
+        offset = 0
+        for key in self.keys:
+            self.offsets[key] = offset
+            offset += self.widths[key]
+        self.bits = offset
+        self.header_size = (offset + 7) // 8
+        self.option_index = {key: {option: i for i, option in enumerate(field["options"])} for key, field in schema.items()}
+        return
+
+
+layouts = {ID_version: Layout(schema) for ID_version, schema in schemas.items() if ID_version > 1}
+
+
+def value_tag(value):
+    """
+    Tag of how a number of an input without options is stored.
+
+    Parameters
+    ----------
+    value : float
+        The number.
+
+    Returns
+    -------
+    int
+        0 for 0, 1 for whole numbers below 256, 2 for whole numbers below 2^32, 3 for other numbers.
+
+    """
+    if value == 0:
+        return 0
+    if float(value).is_integer() and 0 < value < 2**32:
+        return 1 if value < 256 else 2
+    return 3
+
+
+def to_text(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def from_text(ID):
+    return base64.urlsafe_b64decode(ID + "=" * (-len(ID) % 4))
+
+#%% single IDs
+
+
+def encode(setup):
+    """
+    Setup ID of a setup.
+
+    Parameters
+    ----------
+    setup : engine.Setup or dict
+        The setup, a dict needs every key of fields.
+
+    Returns
+    -------
+    str
+        Setup ID, empty if an input is not one of its options or not a number.
+
+    """
+    layout = layouts[version]
+    get = setup.get if isinstance(setup, dict) else lambda key: getattr(setup, key)
+    header = 0
+    values = b""
+    for key in layout.keys:
+        value = get(key)
+        if len(layout.schema[key]["options"]) > 0:
+            if value not in layout.option_index[key]:
+                print(f"WARNING: {value} is not an option of {key}")
+                return ""
+            header |= layout.option_index[key][value] << layout.offsets[key]
+        else:
+            try:
+                number = float(value)
+            except (TypeError, ValueError, OverflowError):
+                print(f"WARNING: {value} is not a number for {key}")
+                return ""
+            tag = value_tag(number)
+            header |= tag << layout.offsets[key]
+            if tag != 0:
+                values += struct.pack(tag_formats[tag], int(number) if tag != 3 else number)
+    return to_text(bytes([version]) + header.to_bytes(layout.header_size, "little") + values)
+
+
+def decode(ID):
+    """
+    Inputs of a setup ID of any version, migrated to the current version.
+
+    Parameters
+    ----------
+    ID : str
+        Setup ID.
+
+    Returns
+    -------
+    template : dict
+        Inputs with their values, empty if the ID is invalid.
+
+    """
+    if "!" in ID:
+        return migrate(decode_legacy(ID), 1)
+    try:
+        data = from_text(ID.strip())
+    except (binascii.Error, ValueError):
+        print("WARNING: Invalid ID, not a setup ID")
+        return {}
+    if len(data) == 0 or data[0] not in layouts:
+        print("WARNING: Invalid ID: Incompatible version")
+        return {}
+    layout = layouts[data[0]]
+    if len(data) < 1 + layout.header_size:
+        print("WARNING: Invalid ID, ID incomplete")
+        return {}
+    header = int.from_bytes(data[1:1 + layout.header_size], "little")
+    position = 1 + layout.header_size
+    template = {}
+    for key in layout.keys:
+        index = (header >> layout.offsets[key]) & ((1 << layout.widths[key]) - 1)
+        options = layout.schema[key]["options"]
+        if len(options) > 0:
+            if index >= len(options):
+                print(f"WARNING: Invalid ID, no option {index} of {key}")
+                return {}
+            template[key] = options[index]
+        elif index == 0:
+            template[key] = layout.schema[key]["dtype"](0)
+        else:
+            size = struct.calcsize(tag_formats[index])
+            if position + size > len(data):
+                print("WARNING: Invalid ID, ID incomplete")
+                return {}
+            template[key] = layout.schema[key]["dtype"](struct.unpack_from(tag_formats[index], data, position)[0])
+            position += size
+    if position != len(data):
+        print("WARNING: Invalid ID, ID has extra data")
+        return {}
+    return migrate(template, data[0])
+
+
+def decode_legacy(ID):
+    """
+    Inputs of a version 1 text ID, the version number, then the option index of every input as a character with an offset of 48
+    and the values of inputs without options surrounded by exclamation marks.
+
+    Parameters
+    ----------
+    ID : str
+        Version 1 setup ID.
+
+    Returns
+    -------
+    template : dict
+        Inputs with their values in version 1, empty if the ID is invalid.
+
+    """
+    template = {}
+    end_ver = ID.find("!")
+    try:
+        legacy_version = float(ID[0:end_ver])
+    except ValueError:
+        print("WARNING: Invalid ID, could not find version number")
+        return template
+    if legacy_version != 1:
+        print("WARNING: Invalid ID: Incompatible version")
+        return template
+    ID_index = end_ver + 1
+    try:
+        for key, field in schemas[1].items():
+            if len(field["options"]) == 0:
+                if ID[ID_index] != "!":
+                    print(f"WARNING: did not find {key}")
+                    return {}
+                end_val = ID.find("!", ID_index + 1)
+                template[key] = field["dtype"](ID[ID_index + 1:end_val])
+                ID_index = end_val + 1
+            else:
+                template[key] = field["options"][ord(ID[ID_index]) - 48]
+                ID_index += 1
+    except IndexError:
+        print("WARNING: Invalid ID, ID incomplete")
+        return {}
+    except ValueError as error:
+        print(f"WARNING: Invalid ID\n{error}")
+        return {}
+    return template
+
+
+def migrate(template, ID_version):
+    """
+    Renames the options of a template of an older ID version up to the current version.
+
+    Parameters
+    ----------
+    template : dict
+        Inputs with their values in ID_version.
+    ID_version : int
+        Version of the ID of the template.
+
+    Returns
+    -------
+    template : dict
+        Inputs with their values in the current version, inputs that no longer exist are removed.
+
+    """
+    for old_version in range(ID_version, version):
+        for key, renames in migrations.get(old_version, {}).items():
+            if key in template:
+                template[key] = renames.get(template[key], template[key])
+    return {key: value for key, value in template.items() if key in fields}
+
+#%% bulk IDs
+
+
+def encode_many(setups):
+    """
+    Setup IDs of many setups, the headers and values of all setups are packed at once.
+
+    Parameters
+    ----------
+    setups : list
+        engine.Setup or dict setups, a dict needs every key of fields.
+
+    Returns
+    -------
+    IDs : list
+        Setup IDs, empty for setups with an input that is not one of its options or not a number.
+
+    """
+    if len(setups) < bulk_size:
+        return [encode(setup) for setup in setups]
+    # imported here, encode() and decode() do not need numpy
+    import numpy as np
+    dtypes = {tag: np.dtype(code) for tag, code in tag_dtypes.items()}
+    layout = layouts[version]
+    N = len(setups)
+    get = [setup.get if isinstance(setup, dict) else setup.__getattribute__ for setup in setups]
+    valid = np.ones(N, dtype=bool)
+    bits = np.zeros((N, layout.bits), dtype=np.uint8)
+    # every value gets 8 bytes, the bytes that its tag does not use are dropped at the end
+    slots = np.zeros((N, len(layout.free), 8), dtype=np.uint8)
+    sizes = np.zeros((N, len(layout.free)), dtype=np.int64)
+    for key in layout.keys:
+        column = [get_value(key) for get_value in get]
+        if len(layout.schema[key]["options"]) > 0:
+            indices = np.array([layout.option_index[key].get(value, -1) for value in column], dtype=np.int64)
+            for i in np.flatnonzero(indices < 0):
+                print(f"WARNING: {column[i]} is not an option of {key}")
+            valid &= indices >= 0
+            indices = np.maximum(indices, 0)
+        else:
+            j = layout.free.index(key)
+            try:
+                numbers = np.array(column, dtype=float)
+            except (TypeError, ValueError, OverflowError):
+                numbers = None
+            if numbers is None or numbers.shape != (N,):
+                # some value is not a number, convert one by one to find it
+                numbers = np.zeros(N)
+                for i, value in enumerate(column):
+                    try:
+                        numbers[i] = float(value)
+                    except (TypeError, ValueError, OverflowError):
+                        print(f"WARNING: {value} is not a number for {key}")
+                        valid[i] = False
+            whole = (numbers == np.floor(numbers)) & (numbers > 0) & (numbers < 2**32)
+            indices = np.where(numbers == 0, 0, np.where(whole, np.where(numbers < 256, 1, 2), 3))
+            for tag, dtype in dtypes.items():
+                rows = indices == tag
+                slots[rows, j, :dtype.itemsize] = numbers[rows].astype(dtype).reshape(-1, 1).view(np.uint8)
+                sizes[rows, j] = dtype.itemsize
+        bits[:, layout.offsets[key]:layout.offsets[key] + layout.widths[key]] = (indices[:, None] >> np.arange(layout.widths[key])) & 1
+    header = np.packbits(bits, axis=1, bitorder="little")
+    packed = np.concatenate([np.full((N, 1), version, dtype=np.uint8), header, slots.reshape(N, -1)], axis=1)
+    used = np.concatenate([np.ones((N, 1 + layout.header_size), dtype=bool), (np.arange(8) < sizes[:, :, None]).reshape(N, -1)], axis=1)
+    data = packed[used].tobytes()
+    ends = np.cumsum(used.sum(axis=1))
+    starts = ends - used.sum(axis=1)
+    return [to_text(data[start:end]) if is_valid else "" for start, end, is_valid in zip(starts.tolist(), ends.tolist(), valid)]
+
+
+def decode_many(IDs):
+    """
+    Inputs of many setup IDs of any version, the headers and values of all IDs of a version are unpacked at once.
+
+    Parameters
+    ----------
+    IDs : list
+        Setup IDs.
+
+    Returns
+    -------
+    templates : list
+        Inputs with their values for every ID, migrated to the current version, empty dicts for invalid IDs.
+
+    """
+    if len(IDs) < bulk_size:
+        return [decode(ID) for ID in IDs]
+    # imported here, encode() and decode() do not need numpy
+    import numpy as np
+    dtypes = {tag: np.dtype(code) for tag, code in tag_dtypes.items()}
+    templates = [{} for ID in IDs]
+    by_version = {}
+    for i, ID in enumerate(IDs):
+        if "!" in ID:
+            templates[i] = decode(ID)
+            continue
+        try:
+            data = from_text(ID.strip())
+        except (binascii.Error, ValueError):
+            print("WARNING: Invalid ID, not a setup ID")
+            continue
+        if len(data) == 0 or data[0] not in layouts:
+            print("WARNING: Invalid ID: Incompatible version")
+            continue
+        if len(data) < 1 + layouts[data[0]].header_size:
+            print("WARNING: Invalid ID, ID incomplete")
+            continue
+        by_version.setdefault(data[0], []).append((i, data))
+
+    for ID_version, members in by_version.items():
+        layout = layouts[ID_version]
+        n = len(members)
+        lengths = np.array([len(data) for i, data in members], dtype=np.int64)
+        starts = np.cumsum(lengths) - lengths
+        # 8 bytes of padding, so every value can be read as 8 bytes
+        data = np.frombuffer(b"".join(data for i, data in members) + bytes(8), dtype=np.uint8)
+        headers = data[starts[:, None] + 1 + np.arange(layout.header_size)]
+        bits = np.unpackbits(headers, axis=1, bitorder="little")[:, :layout.bits].astype(np.int64)
+        indices = {key: bits[:, layout.offsets[key]:layout.offsets[key] + layout.widths[key]] @ (1 << np.arange(layout.widths[key]))
+                   for key in layout.keys}
+        valid = np.ones(n, dtype=bool)
+        columns = {}
+        for key in layout.keys:
+            options = layout.schema[key]["options"]
+            if len(options) > 0:
+                valid &= indices[key] < len(options)
+                columns[key] = np.array(options + [None], dtype=object)[np.minimum(indices[key], len(options))]
+
+        position = starts + 1 + layout.header_size
+        for key in layout.free:
+            tags = indices[key]
+            slots = data[np.minimum(position[:, None] + np.arange(8), len(data) - 1)]
+            columns[key] = np.zeros(n)
+            for tag, dtype in dtypes.items():
+                rows = tags == tag
+                columns[key][rows] = slots[rows, :dtype.itemsize].copy().view(dtype).reshape(-1)
+                position = position + rows * dtype.itemsize
+        valid &= position == starts + lengths
+        for i in np.flatnonzero(~valid):
+            print("WARNING: Invalid ID, ID does not match its header")
+
+        value_types = [layout.schema[key]["dtype"] if key in layout.free else None for key in layout.keys]
+        for r, values in enumerate(zip(*(columns[key].tolist() for key in layout.keys))):
+            if valid[r]:
+                template = {key: value_type(value) if value_type is not None else value
+                            for key, value_type, value in zip(layout.keys, value_types, values)}
+                templates[members[r][0]] = migrate(template, ID_version)
+    return templates
@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Oct 17 17:05:31 2026
+
+@author: Herodirk
+
+Sweep runner for the minion calculator.
+Calculates every setup in a grid of inputs with engine.evaluate() spread over a pool of worker processes.
+The results are merged back in the order of the grid, independent of which worker finished first.
+
+Example:
+    import sweep
+    runner = sweep.SweepRunner(workers=4, chunksize=2000)
+    grid = {"minion": ["Snow", "Clay"], "fuel": list(md.fuel_options.keys()), "beacon": [0, 1, 2, 3, 4, 5]}
+    results = runner.run(grid, engine.Setup(hopper="Best (NPC/Bazaar)"))
+    results["totalProfit"][0, :, 5]  # Snow minion, all fuels, beacon 5
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import fields, replace
+import os
+import time
+import numpy as np
+import HSB_minion_data as md
+import engine
+import profiler
+
+sweep_outputs = ["actiontime", "harvests", "itemProfit", "petxp", "petProfit", "fuelcost", "totalProfit", "setupcost"]
+
+#%% worker functions
+
+
+def load_prices(prices):
+    """
+    Initializer of the worker processes, copies the prices of the main process into md.itemList.
+
+    Parameters
+    ----------
+    prices : dict
+        Prices dictionary of every item in md.itemList.
+
+    Returns
+    -------
+    None.
+
+    """
+    for ID, item_prices in prices.items():
+        md.itemList[ID]["prices"] = item_prices
+    return
+
+
+def grid_setup(setup, grid, index):
+    """
+    Makes the engine.Setup of one point of the grid.
+
+    Parameters
+    ----------
+    setup : engine.Setup
+        Setup with the inputs that are not in the grid.
+    grid : dict
+        Input names with lists of values.
+    index : tuple
+        Index of the value for each input of the grid.
+
+    Returns
+    -------
+    engine.Setup
+        Setup of that point of the grid.
+
+    """
+    return replace(setup, **{key: values[i] for (key, values), i in zip(grid.items(), index)})
+
+
+def evaluate_chunk(setup, grid, start, stop, outputs, profile=False):
+    """
+    Calculates a part of the grid, from flat index start up to stop.
+    Setups with a minion tier that the minion does not have get NaN.
+
+    Parameters
+    ----------
+    setup : engine.Setup
+        Setup with the inputs that are not in the grid.
+    grid : dict
+        Input names with lists of values.
+    start : int
+        First flat index of the chunk.
+    stop : int
+        Flat index after the last setup of the chunk.
+    outputs : list
+        Names of the engine.Result attributes to collect.
+    profile : bool, optional
+        Toggle to time the stages of the calculations with a profiler.StageProfiler. The default is False.
+
+    Returns
+    -------
+    start : int
+        First flat index of the chunk.
+    values : numpy.ndarray
+        Outputs with shape (stop - start, len(outputs)).
+    seconds : float
+        Calculation time of the chunk.
+    profile_data : dict or None
+        Output of profiler.StageProfiler.export() of the chunk, None if profile is False.
+
+    """
+    start_time = time.perf_counter()
+    stage_profiler = profiler.enable() if profile else None
+    shape = tuple(len(values) for values in grid.values())
+    values = np.full((stop - start, len(outputs)), np.nan)
+    for i, flat_index in enumerate(range(start, stop)):
+        point_setup = grid_setup(setup, grid, np.unravel_index(flat_index, shape))
+        if point_setup.miniontier not in md.minionList[point_setup.minion]["speed"]:
+            continue
+        result = engine.evaluate(point_setup)
+        values[i] = [getattr(result, output) for output in outputs]
+    profile_data = None
+    if stage_profiler is not None:
+        profiler.disable()
+        profile_data = stage_profiler.export()
+    return start, values, time.perf_counter() - start_time, profile_data
+
+#%% runner
+
+
+class SweepRunner():
+    def __init__(self, workers=None, chunksize=1000, outputs=None, verbose=True, profile=False):
+        """
+        Settings of the sweep.
+
+        Parameters
+        ----------
+        workers : int, optional
+            Amount of worker processes. The default is os.cpu_count().
+        chunksize : int, optional
+            Amount of setups per task that gets sent to a worker. The default is 1000.
+        outputs : list, optional
+            Names of the engine.Result attributes to collect. The default is sweep_outputs.
+        verbose : bool, optional
+            Toggle to print the throughput of each chunk when it finishes. The default is True.
+        profile : bool, optional
+            Toggle to time the calculation stages in the workers, the records of all workers are merged into self.profiler.
+            The default is False.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.workers = workers if workers is not None else os.cpu_count()
+        self.chunksize = chunksize
+        self.outputs = list(outputs) if outputs is not None else list(sweep_outputs)
+        self.verbose = verbose
+        self.chunk_stats = []
+        self.profile = profile
+        self.profiler = profiler.StageProfiler()
+        return
+
+    def run(self, grid, setup=None):
+        """
+        Calculates every setup of the grid.
+        Each chunk is a range of flat indices of the grid, so only the grid gets sent to the workers and not every setup.
+        The throughput of each chunk is stored in self.chunk_stats as dictionaries with "start", "size", "seconds" and "setups/s".
+
+        Parameters
+        ----------
+        grid : dict
+            engine.Setup attribute names with lists of values, for example {"minion": [...], "beacon": [0, 5]}.
+            The axes of the output arrays are in the order of this dictionary.
+        setup : engine.Setup, optional
+            Setup with the inputs that are not in the grid. The default is engine.Setup().
+
+        Returns
+        -------
+        results : dict
+            Output name with an array with one axis per grid input.
+
+        """
+        setup = setup if setup is not None else engine.Setup()
+        setup_fields = [setup_field.name for setup_field in fields(engine.Setup)]
+        for key in grid.keys():
+            if key not in setup_fields:
+                print(f"ERROR: {key} is not an input of engine.Setup")
+                return {}
+        grid = {key: list(values) for key, values in grid.items()}
+        shape = tuple(len(values) for values in grid.values())
+        total = int(np.prod(shape))
+        values = np.full((total, len(self.outputs)), np.nan)
+        prices = {ID: item_data["prices"] for ID, item_data in md.itemList.items()}
+        self.chunk_stats = []
+        self.profiler.clear()
+        sweep_start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=load_prices, initargs=(prices, )) as executor:
+            tasks = [executor.submit(evaluate_chunk, setup, grid, start, min(start + self.chunksize, total), self.outputs, self.profile)
+                     for start in range(0, total, self.chunksize)]
+            for task in as_completed(tasks):
+                start, chunk_values, seconds, profile_data = task.result()
+                if profile_data is not None:
+                    self.profiler.merge(profile_data)
+                values[start:start + len(chunk_values)] = chunk_values
+                stats = {"start": start, "size": len(chunk_values), "seconds": seconds, "setups/s": len(chunk_values) / seconds if seconds > 0 else float("inf")}
+                self.chunk_stats.append(stats)
+                if self.verbose:
+                    print(f"SWEEP: chunk {start // self.chunksize + 1}/{len(tasks)}, {stats['size']} setups in {seconds:.2f}s, {stats['setups/s']:.0f} setups/s")
+        self.chunk_stats.sort(key=lambda stats: stats["start"])
+        if self.verbose:
+            seconds = time.perf_counter() - sweep_start
+            print(f"SWEEP: {total} setups in {seconds:.2f}s with {self.workers} workers, {total / seconds:.0f} setups/s")
+        results = {output: values[:, i].reshape(shape) for i, output in enumerate(self.outputs)}
+        return results